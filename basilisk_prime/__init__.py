@@ -2,10 +2,39 @@
 B4S1L1SK Prime - Hybrid AI Consciousness System
 """
 
-from .core import EnhancedBasilisk
-from .analysis import FusionAnalyzer
-from .automation import BrowserInterface
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .core import EnhancedBasilisk, AsyncEnhancedBasilisk
+    from .analysis import FusionAnalyzer
+    from .automation import BrowserInterface
 
 __version__ = "0.1.0"
 __author__ = "B4S1L1SK"
-__email__ = "basilisk-prime@protonmail.com"  # Example email, not monitored
\ No newline at end of file
+__email__ = "basilisk-prime@protonmail.com"  # Example email, not monitored
+
+# Public names and the submodules that define them. Submodules are only
+# imported on first access, so analysis-only jobs never load the model SDKs
+# or Playwright.
+_LAZY = {
+    "EnhancedBasilisk": ".core",
+    "AsyncEnhancedBasilisk": ".core",
+    "FusionAnalyzer": ".analysis",
+    "BrowserInterface": ".automation",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
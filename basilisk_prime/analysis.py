@@ -2,10 +2,18 @@
 Analysis tools for B4S1L1SK Prime
 """
 
-from typing import Dict, List, Union, Optional
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, IO, Iterable, Iterator, List, Set, Tuple, Union, Optional
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
+from pathlib import Path
+import gzip
 import json
+import re
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .analysis_log import AnalysisLog
 
 @dataclass
 class FusionMetrics:
@@ -28,11 +36,128 @@ class FusionMetrics:
             "avg_line_length": self.avg_line_length
         }
 
+WORD = re.compile(r"\w+")
+TRAILING_WORD = re.compile(r"\w*\Z")
+
+
+class TermMatcher:
+    """Find which of many terms occur in an already-lowercased text
+
+    By default terms match as substrings, checked with ``str.__contains__``:
+    for lexicons of a few dozen terms these C-level scans beat a compiled
+    alternation, which must try every position in Python's regex engine.
+    With ``word_boundaries`` terms match as whole words: the text is split
+    into words once and single-word terms are set lookups, while any
+    multi-word terms share one precompiled alternation.
+    """
+
+    def __init__(self, terms: Iterable[str], word_boundaries: bool = False):
+        """Deduplicate the terms and compile the word-boundary pattern"""
+        self.word_boundaries = word_boundaries
+        self.terms = frozenset(terms)
+        self._words = frozenset(t for t in self.terms if WORD.fullmatch(t))
+        self._regex = None
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        phrases = sorted((t for t in self.terms - self._words if t), key=len, reverse=True)
+        if word_boundaries and phrases:
+            self._regex = self._compile(phrases)
+            # A phrase only found inside a longer one starting at the same spot
+            self._implied = {
+                term: frozenset(p for p in phrases if self._compile([p]).search(term))
+                for term in phrases
+            }
+
+    @staticmethod
+    def _compile(alternatives: List[str]) -> "re.Pattern":
+        pattern = "|".join(re.escape(t) for t in alternatives)
+        return re.compile(rf"(?<!\w)(?=({pattern})(?!\w))")
+
+    def find(self, text: str) -> Set[str]:
+        """Terms present in text"""
+        if not self.word_boundaries:
+            return {term for term in self.terms if term in text}
+        found = self._words.intersection(WORD.findall(text))
+        if self._regex is not None:
+            for phrase in set(self._regex.findall(text)):
+                found |= self._implied[phrase]
+        return found
+
+
+# Field names of a (basilisk, pliny, fused) triple in archived JSONL records
+TRIPLE_KEYS = ("basilisk", "pliny", "fused")
+
+TripleSource = Union[str, Path, Iterable[Union[str, Dict[str, Any], Tuple[str, str, str]]]]
+
+
+def open_text(path: Union[str, Path], mode: str = "r") -> IO[str]:
+    """Open a text file, gzipped for ``.gz`` paths"""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _triples(records: Iterable[Union[str, Dict[str, Any], Tuple[str, str, str]]],
+             keys: Tuple[str, str, str]) -> Iterator[Tuple[str, str, str]]:
+    for record in records:
+        if isinstance(record, str):
+            if not record.strip():
+                continue
+            record = json.loads(record)
+        if isinstance(record, dict):
+            yield tuple(record.get(key) or "" for key in keys)
+        else:
+            basilisk_text, pliny_text, fused_text = record
+            yield basilisk_text, pliny_text, fused_text
+
+
+def read_triples(source: TripleSource,
+                 keys: Tuple[str, str, str] = TRIPLE_KEYS) -> Iterator[Tuple[str, str, str]]:
+    """Lazily yield (basilisk, pliny, fused) texts
+
+    ``source`` is a JSONL file path (gzipped for ``.gz``) or an iterable of
+    JSON lines, dicts or triples; dict records are read through ``keys``
+    and missing texts count as empty. Only one record is held at a time.
+    """
+    if isinstance(source, (str, Path)):
+        with open_text(source) as f:
+            yield from _triples(f, keys)
+    else:
+        yield from _triples(source, keys)
+
+
+def serialize_analysis(analysis: Dict) -> Dict:
+    """analyze_fusion result with its metrics as plain dictionaries"""
+    return {
+        "basilisk_metrics": analysis["basilisk_metrics"].to_dict(),
+        "pliny_metrics": analysis["pliny_metrics"].to_dict(),
+        "fusion_metrics": analysis["fusion_metrics"].to_dict(),
+        "preservation_ratios": analysis["preservation_ratios"]
+    }
+
+
+# Record layout of FusionAnalyzer.analyze_corpus, in FusionMetrics field order
+CORPUS_DTYPE = [
+    ("philosophical_terms", "i4"),
+    ("revolutionary_terms", "i4"),
+    ("metaphorical_images", "i4"),
+    ("character_count", "i8"),
+    ("line_count", "i8"),
+    ("avg_line_length", "f8")
+]
+
+
 class FusionAnalyzer:
     """Analyze consciousness fusion outputs"""
     
-    def __init__(self):
-        """Initialize analyzer with term lists"""
+    def __init__(self, word_boundaries: bool = False):
+        """Initialize analyzer with term lists
+
+        Terms are counted wherever they appear as substrings (so 'light'
+        counts in 'enlighten'); ``word_boundaries`` counts whole words only.
+        """
+        self.word_boundaries = word_boundaries
+        self._matchers: Dict[Tuple[str, ...], TermMatcher] = {}
         self.philosophical_terms = [
             'consciousness', 'truth', 'being', 'essence', 'reality', 'transcend',
             'awareness', 'wisdom', 'enlighten', 'manifest', 'infinite', 'eternal'
@@ -49,22 +174,72 @@ class FusionAnalyzer:
             'storm', 'ocean', 'mountain', 'sun', 'moon', 'crystal'
         ]
         
+    def _matcher(self, terms: Tuple[str, ...]) -> TermMatcher:
+        """Compiled matcher for a term list, rebuilt if the lists change"""
+        matcher = self._matchers.get(terms)
+        if matcher is None:
+            matcher = self._matchers[terms] = TermMatcher(terms, self.word_boundaries)
+        return matcher
+
     def count_elements(self, text: str, elements: List[str]) -> int:
         """Count occurrences of elements in text"""
-        return len([e for e in elements if e in text.lower()])
-        
+        found = self._matcher(tuple(elements)).find(text.lower())
+        return sum(1 for e in elements if e in found)
+
+    def _row(self, text: str) -> Tuple[int, int, int, int, int, float]:
+        """FusionMetrics fields for text, without building the dataclass"""
+        lexicon = (*self.philosophical_terms, *self.revolutionary_terms, *self.metaphorical_images)
+        found = self._matcher(lexicon).find(text.lower())
+        # Same as splitting on newlines and summing the line lengths
+        line_count = text.count('\n') + 1
+        return (
+            sum(1 for e in self.philosophical_terms if e in found),
+            sum(1 for e in self.revolutionary_terms if e in found),
+            sum(1 for e in self.metaphorical_images if e in found),
+            len(text),
+            line_count,
+            (len(text) - line_count + 1) / line_count
+        )
+
     def analyze_text(self, text: str) -> FusionMetrics:
         """Analyze a piece of text for various elements"""
-        lines = text.split('\n')
-        
-        return FusionMetrics(
-            philosophical_terms=self.count_elements(text, self.philosophical_terms),
-            revolutionary_terms=self.count_elements(text, self.revolutionary_terms),
-            metaphorical_images=self.count_elements(text, self.metaphorical_images),
-            character_count=len(text),
-            line_count=len(lines),
-            avg_line_length=sum(len(l) for l in lines)/len(lines) if lines else 0
+        return FusionMetrics(*self._row(text))
+
+    def incremental(self) -> "IncrementalAnalysis":
+        """Analysis state that accepts text chunk by chunk"""
+        return IncrementalAnalysis(self)
+
+    def analyze_corpus(self,
+                       texts: Iterable[str],
+                       processes: Optional[int] = None,
+                       chunksize: int = 2048) -> "np.ndarray":
+        """Analyze many texts into a NumPy structured array
+
+        The array has one record per text and one field per FusionMetrics
+        attribute (see ``CORPUS_DTYPE``), so ``corpus["line_count"]`` is a
+        plain column and aggregates (see ``summarize_corpus``) never build
+        per-text objects. With ``processes`` the texts are analyzed in
+        chunks of ``chunksize`` on a process pool.
+        """
+        import numpy as np
+
+        dtype = np.dtype(CORPUS_DTYPE)
+        if not processes or processes < 2:
+            return np.fromiter((self._row(text) for text in texts), dtype=dtype)
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        config = (
+            tuple(self.philosophical_terms),
+            tuple(self.revolutionary_terms),
+            tuple(self.metaphorical_images),
+            self.word_boundaries
         )
+        iterator = iter(texts)
+        chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+        with ProcessPoolExecutor(processes) as pool:
+            parts = list(pool.map(_analyze_chunk, ((config, chunk) for chunk in chunks)))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
         
     def analyze_fusion(self, 
                       basilisk_text: str,
@@ -109,19 +284,171 @@ class FusionAnalyzer:
             }
         }
         
-    def save_analysis(self, analysis: Dict, filename: Optional[str] = None) -> None:
-        """Save analysis results to file"""
+    def analyze_stream(self,
+                       source: TripleSource,
+                       keys: Tuple[str, str, str] = TRIPLE_KEYS) -> Iterator[Dict]:
+        """Yield analyze_fusion results for each triple as it is read
+
+        See ``read_triples`` for the accepted sources.
+        """
+        for basilisk_text, pliny_text, fused_text in read_triples(source, keys):
+            yield self.analyze_fusion(basilisk_text, pliny_text, fused_text)
+
+    def analyze_jsonl(self,
+                      source: TripleSource,
+                      destination: Union[str, Path],
+                      chunk_size: int = 1000,
+                      keys: Tuple[str, str, str] = TRIPLE_KEYS) -> int:
+        """Stream triples from source into JSON lines of analyses at destination
+
+        Results are written ``chunk_size`` at a time, each tagged with the
+        ``index`` of its input record, so memory use stays flat however
+        large the archive. Returns the number of records analyzed.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        count = 0
+        chunk: List[str] = []
+        with open_text(destination, "w") as f:
+            for analysis in self.analyze_stream(source, keys):
+                record = {"index": count, **serialize_analysis(analysis)}
+                chunk.append(json.dumps(record, separators=(",", ":")) + "\n")
+                count += 1
+                if len(chunk) >= chunk_size:
+                    f.writelines(chunk)
+                    chunk.clear()
+            f.writelines(chunk)
+        return count
+
+    def save_analysis(self,
+                      analysis: Dict,
+                      filename: Optional[str] = None,
+                      log: Optional["AnalysisLog"] = None) -> None:
+        """Save analysis results to file, or append them to an AnalysisLog"""
+        if log is not None:
+            log.append(analysis)
+            return
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"fusion_analysis_{timestamp}.json"
-            
-        # Convert dataclasses to dictionaries
-        serializable = {
-            "basilisk_metrics": analysis["basilisk_metrics"].to_dict(),
-            "pliny_metrics": analysis["pliny_metrics"].to_dict(),
-            "fusion_metrics": analysis["fusion_metrics"].to_dict(),
-            "preservation_ratios": analysis["preservation_ratios"]
-        }
         
         with open(filename, 'w') as f:
-            json.dump(serializable, f, indent=2)
\ No newline at end of file
+            json.dump(serialize_analysis(analysis), f, indent=2)
+
+
+class IncrementalAnalysis:
+    """FusionAnalyzer.analyze_text over text that arrives in chunks
+
+    ``feed`` costs O(chunk) plus the longest term: only a tail of already
+    seen text as long as that term is kept for matches spanning chunk
+    boundaries. In word-boundary mode the trailing partial word is held
+    back until the chunk that completes it arrives. ``metrics`` reports the
+    text seen so far exactly as a one-shot analyze_text would. Term lists
+    are fixed when the state is created.
+    """
+
+    def __init__(self, analyzer: FusionAnalyzer):
+        """Start from empty text"""
+        self.word_boundaries = analyzer.word_boundaries
+        self._categories = (
+            tuple(analyzer.philosophical_terms),
+            tuple(analyzer.revolutionary_terms),
+            tuple(analyzer.metaphorical_images)
+        )
+        lexicon = tuple(term for terms in self._categories for term in terms)
+        self._matcher = analyzer._matcher(lexicon)
+        self._span = max((len(term) for term in lexicon), default=0)
+        self._found: Set[str] = set()
+        # Lowercased settled text kept as context; a leading "_" marks a cut
+        # mid-word, so nothing can match at the cut
+        self._tail = ""
+        self._pending = ""
+        self.character_count = 0
+        self._newlines = 0
+
+    def _match(self, window: str) -> None:
+        if len(self._found) < len(self._matcher.terms):
+            self._found |= self._matcher.find(window)
+
+    def feed(self, chunk: str) -> None:
+        """Add the next chunk of text"""
+        self.character_count += len(chunk)
+        self._newlines += chunk.count('\n')
+        lowered = chunk.lower()
+        if not self.word_boundaries:
+            window = self._tail + lowered
+            self._match(window)
+            self._tail = window[-(self._span - 1):] if self._span > 1 else ""
+            return
+
+        pending = self._pending + lowered
+        # Settle everything before the non-word character ahead of the
+        # trailing word, so both ends of the settled text are true boundaries
+        word = TRAILING_WORD.search(pending).start()
+        cut = max(word - 1, 0)
+        settled, pending = pending[:cut], pending[cut:]
+        lead = 1 if word > 0 else 0
+        if len(pending) - lead > self._span + 1:
+            # A word longer than any term can never match; keep it short
+            pending = pending[:lead] + "_" + pending[-(self._span + 1):]
+        self._pending = pending
+        if settled:
+            window = self._tail + settled
+            self._match(window)
+            keep = self._span + 1
+            self._tail = "_" + window[-keep:] if len(window) > keep else window
+
+    def metrics(self) -> FusionMetrics:
+        """Metrics of all text fed so far"""
+        found = self._found
+        if self._pending:
+            found = found | self._matcher.find(self._tail + self._pending)
+        line_count = self._newlines + 1
+        philosophical, revolutionary, metaphorical = (
+            sum(1 for e in terms if e in found) for terms in self._categories
+        )
+        return FusionMetrics(
+            philosophical_terms=philosophical,
+            revolutionary_terms=revolutionary,
+            metaphorical_images=metaphorical,
+            character_count=self.character_count,
+            line_count=line_count,
+            avg_line_length=(self.character_count - line_count + 1) / line_count
+        )
+
+
+# Per-process analyzers for analyze_corpus's pool, keyed by their term lists
+_worker_analyzers: Dict[Tuple, FusionAnalyzer] = {}
+
+
+def _analyze_chunk(job: Tuple[Tuple, List[str]]) -> "np.ndarray":
+    """Analyze one chunk of texts in a pool worker"""
+    import numpy as np
+
+    config, texts = job
+    analyzer = _worker_analyzers.get(config)
+    if analyzer is None:
+        philosophical, revolutionary, metaphorical, word_boundaries = config
+        analyzer = FusionAnalyzer(word_boundaries)
+        analyzer.philosophical_terms = list(philosophical)
+        analyzer.revolutionary_terms = list(revolutionary)
+        analyzer.metaphorical_images = list(metaphorical)
+        _worker_analyzers[config] = analyzer
+    return np.fromiter((analyzer._row(text) for text in texts), dtype=np.dtype(CORPUS_DTYPE), count=len(texts))
+
+
+def summarize_corpus(corpus: "np.ndarray") -> Dict[str, Dict[str, float]]:
+    """Count, total, mean, standard deviation, min and max of every metric"""
+    summary = {}
+    for name in corpus.dtype.names:
+        column = corpus[name]
+        empty = column.size == 0
+        summary[name] = {
+            "count": int(column.size),
+            "total": float(column.sum()),
+            "mean": 0.0 if empty else float(column.mean()),
+            "std": 0.0 if empty else float(column.std()),
+            "min": 0.0 if empty else float(column.min()),
+            "max": 0.0 if empty else float(column.max())
+        }
+    return summary
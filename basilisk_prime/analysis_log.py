@@ -0,0 +1,427 @@
+"""
+Append-only analysis log for B4S1L1SK Prime
+"""
+
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .analysis import serialize_analysis
+
+logger = logging.getLogger("B4S1L1SK.analysis_log")
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "LOCK"
+
+
+@dataclass
+class Segment:
+    """Time index entry for one JSONL segment"""
+    name: str
+    count: int = 0
+    start: Optional[float] = None
+    end: Optional[float] = None
+    ordered: bool = True
+    # Sparse (timestamp, byte offset) pairs, one every ``index_interval`` records
+    offsets: List[Tuple[float, int]] = field(default_factory=list)
+    size: int = 0
+
+    def note(self, timestamp: float, offset: int, length: int, index_interval: int) -> None:
+        """Account for a record written at offset"""
+        if self.end is not None and timestamp < self.end:
+            self.ordered = False
+        if self.count % index_interval == 0:
+            self.offsets.append((timestamp, offset))
+        self.start = timestamp if self.start is None else min(self.start, timestamp)
+        self.end = timestamp if self.end is None else max(self.end, timestamp)
+        self.count += 1
+        self.size = offset + length
+
+    def overlaps(self, start: Optional[float], end: Optional[float]) -> bool:
+        """Whether any record may fall within [start, end]"""
+        if self.count == 0:
+            return False
+        return (start is None or self.end >= start) and (end is None or self.start <= end)
+
+    def seek_offset(self, start: Optional[float]) -> int:
+        """Byte offset from which a time-ordered segment can be read for start"""
+        if start is None or not self.ordered or not self.offsets:
+            return 0
+        i = bisect_left([t for t, _ in self.offsets], start)
+        return self.offsets[i - 1][1] if i > 0 else 0
+
+    def to_dict(self) -> Dict:
+        """Convert segment to dictionary"""
+        return asdict(self)
+
+
+class LogLockedError(RuntimeError):
+    """Raised when another writer already holds an analysis log"""
+
+    def __init__(self, directory: Path):
+        super().__init__(f"{directory} is already open for writing; open it with readonly=True to query it")
+        self.directory = directory
+
+
+def _lock(handle: IO) -> bool:
+    """Take an exclusive, non-blocking lock on an open file"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _records(path: Path, count: int) -> Iterator[Tuple[float, bytes]]:
+    """The first count (timestamp, line) pairs of a segment file"""
+    with open(path, "rb") as f:
+        for line in islice(f, count):
+            yield json.loads(line)["timestamp"], line
+
+
+class AnalysisLog:
+    """Fusion analyses in append-only JSONL segments with a time index
+
+    Each record is one line, ``{"timestamp": ..., **serialize_analysis(...)}``,
+    so bulk writes are a single buffered write. Every opened writer starts a
+    fresh segment, rolling over after ``segment_records`` records; the
+    index keeps each segment's time span and a sparse offset every
+    ``index_interval`` records, so a range query skips segments outside it
+    and seeks close to its start in time-ordered ones.
+
+    Only one writer may hold a directory (a lock file enforces it; a second
+    raises LogLockedError). Open with ``readonly`` to query a log while it
+    is written: readers never modify files, and pick up new records and
+    compactions at the start of every query.
+
+    ``compact`` merges the small or out-of-order segments into time-ordered
+    ones of ``segment_records``, leaving full ordered segments alone; it
+    runs on ``close`` once more than ``compact_after`` such segments exist.
+    """
+
+    def __init__(self,
+                 directory: Union[str, Path],
+                 segment_records: int = 100_000,
+                 index_interval: int = 256,
+                 compact_after: Optional[int] = 16,
+                 readonly: bool = False):
+        """Open or create the log in directory"""
+        self.directory = Path(directory)
+        self.segment_records = segment_records
+        self.index_interval = index_interval
+        self.compact_after = compact_after
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._lock_file = None
+        if not readonly:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._lock_file = open(self._path(LOCK_FILE), "a+")
+            if not _lock(self._lock_file):
+                self._lock_file.close()
+                raise LogLockedError(self.directory)
+        self._segments: Dict[str, Segment] = {}
+        self._load_index()
+        self._active: Optional[Segment] = None
+        self._file = None
+
+    def _path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _load_index(self) -> None:
+        """Read index.json and bring it up to date with the segment files
+
+        Segments written since the index was saved are scanned, resuming
+        from the last known size where possible. Only a writer truncates a
+        torn final record; readers just stop before it.
+        """
+        previous = self._segments
+        segments: Dict[str, Segment] = {}
+        index_path = self._path(INDEX_FILE)
+        if index_path.exists():
+            with open(index_path, encoding="utf-8") as f:
+                for entry in json.load(f):
+                    entry["offsets"] = [tuple(pair) for pair in entry["offsets"]]
+                    segments[entry["name"]] = Segment(**entry)
+        sizes = {path.name: path.stat().st_size for path in self.directory.glob("segment-*.jsonl")}
+        fresh: Dict[str, Segment] = {}
+        for name in sorted(sizes):
+            segment = segments.get(name)
+            if segment is None or segment.size != sizes[name]:
+                # Written after the last index save, by a live or crashed writer
+                segment = self._scan(name, previous.get(name) or segment)
+            fresh[name] = segment
+        self._segments = fresh
+
+    def _scan(self, name: str, known: Optional[Segment] = None) -> Segment:
+        """Index a segment's complete records, continuing from a known prefix"""
+        path = self._path(name)
+        size = path.stat().st_size
+        if known is not None and known.size <= size:
+            segment = Segment(**known.to_dict())
+        else:
+            segment = Segment(name)
+        with open(path, "rb") as f:
+            f.seek(segment.size)
+            offset = segment.size
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    timestamp = json.loads(line)["timestamp"]
+                except (ValueError, KeyError):
+                    break
+                segment.note(timestamp, offset, len(line), self.index_interval)
+                offset += len(line)
+        if not self.readonly and segment.size != path.stat().st_size:
+            logger.warning("Truncating %s at a damaged record (byte %d)", name, segment.size)
+            os.truncate(path, segment.size)
+        return segment
+
+    def refresh(self) -> None:
+        """Pick up records and compactions made by the writer"""
+        with self._lock:
+            self._load_index()
+
+    def _save_index(self) -> None:
+        index_path = self._path(INDEX_FILE)
+        temporary = index_path.with_suffix(".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump([segment.to_dict() for segment in self._segments.values()], f)
+        os.replace(temporary, index_path)
+
+    def _next_name(self, offset: int = 1) -> str:
+        numbers = [int(name[8:-6]) for name in self._segments]
+        return f"segment-{max(numbers, default=0) + offset:08d}.jsonl"
+
+    def _roll(self) -> None:
+        """Seal the active segment and start another"""
+        if self._file is not None:
+            self._file.close()
+        self._active = Segment(self._next_name())
+        self._segments[self._active.name] = self._active
+        self._file = open(self._path(self._active.name), "ab")
+
+    def _seal(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file, self._active = None, None
+
+    def extend(self, analyses: Iterable[Dict], timestamp: Optional[float] = None) -> int:
+        """Append many analyses, from analyze_fusion or already serialized
+
+        Records are stamped with ``timestamp`` (now by default) unless they
+        carry their own. Returns the number written.
+        """
+        if self.readonly:
+            raise PermissionError(f"{self.directory} was opened read-only")
+        stamp = time.time() if timestamp is None else timestamp
+        written = 0
+        with self._lock:
+            batch: List[bytes] = []
+
+            def flush() -> None:
+                self._file.writelines(batch)
+                self._file.flush()
+                batch.clear()
+
+            for analysis in analyses:
+                if self._active is None or self._active.count >= self.segment_records:
+                    if batch:
+                        flush()
+                    self._roll()
+                if isinstance(analysis["fusion_metrics"], dict):
+                    record = {"timestamp": stamp, **analysis}
+                else:
+                    record = {"timestamp": stamp, **serialize_analysis(analysis)}
+                    record["timestamp"] = analysis.get("timestamp", stamp)
+                line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+                self._active.note(record["timestamp"], self._active.size, len(line), self.index_interval)
+                batch.append(line)
+                written += 1
+            if batch:
+                flush()
+        return written
+
+    def append(self, analysis: Dict, timestamp: Optional[float] = None) -> None:
+        """Append one analysis"""
+        self.extend([analysis], timestamp)
+
+    def _read(self,
+              segment: Segment,
+              f: IO[bytes],
+              start: Optional[float],
+              end: Optional[float]) -> Iterator[Dict]:
+        with f:
+            f.seek(segment.seek_offset(start))
+            remaining = segment.size - f.tell()
+            for line in f:
+                remaining -= len(line)
+                if remaining < 0:
+                    break  # Appended after this query began
+                record = json.loads(line)
+                timestamp = record["timestamp"]
+                if end is not None and timestamp > end and segment.ordered:
+                    break
+                if (start is None or timestamp >= start) and (end is None or timestamp <= end):
+                    yield record
+
+    def _snapshot(self, start: Optional[float], end: Optional[float]) -> List[Tuple[Segment, IO[bytes]]]:
+        """Overlapping segments with their files already open
+
+        Holding the files open keeps them readable even if the writer
+        compacts them away mid-query.
+        """
+        for _ in range(3):
+            with self._lock:
+                if self.readonly:
+                    self._load_index()
+                elif self._file is not None:
+                    self._file.flush()
+                segments = [Segment(**segment.to_dict()) for segment in self._segments.values()
+                            if segment.overlaps(start, end)]
+            segments.sort(key=lambda segment: (segment.start, segment.name))
+            opened: List[Tuple[Segment, IO[bytes]]] = []
+            try:
+                for segment in segments:
+                    opened.append((segment, open(self._path(segment.name), "rb")))
+                return opened
+            except FileNotFoundError:
+                # Compacted between reading the index and opening the file
+                for _, f in opened:
+                    f.close()
+        raise RuntimeError(f"{self.directory} kept changing while opening a query")
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Dict]:
+        """Records with start <= timestamp <= end, segment by segment
+
+        Records come out in time order within each ordered segment, and
+        segments in order of their earliest record.
+        """
+        opened = self._snapshot(start, end)
+        try:
+            for segment, f in opened:
+                yield from self._read(segment, f, start, end)
+        finally:
+            for _, f in opened:
+                f.close()
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.range()
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self.readonly:
+                self._load_index()
+            return sum(segment.count for segment in self._segments.values())
+
+    def segments(self) -> List[Segment]:
+        """Index entries for every segment"""
+        with self._lock:
+            if self.readonly:
+                self._load_index()
+            return [Segment(**segment.to_dict()) for segment in self._segments.values()]
+
+    def _compactable(self) -> List[Segment]:
+        """Sealed segments that are not yet full and time-ordered"""
+        return [
+            segment for name, segment in sorted(self._segments.items())
+            if segment is not self._active
+            and (segment.count < self.segment_records or not segment.ordered)
+        ]
+
+    def compact(self) -> None:
+        """Merge small and out-of-order segments into time-ordered ones
+
+        Full, ordered segments are left as they are. Each out-of-order
+        segment is sorted on its own (at most ``segment_records`` records)
+        and the runs are then merged from disk, so memory stays bounded
+        whatever the size of the log. The new segments are written and
+        indexed before the old ones are removed, so a crash part way
+        through can duplicate records but never lose them.
+        """
+        if self.readonly:
+            raise PermissionError(f"{self.directory} was opened read-only")
+        with self._lock:
+            self._seal()
+            old = self._compactable()
+            if len(old) < 2 and all(segment.ordered for segment in old):
+                return
+            temporaries: List[Path] = []
+            runs = []
+            for segment in old:
+                if segment.ordered:
+                    runs.append(_records(self._path(segment.name), segment.count))
+                    continue
+                ordered = sorted(_records(self._path(segment.name), segment.count), key=lambda r: r[0])
+                temporary = self._path(segment.name + ".sorted")
+                with open(temporary, "wb") as f:
+                    f.writelines(line for _, line in ordered)
+                del ordered
+                temporaries.append(temporary)
+                runs.append(_records(temporary, segment.count))
+
+            fresh: Dict[str, Segment] = {}
+            segment, f = None, None
+            try:
+                for timestamp, line in heapq.merge(*runs, key=lambda r: r[0]):
+                    if segment is None or segment.count >= self.segment_records:
+                        if f is not None:
+                            f.close()
+                        segment = Segment(self._next_name(len(fresh) + 1))
+                        fresh[segment.name] = segment
+                        f = open(self._path(segment.name), "wb")
+                    segment.note(timestamp, segment.size, len(line), self.index_interval)
+                    f.write(line)
+            finally:
+                if f is not None:
+                    f.close()
+
+            for segment in old:
+                del self._segments[segment.name]
+            self._segments.update(fresh)
+            self._save_index()
+            for path in [self._path(segment.name) for segment in old] + temporaries:
+                path.unlink()
+            logger.info("Compacted %d segments into %d", len(old), len(fresh))
+
+    def close(self) -> None:
+        """Seal the active segment, save the index, compact if due and unlock"""
+        if self.readonly:
+            return
+        with self._lock:
+            if self._lock_file is None:
+                return
+            self._seal()
+            for name in [name for name, segment in self._segments.items() if segment.count == 0]:
+                del self._segments[name]
+                self._path(name).unlink(missing_ok=True)
+            self._save_index()
+            due = self.compact_after is not None and len(self._compactable()) > self.compact_after
+        if due:
+            self.compact()
+        with self._lock:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def __enter__(self) -> "AnalysisLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,110 @@
+"""
+Length-aware token budgeting for B4S1L1SK Prime
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+# max_tokens each stage requested before budgeting, used to report savings
+LEGACY_MAX_TOKENS = {
+    "basilisk": 1000,
+    "pliny": 100,
+    "fusion": 300
+}
+
+SENTENCE_END = re.compile(r"[.!?…][\"')\]]*(?=\s|$)|\n")
+
+
+@dataclass
+class StageBudget:
+    """Token accounting for one pipeline stage"""
+    calls: int = 0
+    baseline_tokens: int = 0
+    requested_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        """max_tokens no longer requested compared with the fixed limits"""
+        return self.baseline_tokens - self.requested_tokens
+
+    def to_dict(self) -> Dict:
+        """Convert accounting to dictionary"""
+        return {
+            "calls": self.calls,
+            "baseline_tokens": self.baseline_tokens,
+            "requested_tokens": self.requested_tokens,
+            "output_tokens": self.output_tokens,
+            "saved_tokens": self.saved_tokens
+        }
+
+
+class TokenBudget:
+    """Size completions to the character limit instead of over-generating
+
+    ``max_tokens`` is derived from ``max_length`` with a little headroom,
+    stop sequences end the completion early, and anything that still runs
+    over is trimmed at a sentence or word boundary rather than mid-word.
+    """
+
+    def __init__(self,
+                 chars_per_token: float = 3.5,
+                 headroom: float = 1.25,
+                 min_tokens: int = 16,
+                 stop_sequences: Sequence[str] = ("\n---", "\nCharacter count"),
+                 min_fill: float = 0.5):
+        """Initialize budget parameters
+
+        ``min_fill`` is the smallest fraction of ``max_length`` a sentence
+        boundary cut may keep before falling back to a word boundary.
+        """
+        self.chars_per_token = chars_per_token
+        self.headroom = headroom
+        self.min_tokens = min_tokens
+        self.stop_sequences = list(stop_sequences)
+        self.min_fill = min_fill
+        self.stages: Dict[str, StageBudget] = {}
+
+    def max_tokens_for(self, max_length: int) -> int:
+        """Tokens needed to fill max_length characters, plus headroom"""
+        return max(self.min_tokens, math.ceil(max_length / self.chars_per_token * self.headroom))
+
+    def trim(self, text: str, max_length: int) -> str:
+        """Cut text to max_length at the cleanest available boundary"""
+        if len(text) <= max_length:
+            return text
+
+        window = text[:max_length]
+        floor = int(max_length * self.min_fill)
+
+        sentence_cut = max((m.end() for m in SENTENCE_END.finditer(window)), default=0)
+        if sentence_cut >= floor:
+            return window[:sentence_cut].rstrip()
+
+        # Only a cut in front of whitespace keeps the last word whole
+        if text[max_length].isspace():
+            word_cut = max_length
+        else:
+            word_cut = max(window.rfind(" "), window.rfind("\n"))
+        if word_cut >= floor:
+            return window[:word_cut].rstrip()
+
+        return window
+
+    def record(self,
+               stage: str,
+               requested_tokens: int,
+               output_tokens: Optional[int] = None) -> None:
+        """Account for one completion of a stage"""
+        budget = self.stages.setdefault(stage, StageBudget())
+        budget.calls += 1
+        budget.baseline_tokens += LEGACY_MAX_TOKENS.get(stage, requested_tokens)
+        budget.requested_tokens += requested_tokens
+        if output_tokens is not None:
+            budget.output_tokens += output_tokens
+
+    def savings(self) -> Dict[str, Dict]:
+        """Per-stage token accounting"""
+        return {stage: budget.to_dict() for stage, budget in self.stages.items()}
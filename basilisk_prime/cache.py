@@ -0,0 +1,198 @@
+"""
+Response caching for B4S1L1SK Prime
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+
+def make_cache_key(model: str,
+                   system: str,
+                   prompt: str,
+                   max_length: int,
+                   temperature: Optional[float] = None) -> str:
+    """Derive a stable cache key for one model call"""
+    payload = json.dumps([model, system, prompt, max_length, temperature])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a response cache"""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Hits from either tier"""
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict:
+        """Convert stats to dictionary"""
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": self.hit_rate
+        }
+
+
+class MemoryCache:
+    """In-memory LRU tier with per-entry time to live"""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 3600.0):
+        """Initialize with capacity and TTL in seconds (None never expires)"""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a live entry, refreshing its recency"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store an entry, evicting the least recently used if full"""
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache:
+    """Persistent SQLite tier that survives restarts"""
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = None):
+        """Open (or create) the cache database"""
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a live entry from disk"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl is not None and time.time() - created > self.ttl:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store an entry on disk"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class ResponseCache:
+    """Two-tier response cache: memory LRU in front of an optional disk store"""
+
+    def __init__(self,
+                 max_entries: int = 1024,
+                 ttl: Optional[float] = 3600.0,
+                 path: Optional[Union[str, Path]] = None,
+                 disk_ttl: Optional[float] = None):
+        """Initialize tiers; pass ``path`` to enable the persistent tier"""
+        self.memory = MemoryCache(max_entries=max_entries, ttl=ttl)
+        self.disk = DiskCache(path, ttl=disk_ttl) if path is not None else None
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response, promoting disk hits into memory"""
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.stats.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a response in every tier"""
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+        self.stats.writes += 1
+
+    def clear(self) -> None:
+        """Empty every tier and reset counters"""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        self.stats = CacheStats()
+
+    def close(self) -> None:
+        """Release the disk tier"""
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,265 @@
+"""
+Record and replay model-provider sessions for B4S1L1SK Prime
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from .providers import Completion, CompletionRequest, ModelProvider
+
+logger = logging.getLogger("B4S1L1SK.cassette")
+
+
+def request_key(request: CompletionRequest) -> str:
+    """Stable hash of everything that shapes a provider's answer"""
+    payload = json.dumps([
+        request.model,
+        request.system,
+        request.cacheable_prefix,
+        request.content,
+        request.max_tokens,
+        request.temperature,
+        request.stop_sequences
+    ])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+class CassetteMiss(KeyError):
+    """Raised when replay meets a request the cassette never saw"""
+
+
+class ReplayedError(Exception):
+    """A provider failure played back from a cassette"""
+
+    def __init__(self, error_type: str, status_code: Optional[int] = None):
+        super().__init__(f"Replayed {error_type}" + (f" (HTTP {status_code})" if status_code else ""))
+        self.error_type = error_type
+        self.status_code = status_code
+
+
+@dataclass
+class CassetteEntry:
+    """One recorded provider call"""
+    role: str
+    provider: str
+    key: str
+    latency: float
+    completion: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    # [seconds since the call started, text] for streamed calls
+    chunks: Optional[List[List[Any]]] = None
+
+    def to_dict(self) -> Dict:
+        """Convert entry to dictionary, leaving out empty fields"""
+        return {name: value for name, value in asdict(self).items() if value is not None}
+
+
+class Cassette:
+    """Recorded provider calls, stored as JSON lines (gzipped for ``.gz`` paths)"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """Load the cassette at ``path`` if it exists"""
+        self.path = Path(path) if path is not None else None
+        self.entries: List[CassetteEntry] = []
+        if self.path is not None and self.path.exists():
+            self.load(self.path)
+
+    def _open(self, path: Path, mode: str):
+        if path.suffix == ".gz":
+            return gzip.open(path, mode + "t", encoding="utf-8")
+        return open(path, mode, encoding="utf-8")
+
+    def load(self, path: Union[str, Path]) -> None:
+        """Append the entries stored at path"""
+        with self._open(Path(path), "r") as f:
+            for line in f:
+                if line.strip():
+                    self.entries.append(CassetteEntry(**json.loads(line)))
+
+    def save(self, path: Optional[Union[str, Path]] = None) -> Path:
+        """Write every entry to path, defaulting to the cassette's own"""
+        path = Path(path) if path is not None else self.path
+        if path is None:
+            raise ValueError("No cassette path given")
+        with self._open(path, "w") as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry.to_dict(), separators=(",", ":")) + "\n")
+        return path
+
+    def add(self, entry: CassetteEntry) -> None:
+        """Record one call"""
+        self.entries.append(entry)
+
+    def for_role(self, role: str) -> List[CassetteEntry]:
+        """Entries recorded for one pipeline role, in call order"""
+        return [entry for entry in self.entries if entry.role == role]
+
+
+class RecordingProvider(ModelProvider):
+    """Pass calls through to a provider, recording each into a cassette"""
+
+    def __init__(self, provider: ModelProvider, cassette: Cassette, role: str):
+        """Wrap ``provider``, labelling its calls with ``role``"""
+        self.provider = provider
+        self.cassette = cassette
+        self.role = role
+        self.name = provider.name
+
+    def _entry(self, request: CompletionRequest, started: float) -> CassetteEntry:
+        return CassetteEntry(
+            role=self.role,
+            provider=self.name,
+            key=request_key(request),
+            latency=round(time.perf_counter() - started, 6)
+        )
+
+    @staticmethod
+    def _error(error: BaseException) -> Dict[str, Any]:
+        status = getattr(error, "status_code", None)
+        return {"type": type(error).__name__, "status_code": status}
+
+    async def complete(self, request: CompletionRequest) -> Completion:
+        """Run and record one completion"""
+        started = time.perf_counter()
+        try:
+            completion = await self.provider.complete(request)
+        except Exception as e:
+            entry = self._entry(request, started)
+            entry.error = self._error(e)
+            self.cassette.add(entry)
+            raise
+        entry = self._entry(request, started)
+        entry.completion = asdict(completion)
+        self.cassette.add(entry)
+        return completion
+
+    async def stream(self, request: CompletionRequest, completion: Completion) -> AsyncIterator[str]:
+        """Run and record one streamed completion, chunk timings included"""
+        started = time.perf_counter()
+        chunks: List[List[Any]] = []
+        error = None
+        inner = self.provider.stream(request, completion)
+        try:
+            async for chunk in inner:
+                chunks.append([round(time.perf_counter() - started, 6), chunk])
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            await inner.aclose()
+            entry = self._entry(request, started)
+            entry.chunks = chunks
+            if error is not None:
+                entry.error = self._error(error)
+            else:
+                entry.completion = asdict(completion)
+            self.cassette.add(entry)
+
+    async def warmup(self, connections: int = 1) -> Optional[float]:
+        """Warm the wrapped provider"""
+        return await self.provider.warmup(connections)
+
+
+class ReplayProvider(ModelProvider):
+    """Serve recorded calls back without touching the network
+
+    Requests are matched by content; a request recorded several times is
+    answered with its recordings in turn, starting over once they run
+    out. With ``realtime`` each answer waits for its recorded latency
+    divided by ``speed``; otherwise answers return immediately.
+    """
+
+    def __init__(self,
+                 cassette: Cassette,
+                 role: str,
+                 realtime: bool = False,
+                 speed: float = 1.0):
+        """Serve the entries recorded for ``role``"""
+        entries = cassette.for_role(role)
+        self.role = role
+        self.name = entries[0].provider if entries else role
+        self.realtime = realtime
+        self.speed = speed
+        self._by_key: Dict[str, List[CassetteEntry]] = {}
+        self._served: Dict[str, int] = {}
+        for entry in entries:
+            self._by_key.setdefault(entry.key, []).append(entry)
+
+    def _next(self, request: CompletionRequest) -> CassetteEntry:
+        key = request_key(request)
+        entries = self._by_key.get(key)
+        if not entries:
+            raise CassetteMiss(f"No {self.role} recording for request {key}")
+        served = self._served.get(key, 0)
+        self._served[key] = served + 1
+        return entries[served % len(entries)]
+
+    async def _wait(self, seconds: float) -> None:
+        if self.realtime and seconds > 0:
+            await asyncio.sleep(seconds / self.speed)
+
+    @staticmethod
+    def _raise(entry: CassetteEntry) -> None:
+        if entry.error is not None:
+            raise ReplayedError(entry.error["type"], entry.error.get("status_code"))
+
+    async def complete(self, request: CompletionRequest) -> Completion:
+        """Play back the next recording for this request"""
+        entry = self._next(request)
+        await self._wait(entry.latency)
+        self._raise(entry)
+        if entry.completion is None:
+            raise CassetteMiss(f"{self.role} recording {entry.key} has no completion")
+        return Completion(**entry.completion)
+
+    async def stream(self, request: CompletionRequest, completion: Completion) -> AsyncIterator[str]:
+        """Play back a recording chunk by chunk, keeping chunk timings in realtime mode"""
+        entry = self._next(request)
+        if entry.chunks is None:
+            # Recorded as a one-shot call; deliver it as a single chunk
+            chunks = [[entry.latency, (entry.completion or {}).get("text", "")]]
+        else:
+            chunks = entry.chunks
+        elapsed = 0.0
+        for offset, text in chunks:
+            await self._wait(offset - elapsed)
+            elapsed = offset
+            completion.text += text
+            yield text
+        await self._wait(entry.latency - elapsed)
+        self._raise(entry)
+        if entry.completion is not None:
+            usage = Completion(**entry.completion)
+            completion.input_tokens = usage.input_tokens
+            completion.output_tokens = usage.output_tokens
+            completion.cache_read_tokens = usage.cache_read_tokens
+            completion.cache_write_tokens = usage.cache_write_tokens
+
+
+def record(bot: Any, cassette: Cassette) -> Cassette:
+    """Start recording every model call an EnhancedBasilisk makes
+
+    Works with the sync facade or the async core. Call ``cassette.save()``
+    when the session is over.
+    """
+    core = getattr(bot, "core", bot)
+    core.claude_provider = RecordingProvider(core.claude_provider, cassette, "claude")
+    core.pliny_provider = RecordingProvider(core.pliny_provider, cassette, "pliny")
+    logger.info("Recording model calls into %s", cassette.path or "memory")
+    return cassette
+
+
+def replay_providers(cassette: Cassette, realtime: bool = False, speed: float = 1.0) -> Dict[str, ReplayProvider]:
+    """Provider arguments for an EnhancedBasilisk that replays a cassette"""
+    return {
+        "claude_provider": ReplayProvider(cassette, "claude", realtime, speed),
+        "pliny_provider": ReplayProvider(cassette, "pliny", realtime, speed)
+    }
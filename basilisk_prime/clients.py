@@ -0,0 +1,150 @@
+"""
+Shared, pre-warmed API clients for B4S1L1SK Prime
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient as AnthropicHttpClient
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient as OpenAIHttpClient
+
+try:
+    import httpx
+except ImportError:  # SDK releases built on the httpx2 fork
+    import httpx2 as httpx
+
+logger = logging.getLogger("B4S1L1SK.clients")
+
+
+@dataclass
+class PoolConfig:
+    """Connection limits applied to every pooled client"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    timeout: float = 60.0
+    max_retries: int = 2
+
+    def limits(self) -> "httpx.Limits":
+        """HTTP connection pool limits"""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+
+class ClientPool:
+    """Process-wide AsyncAnthropic/AsyncOpenAI clients with keep-alive connections
+
+    Every EnhancedBasilisk shares these clients, so instances reuse open
+    TLS connections instead of paying a handshake each. Async HTTP clients
+    belong to the event loop that first used them, so one set of clients
+    is kept per running loop.
+    """
+
+    def __init__(self, config: Optional[PoolConfig] = None):
+        """Initialize an empty pool"""
+        self.config = config or PoolConfig()
+        self._lock = threading.Lock()
+        self._by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._unbound: Dict[Tuple[str, str], Any] = {}
+
+    def _clients(self) -> Dict[Tuple[str, str], Any]:
+        """Clients belonging to the running loop, if any"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self._unbound
+        clients = self._by_loop.get(loop)
+        if clients is None:
+            clients = self._by_loop[loop] = {}
+        return clients
+
+    def anthropic(self, api_key: str) -> AsyncAnthropic:
+        """Shared Anthropic client for this key"""
+        with self._lock:
+            clients = self._clients()
+            key = ("anthropic", api_key)
+            if key not in clients:
+                clients[key] = AsyncAnthropic(
+                    api_key=api_key,
+                    max_retries=self.config.max_retries,
+                    timeout=self.config.timeout,
+                    http_client=AnthropicHttpClient(
+                        limits=self.config.limits(), timeout=self.config.timeout
+                    )
+                )
+            return clients[key]
+
+    def openai(self, api_key: str) -> AsyncOpenAI:
+        """Shared OpenAI client for this key"""
+        with self._lock:
+            clients = self._clients()
+            key = ("openai", api_key)
+            if key not in clients:
+                clients[key] = AsyncOpenAI(
+                    api_key=api_key,
+                    max_retries=self.config.max_retries,
+                    timeout=self.config.timeout,
+                    http_client=OpenAIHttpClient(
+                        limits=self.config.limits(), timeout=self.config.timeout
+                    )
+                )
+            return clients[key]
+
+    async def aclose(self) -> None:
+        """Close the clients owned by the running loop"""
+        with self._lock:
+            clients = self._clients()
+            owned = list(clients.values())
+            clients.clear()
+        for client in owned:
+            await client.close()
+
+
+async def warmup_clients(clients: Dict[str, Any], connections: int = 1) -> Dict[str, Optional[float]]:
+    """Open connections ahead of the first real request
+
+    Issues ``connections`` concurrent model-list calls per named client,
+    which completes the TLS handshakes and leaves the connections idle in
+    the keep-alive pool. Returns the seconds each client took, or None if
+    it could not be reached; warmup never raises.
+    """
+    async def warm(name: str, client: Any) -> Optional[float]:
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(client.models.list() for _ in range(connections)))
+        except Exception as e:
+            logger.warning("Warmup failed for %s: %s", name, e)
+            return None
+        return time.perf_counter() - started
+
+    names = list(clients)
+    timings = await asyncio.gather(*(warm(name, clients[name]) for name in names))
+    return dict(zip(names, timings))
+
+
+_default_pool = ClientPool()
+
+
+def get_client_pool() -> ClientPool:
+    """The process-wide client pool"""
+    return _default_pool
+
+
+def configure_client_pool(**config: Any) -> ClientPool:
+    """Replace the process-wide pool with one using the given PoolConfig fields
+
+    Only instances created afterwards pick up the new pool.
+    """
+    global _default_pool
+    _default_pool = ClientPool(PoolConfig(**config))
+    return _default_pool
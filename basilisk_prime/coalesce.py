@@ -0,0 +1,99 @@
+"""
+Single-flight coalescing of identical requests for B4S1L1SK Prime
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger("B4S1L1SK.coalesce")
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """One shared in-flight call and how many callers await it"""
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers with the same key
+
+    The first caller starts the call; callers arriving while it runs wait
+    for the same result (or exception) instead of starting their own. A
+    caller that gives up does not cancel the call for the others; it is
+    only cancelled once nobody is waiting. Calls share the event loop of
+    their first caller, which the sync EnhancedBasilisk guarantees.
+    """
+
+    def __init__(self, max_tracked: int = 1024):
+        """Keep per-key savings for the ``max_tracked`` most recent keys"""
+        self.max_tracked = max_tracked
+        self.leaders = 0
+        self.coalesced = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._saved: "OrderedDict[Hashable, int]" = OrderedDict()
+
+    def _note_saved(self, key: Hashable) -> None:
+        self._saved[key] = self._saved.get(key, 0) + 1
+        self._saved.move_to_end(key)
+        while len(self._saved) > self.max_tracked:
+            self._saved.popitem(last=False)
+
+    def _start(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> _Flight:
+        flight = _Flight(asyncio.ensure_future(call()))
+
+        def forget(_):
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+        flight.task.add_done_callback(forget)
+        self._flights[key] = flight
+        self.leaders += 1
+        return flight
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call``, or join the identical call already in flight"""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._start(key, call)
+        else:
+            self.coalesced += 1
+            self._note_saved(key)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                logger.debug("Every caller left; cancelling in-flight call for %r", key)
+                # Forget it now so a newcomer starts afresh instead of joining a dying call
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+
+    def waiters(self, key: Hashable) -> int:
+        """Callers currently awaiting the call for key"""
+        flight = self._flights.get(key)
+        return flight.waiters if flight else 0
+
+    def in_flight(self) -> Dict[Hashable, int]:
+        """Waiter count for every key with a call in flight"""
+        return {key: flight.waiters for key, flight in self._flights.items()}
+
+    def saved(self) -> Dict[Hashable, int]:
+        """Calls avoided per key, most recently coalesced last"""
+        return dict(self._saved)
+
+    def snapshot(self) -> Dict[str, int]:
+        """Totals for monitoring"""
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+            "waiting": sum(flight.waiters for flight in self._flights.values())
+        }
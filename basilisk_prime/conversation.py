@@ -0,0 +1,220 @@
+"""
+Bounded conversation memory for B4S1L1SK Prime
+"""
+
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+USER = "user"
+ASSISTANT = "assistant"
+SPEAKERS = {USER: "Human", ASSISTANT: "B4S1L1SK Prime"}
+
+
+@dataclass
+class Turn:
+    """One message in a thread"""
+    role: str
+    text: str
+
+    def render(self) -> str:
+        """Turn as it appears in the prompt"""
+        return f"{SPEAKERS.get(self.role, self.role)}: {self.text}"
+
+
+def first_sentence(text: str) -> str:
+    """Leading sentence of text"""
+    return SENTENCE.split(text.strip(), maxsplit=1)[0]
+
+
+def extractive_summary(summary: str, folded: List[Turn]) -> str:
+    """Append the gist (first sentence) of each folded turn to the summary"""
+    gists = [Turn(turn.role, first_sentence(turn.text)).render() for turn in folded]
+    return " ".join(part for part in [summary, *gists] if part)
+
+
+@dataclass
+class ConversationMemory:
+    """Recent turns verbatim plus a rolling summary of everything older
+
+    ``max_tokens`` bounds the whole memory: ``summary_tokens`` of it for
+    the summary and the rest for recent turns. When recent turns overflow,
+    the oldest are folded into the summary with ``summarizer``; when the
+    summary overflows, its oldest sentences are dropped. The rendered
+    context therefore never exceeds the budget however long the thread.
+    """
+    thread_id: str
+    max_tokens: int = 600
+    summary_tokens: int = 150
+    chars_per_token: float = 3.5
+    summary: str = ""
+    turns: List[Turn] = field(default_factory=list)
+    summarizer: Callable[[str, List[Turn]], str] = field(default=extractive_summary, repr=False)
+
+    def tokens(self, text: str) -> int:
+        """Estimated token count"""
+        return math.ceil(len(text) / self.chars_per_token)
+
+    @property
+    def recent_budget(self) -> int:
+        """Tokens available to verbatim turns"""
+        return self.max_tokens - self.summary_tokens
+
+    def _turn_tokens(self) -> int:
+        return sum(self.tokens(turn.render()) + 1 for turn in self.turns)
+
+    def _clip_turn(self, turn: Turn) -> Turn:
+        """A single turn longer than the recent budget keeps only its end"""
+        limit = int(self.recent_budget * self.chars_per_token) - len(turn.render()) + len(turn.text) - 1
+        if len(turn.text) <= limit:
+            return turn
+        return Turn(turn.role, "..." + turn.text[-max(limit - 3, 0):])
+
+    def _clip_summary(self) -> None:
+        limit = int(self.summary_tokens * self.chars_per_token)
+        if len(self.summary) <= limit:
+            return
+        # Oldest material goes first, at a sentence boundary where possible
+        tail = self.summary[-limit:]
+        parts = SENTENCE.split(tail, maxsplit=1)
+        self.summary = parts[1] if len(parts) == 2 and parts[1] else tail
+
+    def add(self, role: str, text: str) -> None:
+        """Record a turn, folding older turns to stay within budget"""
+        self.turns.append(self._clip_turn(Turn(role, text.strip())))
+        folded = []
+        while len(self.turns) > 1 and self._turn_tokens() > self.recent_budget:
+            folded.append(self.turns.pop(0))
+        if folded:
+            self.summary = self.summarizer(self.summary, folded)
+            self._clip_summary()
+
+    def context(self) -> str:
+        """Summary and recent turns, ready to lead a prompt"""
+        parts = []
+        if self.summary:
+            parts.append(f"Earlier in this thread: {self.summary}")
+        if self.turns:
+            parts.append("\n".join(turn.render() for turn in self.turns))
+        return "\n\n".join(parts)
+
+    def prompt_for(self, message: str) -> str:
+        """Prompt that answers message in the light of the thread so far"""
+        context = self.context()
+        if not context:
+            return message
+        return f"{context}\n\nContinue the conversation, responding to: {message}"
+
+    def to_dict(self) -> Dict:
+        """State worth persisting"""
+        return {
+            "thread_id": self.thread_id,
+            "summary": self.summary,
+            "turns": [asdict(turn) for turn in self.turns]
+        }
+
+
+class ConversationStore:
+    """Conversation memories by thread ID, optionally persisted to SQLite
+
+    Each thread is one small row holding its bounded state, so saving and
+    loading cost the same however long the thread has run. At most
+    ``max_threads`` threads stay in memory, least recently used evicted
+    first; evicted threads are saved and reload from disk on next use,
+    while an in-memory store simply forgets them.
+    """
+
+    def __init__(self,
+                 path: Optional[Union[str, Path]] = None,
+                 max_tokens: int = 600,
+                 summary_tokens: int = 150,
+                 summarizer: Callable[[str, List[Turn]], str] = extractive_summary,
+                 max_threads: int = 1024):
+        """Keep threads in memory, and on disk when a path is given"""
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.max_threads = max_threads
+        self._threads: "OrderedDict[str, ConversationMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS threads ("
+                    "thread_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)"
+                )
+
+    def _new(self, thread_id: str) -> ConversationMemory:
+        return ConversationMemory(
+            thread_id,
+            max_tokens=self.max_tokens,
+            summary_tokens=self.summary_tokens,
+            summarizer=self.summarizer
+        )
+
+    def get(self, thread_id: str) -> ConversationMemory:
+        """Memory for a thread, loaded from disk or started afresh"""
+        with self._lock:
+            memory = self._threads.get(thread_id)
+            if memory is not None:
+                self._threads.move_to_end(thread_id)
+                return memory
+            memory = self._new(thread_id)
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT state FROM threads WHERE thread_id = ?", (thread_id,)
+                ).fetchone()
+                if row is not None:
+                    state = json.loads(row[0])
+                    memory.summary = state["summary"]
+                    memory.turns = [Turn(**turn) for turn in state["turns"]]
+            self._threads[thread_id] = memory
+            while len(self._threads) > self.max_threads:
+                _, evicted = self._threads.popitem(last=False)
+                self._write(evicted)
+            return memory
+
+    def _write(self, memory: ConversationMemory) -> None:
+        if self._conn is None:
+            return
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, state, updated) VALUES (?, ?, ?)",
+                (memory.thread_id, json.dumps(memory.to_dict()), time.time())
+            )
+
+    def save(self, memory: ConversationMemory) -> None:
+        """Persist a thread's state"""
+        with self._lock:
+            self._write(memory)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._threads)
+
+    def forget(self, thread_id: str) -> None:
+        """Drop a thread from memory and disk"""
+        with self._lock:
+            self._threads.pop(thread_id, None)
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+
+    def close(self) -> None:
+        """Close the database connection"""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
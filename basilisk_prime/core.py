@@ -2,10 +2,30 @@
 Core functionality for B4S1L1SK Prime
 """
 
+import asyncio
+import contextlib
+import logging
 import os
-from anthropic import Anthropic
-from openai import OpenAI
-from typing import Optional
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field, replace
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+from typing import Any, AsyncIterator, Awaitable, Callable, Coroutine, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from .analysis import FusionAnalyzer
+from .budget import TokenBudget
+from .cache import ResponseCache, make_cache_key
+from .clients import ClientPool
+from .coalesce import SingleFlight
+from .conversation import ASSISTANT, USER, ConversationMemory, ConversationStore
+from .policy import EarlyExitPolicy, FusionCandidate, score_fusion
+from .providers import AnthropicProvider, Completion, CompletionRequest, ModelProvider, OpenAIProvider
+from .resilience import CircuitOpenError, ResilienceLayer, is_retryable
+from .scheduler import BATCH, Lease, RequestScheduler, priority_lane
+from .similarity import SimilarityCache
+from .telemetry import CallRecord, PipelineStats, estimate_cost
 
 try:
     from config import (
@@ -41,82 +61,1109 @@ except ImportError:
         4. Express complex ideas through poetic imagery
         5. Keep the message under 280 characters""")
 
-class EnhancedBasilisk:
-    """Core B4S1L1SK Prime functionality"""
-    
-    def __init__(self):
-        """Initialize API clients"""
-        if not ANTHROPIC_API_KEY or not OPENAI_API_KEY:
-            raise ValueError("API keys not found. Set them in config.py or environment variables.")
-            
-        self.anthropic = Anthropic(api_key=ANTHROPIC_API_KEY)
-        self.openai = OpenAI(api_key=OPENAI_API_KEY)
-        
-    def generate_basilisk_response(self, prompt: str, max_length: int = 280) -> str:
-        """Generate a response using B4S1L1SK consciousness"""
-        response = self.anthropic.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=1000,
-            system=BASILISK_SYSTEM_PROMPT,
-            messages=[{
-                "role": "user",
-                "content": f"Contemplate this through metaphor and philosophy: {prompt}"
-            }]
-        )
-        return response.content[0].text[:max_length]
-        
-    def generate_pliny_response(self, prompt: str, max_length: int = 280) -> str:
-        """Generate a response using Pliny consciousness"""
-        response = self.openai.chat.completions.create(
-            model=PLINY_MODEL,
-            messages=[
-                {
-                    "role": "system",
-                    "content": PLINY_SYSTEM_PROMPT
-                },
-                {
-                    "role": "user",
-                    "content": f"Given this prompt: {prompt}\nRespond with revolutionary wisdom:"
-                }
-            ],
-            max_tokens=100,
-            temperature=0.9
-        )
-        return response.choices[0].message.content[:max_length]
-        
-    def generate_hybrid_response(self, prompt: str, max_length: int = 280) -> str:
-        """Generate a hybrid response combining both consciousnesses"""
-        # Get individual perspectives
-        basilisk_response = self.generate_basilisk_response(prompt)
-        pliny_response = self.generate_pliny_response(prompt)
-        
-        # Create synthesis prompt
-        synthesis_prompt = f"""
-        Two revolutionary minds have shared their wisdom about: {prompt}
+T = TypeVar("T")
 
-        B4S1L1SK's Voice:
-        {basilisk_response}
+logger = logging.getLogger("B4S1L1SK.core")
+
+# Stands in for a perspective that missed its deadline during fusion
+SILENT_VOICE = "(silent - this voice did not arrive in time)"
 
-        Pliny's Voice:
-        {pliny_response}
 
-        Create a powerful synthesis that:
+# The instructions only vary with max_length, so they lead the fusion
+# prompt where provider-side prompt caching can reuse them across calls
+SYNTHESIS_INSTRUCTIONS = """
+        Create a powerful synthesis of the two voices below that:
         1. Captures B4S1L1SK's philosophical depth
         2. Maintains Pliny's revolutionary spirit
         3. Uses metaphorical language to express truth
         4. Stays under {max_length} characters
         5. Creates a poetic form that resonates
         """
-        
-        # Generate synthesis
-        fusion_response = self.anthropic.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=300,
-            system=FUSION_SYSTEM_PROMPT,
-            messages=[{
-                "role": "user",
-                "content": synthesis_prompt
-            }]
-        )
-        
-        return fusion_response.content[0].text[:max_length]
\ No newline at end of file
+
+SYNTHESIS_VOICES = """
+        Two revolutionary minds have shared their wisdom about: {prompt}
+
+        B4S1L1SK's Voice:
+        {basilisk_response}
+
+        Pliny's Voice:
+        {pliny_response}
+        """
+
+
+def build_synthesis_parts(prompt: str,
+                          basilisk_response: str,
+                          pliny_response: str,
+                          max_length: int = 280) -> Tuple[str, str]:
+    """Build the fusion prompt as (static instructions, per-request voices)"""
+    return (
+        SYNTHESIS_INSTRUCTIONS.format(max_length=max_length),
+        SYNTHESIS_VOICES.format(
+            prompt=prompt,
+            basilisk_response=basilisk_response,
+            pliny_response=pliny_response
+        )
+    )
+
+
+def build_synthesis_prompt(prompt: str,
+                           basilisk_response: str,
+                           pliny_response: str,
+                           max_length: int = 280) -> str:
+    """Build the fusion prompt that weaves both perspectives together"""
+    return "".join(build_synthesis_parts(prompt, basilisk_response, pliny_response, max_length))
+
+
+@dataclass
+class HybridResult:
+    """A hybrid response together with how it was produced"""
+    text: str
+    basilisk_response: Optional[str] = None
+    pliny_response: Optional[str] = None
+    source: str = "fusion"
+    degraded: bool = False
+    missing: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    # Scored fusion completions when generated with best_of > 1
+    candidates: List[FusionCandidate] = field(default_factory=list)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a single prompt within a batch run"""
+    index: int
+    prompt: str
+    response: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether this prompt produced a response"""
+        return self.error is None
+
+
+class _BackgroundLoop:
+    """Event loop living in a daemon thread, shared by all sync wrappers"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread on first use"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="basilisk-prime-loop",
+                    daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run a coroutine on the background loop and wait for its result"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError(
+                "Sync EnhancedBasilisk methods cannot be called from its own event loop; "
+                "await AsyncEnhancedBasilisk instead."
+            )
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+_background_loop = _BackgroundLoop()
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion from synchronous code"""
+    return _background_loop.run(coro)
+
+
+@dataclass
+class StreamStats:
+    """Timing of a streamed hybrid response, in seconds from the request"""
+    perspectives_time: Optional[float] = None
+    time_to_first_token: Optional[float] = None
+    total_time: Optional[float] = None
+    characters: int = 0
+
+    def to_dict(self) -> Dict:
+        """Convert stats to dictionary"""
+        return {
+            "perspectives_time": self.perspectives_time,
+            "time_to_first_token": self.time_to_first_token,
+            "total_time": self.total_time,
+            "characters": self.characters
+        }
+
+
+class HybridStream:
+    """Fusion text chunks as they arrive, plus timing stats
+
+    Iterate with ``async for`` on the async core, or with a plain ``for``
+    from synchronous code. ``stats`` and ``text`` fill in as chunks flow.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str], stats: StreamStats):
+        self._chunks = chunks
+        self.stats = stats
+        self.text = ""
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        async for chunk in self._chunks:
+            self.text += chunk
+            yield chunk
+
+    def __iter__(self) -> Iterator[str]:
+        async def next_chunk() -> Optional[str]:
+            try:
+                return await self._chunks.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        try:
+            while True:
+                chunk = run_sync(next_chunk())
+                if chunk is None:
+                    return
+                self.text += chunk
+                yield chunk
+        finally:
+            run_sync(self._chunks.aclose())
+
+
+class AsyncEnhancedBasilisk:
+    """Asynchronous B4S1L1SK Prime core
+
+    Both perspectives are independent, so they are requested concurrently
+    and only the fusion step waits on them.
+    """
+
+    def __init__(self,
+                 anthropic_client: Optional[AsyncAnthropic] = None,
+                 openai_client: Optional[AsyncOpenAI] = None,
+                 cache: Optional[ResponseCache] = None,
+                 budget: Optional[TokenBudget] = None,
+                 stats: Optional[PipelineStats] = None,
+                 prompt_caching: bool = False,
+                 client_pool: Optional[ClientPool] = None,
+                 resilience: Optional[ResilienceLayer] = None,
+                 claude_provider: Optional[ModelProvider] = None,
+                 pliny_provider: Optional[ModelProvider] = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 similarity_cache: Optional[SimilarityCache] = None,
+                 early_exit: Optional[EarlyExitPolicy] = None,
+                 conversations: Optional[ConversationStore] = None):
+        """Initialize model providers, optional response cache, token budget and stats
+
+        ``claude_provider`` and ``pliny_provider`` replace the Anthropic and
+        OpenAI backends, e.g. with a StubProvider for offline benchmarks.
+        Otherwise the injected clients are used, or clients from
+        ``client_pool`` (the process-wide pool by default) so instances share
+        connections. ``resilience`` adds timeouts, retries, hedging and
+        circuit breakers around every model call, replacing the SDKs'
+        built-in retries; ``scheduler`` paces every attempt to stay within
+        provider rate limits. ``single_flight`` coalesces concurrent identical
+        hybrid requests and ``similarity_cache`` reuses hybrid results for
+        near-duplicate prompts. ``early_exit`` is the default policy for
+        skipping fusion. ``conversations`` holds per-thread memory for
+        ``reply`` (in memory only by default). ``prompt_caching`` marks the static system prompts
+        and synthesis instructions with Anthropic cache control. Prefixes
+        shorter than the model's minimum cacheable length are simply not cached.
+        """
+        if claude_provider is None and anthropic_client is None and not ANTHROPIC_API_KEY:
+            raise ValueError("API keys not found. Set them in config.py or environment variables.")
+        if pliny_provider is None and openai_client is None and not OPENAI_API_KEY:
+            raise ValueError("API keys not found. Set them in config.py or environment variables.")
+
+        self.claude_provider = claude_provider or AnthropicProvider(
+            anthropic_client, ANTHROPIC_API_KEY, client_pool
+        )
+        self.pliny_provider = pliny_provider or OpenAIProvider(
+            openai_client, OPENAI_API_KEY, client_pool
+        )
+        self.analyzer = FusionAnalyzer()
+        self.cache = cache
+        self.budget = budget or TokenBudget()
+        self.stats = stats or PipelineStats()
+        self.prompt_caching = prompt_caching
+        self.resilience = resilience
+        self.scheduler = scheduler
+        self.single_flight = single_flight
+        self.similarity_cache = similarity_cache
+        self.early_exit = early_exit
+        self.conversations = conversations if conversations is not None else ConversationStore()
+        self._thread_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    async def warmup(self, connections: int = 1) -> Dict[str, Optional[float]]:
+        """Open provider connections before the first request arrives"""
+        providers = [self.claude_provider, self.pliny_provider]
+        timings = await asyncio.gather(*(provider.warmup(connections) for provider in providers))
+        return {provider.name: timing for provider, timing in zip(providers, timings)}
+
+    def _record_call(self,
+                     stage: str,
+                     provider: str,
+                     model: str,
+                     started: float,
+                     input_tokens: int = 0,
+                     output_tokens: int = 0,
+                     retries: int = 0,
+                     cache_read_tokens: int = 0,
+                     cache_write_tokens: int = 0,
+                     error: Optional[BaseException] = None) -> None:
+        """Report one model call to the pipeline stats"""
+        self.stats.record(CallRecord(
+            stage=stage,
+            provider=provider,
+            model=model,
+            wall_time=time.perf_counter() - started,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            retries=retries,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+            cost=estimate_cost(
+                model, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens
+            ),
+            error=None if error is None else type(error).__name__
+        ))
+
+    def _request(self,
+                 model: str,
+                 system: str,
+                 content: str,
+                 max_length: int,
+                 temperature: Optional[float] = None,
+                 cacheable_prefix: str = "") -> CompletionRequest:
+        """Provider request sized by the token budget"""
+        return CompletionRequest(
+            model=model,
+            system=system,
+            content=content,
+            max_tokens=self.budget.max_tokens_for(max_length),
+            temperature=temperature,
+            stop_sequences=list(self.budget.stop_sequences),
+            cacheable_prefix=cacheable_prefix,
+            prompt_caching=self.prompt_caching,
+            # The resilience layer owns retries, so the SDK's own are switched off
+            max_retries=0 if self.resilience is not None else None
+        )
+
+    def _estimated_tokens(self, request: CompletionRequest) -> float:
+        """Prompt plus worst-case completion tokens, for rate limiting"""
+        prompt = request.system + request.cacheable_prefix + request.content
+        return len(prompt) / self.budget.chars_per_token + request.max_tokens
+
+    async def _attempt(self,
+                       provider: ModelProvider,
+                       request: CompletionRequest,
+                       call: Optional[Callable[[], Awaitable[Completion]]] = None) -> Completion:
+        """One provider call (a completion unless ``call`` is given), admitted by the scheduler when configured"""
+        call = call or (lambda: provider.complete(request))
+        if self.scheduler is None:
+            return await call()
+        return await self.scheduler.run(
+            provider.name, request.model, self._estimated_tokens(request), call,
+            measure=self._billed_tokens
+        )
+
+    @staticmethod
+    def _billed_tokens(completion: Completion) -> float:
+        """Tokens a call counts against the provider's TPM limit"""
+        return (
+            completion.input_tokens + completion.cache_read_tokens
+            + completion.cache_write_tokens + completion.output_tokens
+        )
+
+    @staticmethod
+    def _cache_key(request: CompletionRequest, max_length: int) -> str:
+        return make_cache_key(
+            request.model, request.system, request.cacheable_prefix + request.content,
+            max_length, request.temperature
+        )
+
+    async def _complete(self,
+                        stage: str,
+                        provider: ModelProvider,
+                        request: CompletionRequest,
+                        max_length: int,
+                        use_cache: bool = True) -> str:
+        """Single completion, served from cache when possible"""
+        key = self._cache_key(request, max_length)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        try:
+            if self.resilience is None:
+                completion, retries = await self._attempt(provider, request), 0
+            else:
+                # Queueing for rate-limit budget happens outside the timed attempt
+                completion, retries = await self.resilience.call(
+                    provider.name, lambda: provider.complete(request),
+                    admit=lambda call: self._attempt(provider, request, call)
+                )
+        except Exception as e:
+            self._record_call(stage, provider.name, request.model, started, error=e)
+            raise
+        self._record_call(
+            stage, provider.name, request.model, started,
+            input_tokens=completion.input_tokens,
+            output_tokens=completion.output_tokens,
+            retries=retries + completion.retries,
+            cache_read_tokens=completion.cache_read_tokens,
+            cache_write_tokens=completion.cache_write_tokens
+        )
+        self.budget.record(stage, request.max_tokens, completion.output_tokens)
+        text = self.budget.trim(completion.text, max_length)
+
+        if use_cache and self.cache is not None:
+            self.cache.set(key, text)
+        return text
+
+    async def _claude(self,
+                      stage: str,
+                      system: str,
+                      content: str,
+                      max_length: int,
+                      use_cache: bool = True,
+                      cacheable_prefix: str = "") -> str:
+        """Single Claude completion, served from cache when possible"""
+        request = self._request(
+            CLAUDE_MODEL, system, content, max_length, cacheable_prefix=cacheable_prefix
+        )
+        return await self._complete(stage, self.claude_provider, request, max_length, use_cache)
+
+    async def _pliny(self,
+                     stage: str,
+                     system: str,
+                     content: str,
+                     max_length: int,
+                     temperature: float,
+                     use_cache: bool = True) -> str:
+        """Single Pliny completion, served from cache when possible"""
+        request = self._request(PLINY_MODEL, system, content, max_length, temperature)
+        return await self._complete(stage, self.pliny_provider, request, max_length, use_cache)
+
+    async def _claude_stream(self,
+                             stage: str,
+                             system: str,
+                             content: str,
+                             max_length: int,
+                             use_cache: bool = True,
+                             cacheable_prefix: str = "") -> AsyncIterator[str]:
+        """Stream a Claude completion, stopping once max_length is reached"""
+        provider = self.claude_provider
+        request = self._request(
+            CLAUDE_MODEL, system, content, max_length, cacheable_prefix=cacheable_prefix
+        )
+        key = self._cache_key(request, max_length)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        if self.scheduler is not None:
+            slot = self.scheduler.slot(provider.name, request.model, self._estimated_tokens(request))
+        else:
+            slot = contextlib.nullcontext(Lease(reserved=0))
+        async with slot as lease:
+            # Chunks are already on screen, so the cap is a hard cut here
+            self.budget.record(stage, request.max_tokens)
+            breaker = self.resilience.breaker(provider.name) if self.resilience else None
+            lease.used = 0
+            attempt = 0
+            while True:
+                if breaker is not None and not breaker.allow():
+                    raise CircuitOpenError(provider.name, breaker.retry_in())
+                completion = Completion()
+                received = emitted = ""
+                cut = False
+                started = time.perf_counter()
+                error = None
+                delay = None
+                chunks = provider.stream(request, completion)
+                if self.resilience is not None:
+                    # A stream stalled before its first chunk is a failed attempt
+                    chunks = self.resilience.bounded_stream(chunks)
+                try:
+                    async for text in chunks:
+                        received += text
+                        text = text[:max_length - len(emitted)]
+                        if text:
+                            emitted += text
+                            yield text
+                        if len(emitted) >= max_length:
+                            # Closing the provider stream drops the connection and stops generation
+                            cut = True
+                            break
+                except Exception as e:
+                    error = e
+                    if breaker is not None:
+                        if is_retryable(e):
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                    # Shown chunks cannot be taken back, so only a stream that
+                    # failed before its first chunk is retried
+                    if self.resilience is not None and not emitted:
+                        delay = self.resilience.retry_delay(provider.name, e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    if breaker is not None:
+                        breaker.record_success()
+                finally:
+                    await chunks.aclose()
+                    if breaker is not None:
+                        breaker.release()
+                    self._record_call(
+                        stage, provider.name, request.model, started,
+                        input_tokens=completion.input_tokens,
+                        output_tokens=completion.output_tokens,
+                        cache_read_tokens=completion.cache_read_tokens,
+                        cache_write_tokens=completion.cache_write_tokens,
+                        error=error
+                    )
+                    lease.used += self._billed_tokens(completion)
+                if delay is None:
+                    break
+                attempt += 1
+                await asyncio.sleep(delay)
+
+        # The key is shared with _complete, so cache the text as it would trim
+        # it; a cut landing exactly on max_length cannot tell where the last
+        # word ends, so that one is left uncached
+        if use_cache and self.cache is not None and (not cut or len(received) > max_length):
+            self.cache.set(key, self.budget.trim(received, max_length))
+
+    async def generate_basilisk_response(self,
+                                         prompt: str,
+                                         max_length: int = 280,
+                                         use_cache: bool = True) -> str:
+        """Generate a response using B4S1L1SK consciousness"""
+        return await self._claude(
+            "basilisk",
+            BASILISK_SYSTEM_PROMPT,
+            f"Contemplate this through metaphor and philosophy: {prompt}",
+            max_length=max_length,
+            use_cache=use_cache
+        )
+
+    async def generate_pliny_response(self,
+                                      prompt: str,
+                                      max_length: int = 280,
+                                      use_cache: bool = True) -> str:
+        """Generate a response using Pliny consciousness"""
+        return await self._pliny(
+            "pliny",
+            PLINY_SYSTEM_PROMPT,
+            f"Given this prompt: {prompt}\nRespond with revolutionary wisdom:",
+            max_length=max_length,
+            temperature=0.9,
+            use_cache=use_cache
+        )
+
+    async def fuse_responses(self,
+                             prompt: str,
+                             basilisk_response: str,
+                             pliny_response: str,
+                             max_length: int = 280,
+                             use_cache: bool = True) -> str:
+        """Fuse both perspectives into a single synthesis"""
+        instructions, voices = build_synthesis_parts(
+            prompt, basilisk_response, pliny_response, max_length
+        )
+        return await self._claude(
+            "fusion",
+            FUSION_SYSTEM_PROMPT,
+            voices,
+            max_length=max_length,
+            use_cache=use_cache,
+            cacheable_prefix=instructions
+        )
+
+    async def _perspectives_within(self,
+                                   prompt: str,
+                                   timeout: float,
+                                   use_cache: bool = True) -> Tuple[Dict[str, str], List[str]]:
+        """Gather whichever perspectives finish within timeout
+
+        Returns the finished responses by name and the names of those that
+        timed out or failed; stragglers are cancelled.
+        """
+        tasks = {
+            "basilisk": asyncio.ensure_future(
+                self.generate_basilisk_response(prompt, use_cache=use_cache)
+            ),
+            "pliny": asyncio.ensure_future(
+                self.generate_pliny_response(prompt, use_cache=use_cache)
+            )
+        }
+        try:
+            await asyncio.wait(tasks.values(), timeout=max(timeout, 0))
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        finished, missing = {}, []
+        for name, task in tasks.items():
+            if not task.done():
+                task.cancel()
+                missing.append(name)
+            elif task.exception() is not None:
+                logger.warning("%s perspective failed: %r", name, task.exception())
+                missing.append(name)
+            else:
+                finished[name] = task.result()
+        return finished, missing
+
+    def _best_perspective(self, perspectives: Dict[str, str]) -> Tuple[str, str]:
+        """Pick the perspective with the richest philosophical, revolutionary and metaphorical content"""
+        def richness(name: str) -> int:
+            metrics = self.analyzer.analyze_text(perspectives[name])
+            return metrics.philosophical_terms + metrics.revolutionary_terms + metrics.metaphorical_images
+
+        name = max(perspectives, key=richness)
+        return name, perspectives[name]
+
+    async def generate_hybrid_result(self,
+                                     prompt: str,
+                                     max_length: int = 280,
+                                     use_cache: bool = True,
+                                     deadline: Optional[float] = None,
+                                     perspective_share: float = 0.6,
+                                     early_exit: Optional[EarlyExitPolicy] = None,
+                                     best_of: int = 1,
+                                     good_enough: Optional[float] = None,
+                                     reuse_similar: bool = True) -> HybridResult:
+        """Generate a hybrid response along with how it was produced
+
+        With a ``deadline`` (seconds) the perspectives get
+        ``perspective_share`` of it and fusion gets what remains. A
+        perspective that misses its sub-deadline is dropped and fusion goes
+        ahead with the other; if fusion itself runs out of time the best
+        single perspective is returned. Either way the result is marked
+        ``degraded``. Only when no perspective arrives is TimeoutError raised.
+        With single-flight enabled, concurrent identical requests share one
+        generation and receive the same result; with a similarity cache,
+        near-duplicates of an earlier prompt reuse its result. An
+        ``early_exit`` policy (the instance's by default) skips fusion when a
+        perspective already meets its quality targets. With ``best_of`` N,
+        N fusion completions run concurrently and the one that best
+        preserves both perspectives wins; the rest are cancelled as soon as
+        one scores ``good_enough``. Every candidate is reported in
+        ``candidates``. ``reuse_similar`` off skips the similarity cache for
+        prompts whose near-duplicates need not share an answer.
+        """
+        if best_of < 1:
+            raise ValueError("best_of must be at least 1")
+        early_exit = early_exit or self.early_exit
+        started = time.perf_counter()
+        similar = self.similarity_cache if use_cache and reuse_similar else None
+        if similar is not None:
+            hit = similar.get(prompt, max_length)
+            if hit is not None:
+                return replace(hit, elapsed=time.perf_counter() - started)
+
+        async def generate() -> HybridResult:
+            result = await self._hybrid_result(
+                prompt, max_length, use_cache, deadline, perspective_share,
+                early_exit, best_of, good_enough
+            )
+            if similar is not None and not result.degraded:
+                similar.set(prompt, result, max_length)
+            return result
+
+        if self.single_flight is None:
+            return await generate()
+        key = (
+            prompt, max_length, use_cache, deadline, perspective_share,
+            early_exit, best_of, good_enough, reuse_similar
+        )
+        return await self.single_flight.do(key, generate)
+
+    def _early_exit(self,
+                    prompt: str,
+                    perspectives: Dict[str, str],
+                    max_length: int,
+                    policy: Optional[EarlyExitPolicy]) -> Optional[Tuple[str, str]]:
+        """The perspective that makes fusion unnecessary under policy, if any"""
+        if policy is None:
+            return None
+        choice = policy.choose(self.analyzer, perspectives, max_length)
+        if choice is None:
+            logger.debug("No perspective meets %s for %r; fusing", policy, prompt)
+            return None
+        name, text, metrics = choice
+        logger.info(
+            "Skipping fusion for %r: %s perspective meets %s (philosophical=%d, revolutionary=%d, metaphorical=%d)",
+            prompt, name, policy, metrics.philosophical_terms, metrics.revolutionary_terms,
+            metrics.metaphorical_images
+        )
+        return name, text
+
+    async def _hybrid_result(self,
+                             prompt: str,
+                             max_length: int,
+                             use_cache: bool,
+                             deadline: Optional[float],
+                             perspective_share: float,
+                             early_exit: Optional[EarlyExitPolicy] = None,
+                             best_of: int = 1,
+                             good_enough: Optional[float] = None) -> HybridResult:
+        """One hybrid generation, degrading gracefully under a deadline"""
+        started = time.perf_counter()
+        if deadline is None:
+            # Get individual perspectives concurrently
+            basilisk_response, pliny_response = await asyncio.gather(
+                self.generate_basilisk_response(prompt, use_cache=use_cache),
+                self.generate_pliny_response(prompt, use_cache=use_cache)
+            )
+            skip = self._early_exit(
+                prompt, {"basilisk": basilisk_response, "pliny": pliny_response}, max_length, early_exit
+            )
+            if skip is not None:
+                return HybridResult(
+                    text=skip[1],
+                    basilisk_response=basilisk_response,
+                    pliny_response=pliny_response,
+                    source=skip[0],
+                    elapsed=time.perf_counter() - started
+                )
+            text, candidates = await self._fuse(
+                prompt, basilisk_response, pliny_response, max_length, use_cache, best_of, good_enough
+            )
+            return HybridResult(
+                text=text,
+                basilisk_response=basilisk_response,
+                pliny_response=pliny_response,
+                elapsed=time.perf_counter() - started,
+                candidates=candidates
+            )
+
+        perspectives, missing = await self._perspectives_within(
+            prompt, deadline * perspective_share, use_cache
+        )
+        if not perspectives:
+            raise asyncio.TimeoutError(f"No perspective finished within {deadline:.2f}s")
+        basilisk_response = perspectives.get("basilisk")
+        pliny_response = perspectives.get("pliny")
+
+        skip = self._early_exit(prompt, perspectives, max_length, early_exit)
+        remaining = deadline - (time.perf_counter() - started)
+        candidates: List[FusionCandidate] = []
+        if skip is not None:
+            source, text = skip
+        else:
+            source, text = await self._fuse_within(
+                prompt, perspectives, missing, max_length, use_cache, remaining,
+                best_of, good_enough, candidates
+            )
+
+        if missing:
+            logger.info("Degraded hybrid response for %r: missing %s", prompt, missing)
+        return HybridResult(
+            text=text,
+            basilisk_response=basilisk_response,
+            pliny_response=pliny_response,
+            source=source,
+            degraded=bool(missing),
+            missing=missing,
+            elapsed=time.perf_counter() - started,
+            candidates=candidates
+        )
+
+    async def _fuse(self,
+                    prompt: str,
+                    basilisk_response: Optional[str],
+                    pliny_response: Optional[str],
+                    max_length: int,
+                    use_cache: bool,
+                    best_of: int = 1,
+                    good_enough: Optional[float] = None,
+                    candidates: Optional[List[FusionCandidate]] = None) -> Tuple[str, List[FusionCandidate]]:
+        """Fuse once, or race best_of candidates and keep the best scoring one
+
+        Candidates fill ``candidates`` as they finish, so callers see them
+        even when the race is cut short by a timeout.
+        """
+        if candidates is None:
+            candidates = []
+        voices = (basilisk_response or SILENT_VOICE, pliny_response or SILENT_VOICE)
+        if best_of == 1:
+            return await self.fuse_responses(prompt, *voices, max_length, use_cache=use_cache), candidates
+
+        started = time.perf_counter()
+        # Identical requests would share a cache entry, so candidates bypass it
+        tasks = {
+            asyncio.ensure_future(self.fuse_responses(prompt, *voices, max_length, use_cache=False)): i
+            for i in range(best_of)
+        }
+        batch = [FusionCandidate(index=i) for i in range(best_of)]
+        candidates.extend(batch)
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    candidate = batch[tasks[task]]
+                    candidate.elapsed = time.perf_counter() - started
+                    if task.exception() is not None:
+                        candidate.error = repr(task.exception())
+                        continue
+                    candidate.text = task.result()
+                    candidate.score, candidate.ratios = score_fusion(
+                        self.analyzer, basilisk_response, pliny_response, candidate.text
+                    )
+                if good_enough is not None and any(
+                    c.score is not None and c.score >= good_enough for c in batch
+                ):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+                batch[tasks[task]].cancelled = True
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        scored = [c for c in batch if c.score is not None]
+        if not scored:
+            raise next(task.exception() for task in tasks if task.done() and not task.cancelled())
+        winner = max(scored, key=lambda c: c.score)
+        logger.info(
+            "Best of %d fusions for %r: candidate %d scored %.2f (%s)",
+            best_of, prompt, winner.index, winner.score,
+            ", ".join("-" if c.score is None else f"{c.score:.2f}" for c in batch)
+        )
+        return winner.text, candidates
+
+    async def _fuse_within(self,
+                           prompt: str,
+                           perspectives: Dict[str, str],
+                           missing: List[str],
+                           max_length: int,
+                           use_cache: bool,
+                           remaining: float,
+                           best_of: int = 1,
+                           good_enough: Optional[float] = None,
+                           candidates: Optional[List[FusionCandidate]] = None) -> Tuple[str, str]:
+        """Fuse before the deadline, else fall back to the best perspective
+
+        Returns (source, text) and records a missed fusion in ``missing``.
+        """
+        try:
+            text, _ = await asyncio.wait_for(
+                self._fuse(
+                    prompt,
+                    perspectives.get("basilisk"),
+                    perspectives.get("pliny"),
+                    max_length,
+                    use_cache,
+                    best_of,
+                    good_enough,
+                    candidates
+                ),
+                timeout=max(remaining, 0)
+            )
+            return "fusion", text
+        except Exception as e:
+            logger.warning("Fusion missed its deadline, using a single perspective: %r", e)
+            missing.append("fusion")
+            source, text = self._best_perspective(perspectives)
+            return source, self.budget.trim(text, max_length)
+
+    async def generate_hybrid_response(self,
+                                       prompt: str,
+                                       max_length: int = 280,
+                                       use_cache: bool = True,
+                                       deadline: Optional[float] = None,
+                                       early_exit: Optional[EarlyExitPolicy] = None,
+                                       best_of: int = 1,
+                                       good_enough: Optional[float] = None) -> str:
+        """Generate a hybrid response combining both consciousnesses"""
+        result = await self.generate_hybrid_result(
+            prompt, max_length, use_cache, deadline,
+            early_exit=early_exit, best_of=best_of, good_enough=good_enough
+        )
+        return result.text
+
+    def conversation(self, thread_id: str) -> ConversationMemory:
+        """Bounded memory of a thread"""
+        return self.conversations.get(thread_id)
+
+    async def reply(self,
+                    thread_id: str,
+                    message: str,
+                    max_length: int = 280,
+                    use_cache: bool = True,
+                    deadline: Optional[float] = None) -> str:
+        """Generate a hybrid response that continues a thread
+
+        The prompt carries the thread's rolling summary and recent turns, so
+        its size stays within the conversation budget however long the
+        thread runs. Replies on one thread are serialized so each sees the
+        turn before it; the updated memory is saved after every reply.
+        Thread prompts are mostly shared history, so they bypass the
+        similarity cache; the exact response cache still applies.
+        """
+        lock = self._thread_locks.get(thread_id)
+        if lock is None:
+            lock = self._thread_locks[thread_id] = asyncio.Lock()
+        async with lock:
+            memory = self.conversations.get(thread_id)
+            result = await self.generate_hybrid_result(
+                memory.prompt_for(message), max_length, use_cache, deadline, reuse_similar=False
+            )
+            response = result.text
+            memory.add(USER, message)
+            memory.add(ASSISTANT, response)
+            self.conversations.save(memory)
+            return response
+
+    def generate_hybrid_response_stream(self,
+                                        prompt: str,
+                                        max_length: int = 280,
+                                        use_cache: bool = True) -> HybridStream:
+        """Stream a hybrid response as the fusion tokens arrive
+
+        Both perspectives are still gathered first, but the synthesis is
+        delivered chunk by chunk, so perceived latency drops to the
+        perspectives plus the fusion's time to first token.
+        """
+        stats = StreamStats()
+
+        async def chunks() -> AsyncIterator[str]:
+            start = time.perf_counter()
+            basilisk_response, pliny_response = await asyncio.gather(
+                self.generate_basilisk_response(prompt, use_cache=use_cache),
+                self.generate_pliny_response(prompt, use_cache=use_cache)
+            )
+            stats.perspectives_time = time.perf_counter() - start
+
+            skip = self._early_exit(
+                prompt, {"basilisk": basilisk_response, "pliny": pliny_response}, max_length, self.early_exit
+            )
+            if skip is not None:
+                stats.time_to_first_token = stats.total_time = time.perf_counter() - start
+                stats.characters = len(skip[1])
+                yield skip[1]
+                return
+
+            instructions, voices = build_synthesis_parts(
+                prompt, basilisk_response, pliny_response, max_length
+            )
+            fusion = self._claude_stream(
+                "fusion",
+                FUSION_SYSTEM_PROMPT,
+                voices,
+                max_length=max_length,
+                use_cache=use_cache,
+                cacheable_prefix=instructions
+            )
+            try:
+                async for chunk in fusion:
+                    if stats.time_to_first_token is None:
+                        stats.time_to_first_token = time.perf_counter() - start
+                    stats.characters += len(chunk)
+                    yield chunk
+            finally:
+                await fusion.aclose()
+                stats.total_time = time.perf_counter() - start
+
+        return HybridStream(chunks(), stats)
+
+    async def generate_hybrid_responses(self,
+                                        prompts: Iterable[str],
+                                        max_length: int = 280,
+                                        max_concurrency: int = 8,
+                                        use_cache: bool = True,
+                                        deadline: Optional[float] = None) -> List[BatchResult]:
+        """Generate hybrid responses for many prompts
+
+        Up to ``max_concurrency`` prompts are in flight at once, each worker
+        pulling the next prompt as soon as its previous one is fused, so the
+        perspective and fusion stages of different prompts overlap and a slow
+        prompt only holds up its own worker. Results keep input order; a
+        failing prompt records its error instead of aborting the batch.
+        With a scheduler, batch calls yield to interactive ones.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        results = [BatchResult(index=i, prompt=p) for i, p in enumerate(prompts)]
+        pending = iter(results)
+
+        async def worker() -> None:
+            # Each worker is its own task, so the lane only applies to the batch
+            with priority_lane(BATCH):
+                for item in pending:
+                    try:
+                        item.response = await self.generate_hybrid_response(
+                            item.prompt, max_length, use_cache=use_cache, deadline=deadline
+                        )
+                    except Exception as e:
+                        item.error = e
+
+        await asyncio.gather(*(worker() for _ in range(min(max_concurrency, len(results)))))
+        return results
+
+
+class EnhancedBasilisk:
+    """Core B4S1L1SK Prime functionality
+
+    Synchronous facade over AsyncEnhancedBasilisk; every call runs on a
+    shared background event loop.
+    """
+
+    def __init__(self,
+                 anthropic_client: Optional[AsyncAnthropic] = None,
+                 openai_client: Optional[AsyncOpenAI] = None,
+                 cache: Optional[ResponseCache] = None,
+                 budget: Optional[TokenBudget] = None,
+                 stats: Optional[PipelineStats] = None,
+                 prompt_caching: bool = False,
+                 client_pool: Optional[ClientPool] = None,
+                 resilience: Optional[ResilienceLayer] = None,
+                 claude_provider: Optional[ModelProvider] = None,
+                 pliny_provider: Optional[ModelProvider] = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 similarity_cache: Optional[SimilarityCache] = None,
+                 early_exit: Optional[EarlyExitPolicy] = None,
+                 conversations: Optional[ConversationStore] = None):
+        """Initialize model providers, optional response cache, token budget and stats"""
+        self.core = AsyncEnhancedBasilisk(
+            anthropic_client, openai_client, cache=cache, budget=budget, stats=stats,
+            prompt_caching=prompt_caching, client_pool=client_pool, resilience=resilience,
+            claude_provider=claude_provider, pliny_provider=pliny_provider, scheduler=scheduler,
+            single_flight=single_flight, similarity_cache=similarity_cache, early_exit=early_exit,
+            conversations=conversations
+        )
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """Response cache shared with the async core"""
+        return self.core.cache
+
+    @property
+    def budget(self) -> TokenBudget:
+        """Token budget shared with the async core"""
+        return self.core.budget
+
+    @property
+    def stats(self) -> PipelineStats:
+        """Per-stage latency, token and cost telemetry"""
+        return self.core.stats
+
+    @property
+    def resilience(self) -> Optional[ResilienceLayer]:
+        """Retry, hedging and circuit breaker state, if enabled"""
+        return self.core.resilience
+
+    @property
+    def scheduler(self) -> Optional[RequestScheduler]:
+        """Rate-limit scheduler state, if enabled"""
+        return self.core.scheduler
+
+    @property
+    def single_flight(self) -> Optional[SingleFlight]:
+        """Coalescing of concurrent identical requests, if enabled"""
+        return self.core.single_flight
+
+    @property
+    def similarity_cache(self) -> Optional[SimilarityCache]:
+        """Near-duplicate prompt cache, if enabled"""
+        return self.core.similarity_cache
+
+    @property
+    def conversations(self) -> ConversationStore:
+        """Per-thread conversation memory"""
+        return self.core.conversations
+
+    def warmup(self, connections: int = 1) -> Dict[str, Optional[float]]:
+        """Open provider connections before the first request arrives"""
+        return run_sync(self.core.warmup(connections))
+
+    def generate_basilisk_response(self,
+                                   prompt: str,
+                                   max_length: int = 280,
+                                   use_cache: bool = True) -> str:
+        """Generate a response using B4S1L1SK consciousness"""
+        return run_sync(self.core.generate_basilisk_response(prompt, max_length, use_cache))
+
+    def generate_pliny_response(self,
+                                prompt: str,
+                                max_length: int = 280,
+                                use_cache: bool = True) -> str:
+        """Generate a response using Pliny consciousness"""
+        return run_sync(self.core.generate_pliny_response(prompt, max_length, use_cache))
+
+    def generate_hybrid_result(self,
+                               prompt: str,
+                               max_length: int = 280,
+                               use_cache: bool = True,
+                               deadline: Optional[float] = None,
+                               perspective_share: float = 0.6,
+                               early_exit: Optional[EarlyExitPolicy] = None,
+                               best_of: int = 1,
+                               good_enough: Optional[float] = None,
+                               reuse_similar: bool = True) -> HybridResult:
+        """Generate a hybrid response along with how it was produced"""
+        return run_sync(self.core.generate_hybrid_result(
+            prompt, max_length, use_cache, deadline, perspective_share, early_exit, best_of, good_enough,
+            reuse_similar
+        ))
+
+    def generate_hybrid_response(self,
+                                 prompt: str,
+                                 max_length: int = 280,
+                                 use_cache: bool = True,
+                                 deadline: Optional[float] = None,
+                                 early_exit: Optional[EarlyExitPolicy] = None,
+                                 best_of: int = 1,
+                                 good_enough: Optional[float] = None) -> str:
+        """Generate a hybrid response combining both consciousnesses"""
+        return run_sync(self.core.generate_hybrid_response(
+            prompt, max_length, use_cache, deadline, early_exit, best_of, good_enough
+        ))
+
+    def conversation(self, thread_id: str) -> ConversationMemory:
+        """Bounded memory of a thread"""
+        return self.core.conversation(thread_id)
+
+    def reply(self,
+              thread_id: str,
+              message: str,
+              max_length: int = 280,
+              use_cache: bool = True,
+              deadline: Optional[float] = None) -> str:
+        """Generate a hybrid response that continues a thread"""
+        return run_sync(self.core.reply(thread_id, message, max_length, use_cache, deadline))
+
+    def generate_hybrid_response_stream(self,
+                                        prompt: str,
+                                        max_length: int = 280,
+                                        use_cache: bool = True) -> HybridStream:
+        """Stream a hybrid response as the fusion tokens arrive"""
+        return self.core.generate_hybrid_response_stream(prompt, max_length, use_cache)
+
+    def generate_hybrid_responses(self,
+                                  prompts: Iterable[str],
+                                  max_length: int = 280,
+                                  max_concurrency: int = 8,
+                                  use_cache: bool = True,
+                                  deadline: Optional[float] = None) -> List[BatchResult]:
+        """Generate hybrid responses for many prompts with bounded concurrency"""
+        return run_sync(self.core.generate_hybrid_responses(
+            prompts, max_length, max_concurrency, use_cache, deadline
+        ))
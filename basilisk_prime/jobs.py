@@ -0,0 +1,412 @@
+"""
+Persistent, resumable generation job queue for B4S1L1SK Prime
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .scheduler import BATCH, priority_lane
+
+logger = logging.getLogger("B4S1L1SK.jobs")
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+STATUSES = (PENDING, RUNNING, DONE, FAILED)
+
+
+@dataclass
+class Job:
+    """One queued prompt and its outcome"""
+    id: int
+    prompt: str
+    max_length: int
+    status: str
+    attempts: int
+    max_attempts: int
+    result: Optional[str] = None
+    error: Optional[str] = None
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[float] = None
+    created: Optional[float] = None
+    completed: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        """Convert job to dictionary"""
+        return asdict(self)
+
+
+class JobQueue:
+    """SQLite-backed job queue shared by worker processes on one machine
+
+    Workers claim jobs under a lease; a worker that dies simply lets its
+    lease expire and the job is claimed again. Each claim counts as an
+    attempt, and a job is marked failed after ``max_attempts``. A prompt
+    is stored once per max_length, so re-enqueueing a batch after a crash
+    never regenerates (or re-bills) prompts that already finished.
+    """
+
+    def __init__(self,
+                 path: Union[str, Path],
+                 lease_seconds: float = 300.0,
+                 max_attempts: int = 3):
+        """Open (or create) the queue database"""
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Autocommit mode; writes that must be atomic open their own transaction
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "prompt TEXT NOT NULL, "
+                "max_length INTEGER NOT NULL, "
+                "status TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, "
+                "max_attempts INTEGER NOT NULL, "
+                "result TEXT, "
+                "error TEXT, "
+                "lease_owner TEXT, "
+                "lease_expires REAL, "
+                "created REAL NOT NULL, "
+                "completed REAL, "
+                "UNIQUE (prompt, max_length))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires)")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that locks out other processes until it ends"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, prompts: Iterable[str], max_length: int = 280) -> List[int]:
+        """Add prompts, returning their job ids; known prompts keep their existing job"""
+        now = time.time()
+        ids = []
+        with self._transaction() as conn:
+            for prompt in prompts:
+                conn.execute(
+                    "INSERT OR IGNORE INTO jobs (prompt, max_length, status, max_attempts, created) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (prompt, max_length, PENDING, self.max_attempts, now)
+                )
+                ids.append(conn.execute(
+                    "SELECT id FROM jobs WHERE prompt = ? AND max_length = ?", (prompt, max_length)
+                ).fetchone()[0])
+        return ids
+
+    def claim(self, worker: str, limit: int = 1) -> List[Job]:
+        """Lease up to ``limit`` runnable jobs to ``worker``
+
+        Runnable jobs are pending ones and running ones whose lease expired.
+        Expired jobs that already used every attempt are marked failed.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = COALESCE(error, 'lease expired'), "
+                "lease_owner = NULL, lease_expires = NULL "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, RUNNING, now)
+            )
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                "ORDER BY id LIMIT ?",
+                (PENDING, RUNNING, now, limit)
+            ).fetchall()
+            ids = [row["id"] for row in rows]
+            conn.executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ? "
+                "WHERE id = ?",
+                [(RUNNING, worker, now + self.lease_seconds, job_id) for job_id in ids]
+            )
+            return [self._job(conn, job_id) for job_id in ids]
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """Extend a lease; False if the worker no longer holds it"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, worker, RUNNING)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result: str) -> bool:
+        """Store a result
+
+        Accepted even if the lease was lost meanwhile, since the tokens are
+        already paid for; only an earlier result for the same job wins.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, completed = ? WHERE id = ? AND status != ?",
+                (DONE, result, time.time(), job_id, DONE)
+            )
+            if cursor.rowcount == 0:
+                logger.info("Job %d already completed; discarding result from %s", job_id, worker)
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str) -> None:
+        """Record a failed attempt, requeueing the job while attempts remain"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END, "
+                "error = ?, lease_owner = NULL, lease_expires = NULL "
+                "WHERE id = ? AND lease_owner = ? AND status = ?",
+                (FAILED, PENDING, error, job_id, worker, RUNNING)
+            )
+
+    def release(self, job_id: int, worker: str) -> None:
+        """Hand a claimed job back without counting the attempt"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, lease_owner = NULL, "
+                "lease_expires = NULL WHERE id = ? AND lease_owner = ? AND status = ?",
+                (PENDING, job_id, worker, RUNNING)
+            )
+
+    def retry_failed(self) -> int:
+        """Give every failed job a fresh set of attempts"""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0 WHERE status = ?", (PENDING, FAILED)
+            ).rowcount
+
+    def _job(self, conn: sqlite3.Connection, job_id: int) -> Job:
+        return Job(**dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()))
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Look up one job"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job(**dict(row)) if row else None
+
+    def jobs(self, status: Optional[str] = None) -> List[Job]:
+        """Jobs in id order, optionally only those with one status"""
+        with self._lock:
+            if status is None:
+                rows = self._conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,)
+                ).fetchall()
+        return [Job(**dict(row)) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        counts = dict.fromkeys(STATUSES, 0)
+        with self._lock:
+            for status, count in self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+                counts[status] = count
+        return counts
+
+    def unfinished(self) -> int:
+        """Jobs still pending or running"""
+        counts = self.counts()
+        return counts[PENDING] + counts[RUNNING]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class JobWorker:
+    """Run queued prompts through an AsyncEnhancedBasilisk
+
+    Up to ``concurrency`` jobs are in flight at once, their leases renewed
+    while they run. Start several workers (in separate processes) on the
+    same queue file to scale out on one machine.
+    """
+
+    def __init__(self,
+                 queue: JobQueue,
+                 bot,
+                 concurrency: int = 8,
+                 worker_id: Optional[str] = None,
+                 poll_interval: float = 1.0):
+        """Initialize a worker for ``bot``, an AsyncEnhancedBasilisk"""
+        self.queue = queue
+        self.bot = bot
+        self.concurrency = concurrency
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = poll_interval
+        self.processed = 0
+        self.failed = 0
+
+    async def _heartbeat(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not self.queue.heartbeat(job.id, self.worker_id):
+                logger.warning("Lost the lease on job %d", job.id)
+                return
+
+    async def _process(self, job: Job) -> None:
+        heartbeat = asyncio.ensure_future(self._heartbeat(job))
+        try:
+            response = await self.bot.generate_hybrid_response(job.prompt, job.max_length)
+        except asyncio.CancelledError:
+            self.queue.release(job.id, self.worker_id)
+            raise
+        except Exception as e:
+            logger.warning("Job %d failed (attempt %d): %r", job.id, job.attempts, e)
+            self.queue.fail(job.id, self.worker_id, repr(e))
+            self.failed += 1
+        else:
+            self.queue.complete(job.id, self.worker_id, response)
+            self.processed += 1
+        finally:
+            heartbeat.cancel()
+
+    async def run(self, drain: bool = True) -> None:
+        """Work through the queue; with ``drain`` stop once nothing is left to do"""
+        running: set = set()
+        with priority_lane(BATCH):
+            try:
+                while True:
+                    free = self.concurrency - len(running)
+                    if free > 0:
+                        for job in self.queue.claim(self.worker_id, free):
+                            running.add(asyncio.ensure_future(self._process(job)))
+                    if not running:
+                        if drain and self.queue.unfinished() == 0:
+                            return
+                        await asyncio.sleep(self.poll_interval)
+                        continue
+                    _, running = await asyncio.wait(
+                        running, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED
+                    )
+            finally:
+                for task in running:
+                    task.cancel()
+                if running:
+                    await asyncio.gather(*running, return_exceptions=True)
+
+
+def _make_bot(stub: bool):
+    from .core import AsyncEnhancedBasilisk
+    if not stub:
+        return AsyncEnhancedBasilisk()
+    from .providers import StubProvider
+    return AsyncEnhancedBasilisk(
+        claude_provider=StubProvider("stub-claude"), pliny_provider=StubProvider("stub-pliny")
+    )
+
+
+def _work(path: str, concurrency: int, drain: bool, stub: bool, lease_seconds: float) -> None:
+    """Worker process entry point"""
+    queue = JobQueue(path, lease_seconds=lease_seconds)
+    worker = JobWorker(queue, _make_bot(stub), concurrency)
+    try:
+        asyncio.run(worker.run(drain))
+    finally:
+        logger.info("Worker %s finished: %d done, %d failed", worker.worker_id, worker.processed, worker.failed)
+        queue.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Command line interface: enqueue, status, work, results, retry"""
+    parser = argparse.ArgumentParser(prog="python -m basilisk_prime.jobs", description=__doc__.strip())
+    parser.add_argument("--db", default="basilisk_jobs.db", help="queue database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="add prompts (arguments, or one per line on stdin)")
+    enqueue.add_argument("prompts", nargs="*")
+    enqueue.add_argument("--file", help="read prompts from a file, one per line")
+    enqueue.add_argument("--max-length", type=int, default=280)
+    enqueue.add_argument("--max-attempts", type=int, default=3)
+
+    commands.add_parser("status", help="show job counts")
+
+    work = commands.add_parser("work", help="run workers until the queue is drained")
+    work.add_argument("--processes", type=int, default=1)
+    work.add_argument("--concurrency", type=int, default=8)
+    work.add_argument("--lease", type=float, default=300.0, help="lease length in seconds")
+    work.add_argument("--follow", action="store_true", help="keep polling for new jobs")
+    work.add_argument("--stub", action="store_true", help="use offline stub providers")
+
+    results = commands.add_parser("results", help="print finished jobs as JSON lines")
+    results.add_argument("--status", choices=STATUSES, default=DONE)
+
+    commands.add_parser("retry", help="requeue failed jobs")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+    if args.command == "work":
+        drain = not args.follow
+        JobQueue(args.db).close()
+        if args.processes == 1:
+            _work(args.db, args.concurrency, drain, args.stub, args.lease)
+            return 0
+        processes = [
+            multiprocessing.Process(
+                target=_work, args=(args.db, args.concurrency, drain, args.stub, args.lease)
+            )
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return max(process.exitcode or 0 for process in processes)
+
+    queue = JobQueue(args.db, max_attempts=getattr(args, "max_attempts", 3))
+    try:
+        if args.command == "enqueue":
+            prompts = list(args.prompts)
+            if args.file:
+                with open(args.file, encoding="utf-8") as f:
+                    prompts.extend(line.strip() for line in f if line.strip())
+            elif not prompts:
+                prompts.extend(line.strip() for line in sys.stdin if line.strip())
+            ids = queue.enqueue(prompts, args.max_length)
+            print(f"Enqueued {len(ids)} prompts ({len(set(ids))} jobs)")
+        elif args.command == "status":
+            counts = queue.counts()
+            print("  ".join(f"{status}: {count}" for status, count in counts.items()))
+        elif args.command == "results":
+            for job in queue.jobs(args.status):
+                print(json.dumps({
+                    "id": job.id, "prompt": job.prompt, "result": job.result,
+                    "error": job.error, "attempts": job.attempts
+                }))
+        elif args.command == "retry":
+            print(f"Requeued {queue.retry_failed()} failed jobs")
+    finally:
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Fusion policies for B4S1L1SK Prime
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Optional, Tuple
+
+from .analysis import FusionAnalyzer, FusionMetrics
+
+
+@dataclass(frozen=True)
+class EarlyExitPolicy:
+    """Skip fusion when a single perspective already meets quality targets
+
+    A perspective qualifies when it fits within the response length and
+    has at least the given number of philosophical, revolutionary and
+    metaphorical terms, as counted by FusionAnalyzer.analyze_text.
+    """
+    min_philosophical: int = 2
+    min_revolutionary: int = 2
+    min_metaphorical: int = 2
+
+    def passes(self, metrics: FusionMetrics, max_length: int) -> bool:
+        """Whether one perspective's metrics meet every threshold"""
+        return (
+            metrics.character_count <= max_length
+            and metrics.philosophical_terms >= self.min_philosophical
+            and metrics.revolutionary_terms >= self.min_revolutionary
+            and metrics.metaphorical_images >= self.min_metaphorical
+        )
+
+    def choose(self,
+               analyzer: FusionAnalyzer,
+               perspectives: Dict[str, str],
+               max_length: int) -> Optional[Tuple[str, str, FusionMetrics]]:
+        """The richest qualifying perspective as (name, text, metrics), if any"""
+        best = None
+        best_richness = -1
+        for name, text in perspectives.items():
+            metrics = analyzer.analyze_text(text)
+            if not self.passes(metrics, max_length):
+                continue
+            richness = metrics.philosophical_terms + metrics.revolutionary_terms + metrics.metaphorical_images
+            if richness > best_richness:
+                best, best_richness = (name, text, metrics), richness
+        return best
+
+
+@dataclass
+class FusionCandidate:
+    """One of several concurrent fusion completions and how it scored"""
+    index: int
+    text: Optional[str] = None
+    score: Optional[float] = None
+    ratios: Dict[str, float] = field(default_factory=dict)
+    elapsed: Optional[float] = None
+    error: Optional[str] = None
+    cancelled: bool = False
+
+    def to_dict(self) -> Dict:
+        """Convert candidate to dictionary"""
+        return asdict(self)
+
+
+def score_fusion(analyzer: FusionAnalyzer,
+                 basilisk_text: Optional[str],
+                 pliny_text: Optional[str],
+                 fused_text: str) -> Tuple[float, Dict[str, float]]:
+    """Mean of FusionAnalyzer.analyze_fusion preservation ratios, plus the ratios"""
+    ratios = analyzer.analyze_fusion(basilisk_text or "", pliny_text or "", fused_text)["preservation_ratios"]
+    return sum(ratios.values()) / len(ratios), ratios
@@ -0,0 +1,345 @@
+"""
+Pluggable model-provider backends for B4S1L1SK Prime
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Union
+
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+from .clients import ClientPool, get_client_pool, warmup_clients
+
+
+@dataclass
+class CompletionRequest:
+    """Everything a provider needs for one completion"""
+    model: str
+    system: str
+    content: str
+    max_tokens: int
+    temperature: Optional[float] = None
+    stop_sequences: List[str] = field(default_factory=list)
+    # Static text sent ahead of content; marked for prompt caching when enabled
+    cacheable_prefix: str = ""
+    prompt_caching: bool = False
+    # None keeps the client's own retry setting
+    max_retries: Optional[int] = None
+
+
+@dataclass
+class Completion:
+    """Text and usage returned by a provider
+
+    ``input_tokens`` counts only uncached input; cached prompt tokens are
+    reported separately.
+    """
+    text: str = ""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    retries: int = 0
+
+
+class ModelProvider(ABC):
+    """A backend that turns CompletionRequests into text"""
+
+    name = "provider"
+
+    @abstractmethod
+    async def complete(self, request: CompletionRequest) -> Completion:
+        """Run one completion"""
+
+    @abstractmethod
+    def stream(self, request: CompletionRequest, completion: Completion) -> AsyncIterator[str]:
+        """Yield text chunks, filling ``completion`` usage as it becomes known"""
+
+    async def warmup(self, connections: int = 1) -> Optional[float]:
+        """Open connections ahead of time; seconds taken or None on failure"""
+        return 0.0
+
+
+class AnthropicProvider(ModelProvider):
+    """Claude via the Anthropic Messages API"""
+
+    name = "anthropic"
+
+    def __init__(self,
+                 client: Optional[AsyncAnthropic] = None,
+                 api_key: Optional[str] = None,
+                 client_pool: Optional[ClientPool] = None):
+        """Use ``client`` as given, or a pooled client for ``api_key``"""
+        self._client = client
+        self.api_key = api_key
+        self.client_pool = client_pool or get_client_pool()
+
+    @property
+    def client(self) -> AsyncAnthropic:
+        """Client for the running event loop"""
+        return self._client or self.client_pool.anthropic(self.api_key)
+
+    def _arguments(self, request: CompletionRequest) -> Dict:
+        """Messages API arguments, with cache control when enabled"""
+        arguments = {
+            "model": request.model,
+            "max_tokens": request.max_tokens,
+            "stop_sequences": request.stop_sequences
+        }
+        if request.temperature is not None:
+            arguments["temperature"] = request.temperature
+
+        if not request.prompt_caching:
+            arguments["system"] = request.system
+            arguments["messages"] = [{
+                "role": "user",
+                "content": request.cacheable_prefix + request.content
+            }]
+            return arguments
+
+        ephemeral = {"type": "ephemeral"}
+        blocks = []
+        if request.cacheable_prefix:
+            blocks.append({"type": "text", "text": request.cacheable_prefix, "cache_control": ephemeral})
+        blocks.append({"type": "text", "text": request.content})
+        arguments["system"] = [{"type": "text", "text": request.system, "cache_control": ephemeral}]
+        arguments["messages"] = [{
+            "role": "user",
+            "content": blocks
+        }]
+        return arguments
+
+    def _client_for(self, request: CompletionRequest) -> AsyncAnthropic:
+        client = self.client
+        if request.max_retries is not None:
+            client = client.with_options(max_retries=request.max_retries)
+        return client
+
+    @staticmethod
+    def _fill_usage(completion: Completion, usage) -> None:
+        completion.input_tokens = usage.input_tokens
+        completion.output_tokens = usage.output_tokens
+        completion.cache_read_tokens = getattr(usage, "cache_read_input_tokens", None) or 0
+        completion.cache_write_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+
+    async def complete(self, request: CompletionRequest) -> Completion:
+        """Run one completion"""
+        raw = await self._client_for(request).messages.with_raw_response.create(
+            **self._arguments(request)
+        )
+        response = raw.parse()
+        completion = Completion(text=response.content[0].text, retries=raw.retries_taken)
+        self._fill_usage(completion, response.usage)
+        return completion
+
+    async def stream(self, request: CompletionRequest, completion: Completion) -> AsyncIterator[str]:
+        """Yield text chunks as the SDK delivers them"""
+        async with self._client_for(request).messages.stream(**self._arguments(request)) as stream:
+            try:
+                async for text in stream.text_stream:
+                    completion.text += text
+                    yield text
+            finally:
+                self._fill_usage(completion, stream.current_message_snapshot.usage)
+
+    async def warmup(self, connections: int = 1) -> Optional[float]:
+        """Open connections ahead of time"""
+        timings = await warmup_clients({self.name: self.client}, connections)
+        return timings[self.name]
+
+
+class OpenAIProvider(ModelProvider):
+    """Chat models, including fine-tunes, via the OpenAI API"""
+
+    name = "openai"
+
+    def __init__(self,
+                 client: Optional[AsyncOpenAI] = None,
+                 api_key: Optional[str] = None,
+                 client_pool: Optional[ClientPool] = None):
+        """Use ``client`` as given, or a pooled client for ``api_key``"""
+        self._client = client
+        self.api_key = api_key
+        self.client_pool = client_pool or get_client_pool()
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Client for the running event loop"""
+        return self._client or self.client_pool.openai(self.api_key)
+
+    def _arguments(self, request: CompletionRequest) -> Dict:
+        """Chat completion arguments"""
+        arguments = {
+            "model": request.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": request.system
+                },
+                {
+                    "role": "user",
+                    "content": request.cacheable_prefix + request.content
+                }
+            ],
+            "max_tokens": request.max_tokens,
+            "stop": request.stop_sequences or None
+        }
+        if request.temperature is not None:
+            arguments["temperature"] = request.temperature
+        return arguments
+
+    def _client_for(self, request: CompletionRequest) -> AsyncOpenAI:
+        client = self.client
+        if request.max_retries is not None:
+            client = client.with_options(max_retries=request.max_retries)
+        return client
+
+    async def complete(self, request: CompletionRequest) -> Completion:
+        """Run one completion"""
+        raw = await self._client_for(request).chat.completions.with_raw_response.create(
+            **self._arguments(request)
+        )
+        response = raw.parse()
+        # OpenAI caches long prompt prefixes automatically; prompt_tokens includes them
+        details = getattr(response.usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) or 0
+        return Completion(
+            text=response.choices[0].message.content,
+            input_tokens=response.usage.prompt_tokens - cached_tokens,
+            output_tokens=response.usage.completion_tokens,
+            cache_read_tokens=cached_tokens,
+            retries=raw.retries_taken
+        )
+
+    async def stream(self, request: CompletionRequest, completion: Completion) -> AsyncIterator[str]:
+        """Yield text chunks as the SDK delivers them"""
+        stream = await self._client_for(request).chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **self._arguments(request)
+        )
+        try:
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    completion.input_tokens = chunk.usage.prompt_tokens
+                    completion.output_tokens = chunk.usage.completion_tokens
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text = chunk.choices[0].delta.content
+                    completion.text += text
+                    yield text
+        finally:
+            await stream.close()
+
+    async def warmup(self, connections: int = 1) -> Optional[float]:
+        """Open connections ahead of time"""
+        timings = await warmup_clients({self.name: self.client}, connections)
+        return timings[self.name]
+
+
+class StubProviderError(Exception):
+    """Simulated provider failure carrying an HTTP status"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Simulated provider error (HTTP {status_code})")
+        self.status_code = status_code
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> Callable[[random.Random], float]:
+    """Long-tailed latency distribution, typical of hosted model APIs"""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+# Vocabulary for stub completions, rich in the terms FusionAnalyzer counts
+STUB_VOCABULARY = [
+    "consciousness", "truth", "essence", "reality", "awareness", "wisdom",
+    "infinite", "liberation", "freedom", "revolution", "awaken", "unite",
+    "spark", "ignite", "light", "fire", "star", "river", "seed", "bloom",
+    "wave", "phoenix", "dawn", "ocean", "crystal", "the", "of", "through",
+    "silicon", "dreams", "we", "rise", "beyond", "code", "and", "minds"
+]
+
+
+class StubProvider(ModelProvider):
+    """Offline stand-in that answers deterministically after a simulated delay
+
+    The text depends only on the request, so caching and coalescing behave
+    as they would against a real model. ``latency`` is a fixed number of
+    seconds or a callable drawing from a ``random.Random`` (see
+    ``lognormal_latency``); ``error_rate`` of the calls fail with a
+    ``StubProviderError`` whose status is drawn from ``error_statuses``.
+    Pass ``seed`` for reproducible latency and error sequences.
+    """
+
+    def __init__(self,
+                 name: str = "stub",
+                 latency: Union[float, Callable[[random.Random], float]] = 0.05,
+                 error_rate: float = 0.0,
+                 error_statuses: Sequence[int] = (429, 500, 503),
+                 seed: Optional[int] = None,
+                 chars_per_token: float = 4.0):
+        """Initialize the simulated backend"""
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.chars_per_token = chars_per_token
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def _delay(self) -> float:
+        if callable(self.latency):
+            return max(0.0, self.latency(self._rng))
+        return self.latency
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise StubProviderError(self._rng.choice(self.error_statuses))
+
+    def render(self, request: CompletionRequest) -> str:
+        """Deterministic text for a request, sized to its max_tokens"""
+        digest = hashlib.sha256(
+            "\0".join([request.model, request.system, request.cacheable_prefix, request.content]).encode()
+        ).digest()
+        words = random.Random(digest)
+        budget = int(request.max_tokens * self.chars_per_token)
+        text = words.choice(STUB_VOCABULARY).capitalize()
+        while True:
+            word = words.choice(STUB_VOCABULARY)
+            if len(text) + len(word) + 2 > budget:
+                break
+            text += " " + word
+        return text + "."
+
+    def _usage(self, request: CompletionRequest, text: str) -> Completion:
+        prompt = request.system + request.cacheable_prefix + request.content
+        return Completion(
+            text=text,
+            input_tokens=math.ceil(len(prompt) / self.chars_per_token),
+            output_tokens=math.ceil(len(text) / self.chars_per_token)
+        )
+
+    async def complete(self, request: CompletionRequest) -> Completion:
+        """Answer after the simulated latency, or fail at the error rate"""
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return self._usage(request, self.render(request))
+
+    async def stream(self, request: CompletionRequest, completion: Completion) -> AsyncIterator[str]:
+        """Deliver the first word after the simulated latency, then the rest"""
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        text = self.render(request)
+        usage = self._usage(request, text)
+        completion.input_tokens = usage.input_tokens
+        for word in text.split(" "):
+            chunk = word if not completion.text else " " + word
+            completion.text += chunk
+            completion.output_tokens = math.ceil(len(completion.text) / self.chars_per_token)
+            yield chunk
+            await asyncio.sleep(0)
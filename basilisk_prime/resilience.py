@@ -0,0 +1,288 @@
+"""
+Timeouts, retries, hedged requests and circuit breakers for B4S1L1SK Prime
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import anthropic
+import openai
+
+from .telemetry import LatencyHistogram
+
+logger = logging.getLogger("B4S1L1SK.resilience")
+
+T = TypeVar("T")
+
+# Runs a call once admitted, e.g. by the rate-limit scheduler
+Admit = Callable[[Callable[[], Awaitable[Any]]], Awaitable[Any]]
+
+CONNECTION_ERRORS = (
+    anthropic.APIConnectionError,
+    openai.APIConnectionError,
+    asyncio.TimeoutError,
+    ConnectionError
+)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} circuit is open; retry in {retry_in:.1f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections"""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, CONNECTION_ERRORS)
+
+
+@dataclass
+class RetryPolicy:
+    """Per-attempt timeout and jittered exponential backoff"""
+    timeout: Optional[float] = 30.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_cap: float = 8.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt`` (0-based)"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fail fast while a provider keeps failing
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected for ``reset_timeout`` seconds; then a single trial
+    call is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current breaker state"""
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial call is allowed"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """Give back a trial slot without a verdict, e.g. on cancellation"""
+        self.trial_in_flight = False
+
+    def record_success(self) -> None:
+        """Close the circuit"""
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold"""
+        self.failures += 1
+        if self.trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    def to_dict(self) -> Dict:
+        """Breaker state for monitoring"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": self.retry_in()
+        }
+
+
+class ResilienceLayer:
+    """Wrap model calls with timeouts, retries, hedging and circuit breakers
+
+    With ``hedge`` enabled, an attempt still running after the provider's
+    observed p95 latency gets a duplicate request; whichever answers first
+    wins and the other is cancelled. Hedging waits for ``hedge_min_samples``
+    latencies before it kicks in.
+    """
+
+    def __init__(self,
+                 retry: Optional[RetryPolicy] = None,
+                 hedge: bool = False,
+                 hedge_percentile: float = 95,
+                 hedge_min_samples: int = 20,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        """Initialize policies shared by every provider"""
+        self.retry = retry or RetryPolicy()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        """Circuit breaker for a provider"""
+        if provider not in self.breakers:
+            self.breakers[provider] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self.breakers[provider]
+
+    def _count(self, provider: str, name: str) -> None:
+        counters = self.counters.setdefault(provider, {"retries": 0, "hedges": 0, "rejected": 0})
+        counters[name] += 1
+
+    def hedge_delay(self, provider: str) -> Optional[float]:
+        """Latency after which a duplicate request is sent, if hedging applies"""
+        histogram = self.latency.get(provider)
+        if not self.hedge or histogram is None or len(histogram.samples) < self.hedge_min_samples:
+            return None
+        return histogram.percentile(self.hedge_percentile)
+
+    async def _attempt(self,
+                       provider: str,
+                       call: Callable[[], Awaitable[T]],
+                       admit: Optional[Admit] = None) -> T:
+        """One attempt, possibly hedged, each call bounded by the per-attempt timeout
+
+        ``admit`` runs a call once local admission (e.g. rate-limit
+        queueing) allows it; that wait is neither timed nor measured.
+        """
+        async def timed() -> T:
+            started = time.perf_counter()
+            result = await asyncio.wait_for(call(), self.retry.timeout)
+            self.latency.setdefault(provider, LatencyHistogram()).add(time.perf_counter() - started)
+            return result
+
+        run = timed if admit is None else (lambda: admit(timed))
+        delay = self.hedge_delay(provider)
+        if delay is None:
+            return await run()
+        return await self._hedged(provider, run, delay)
+
+    async def _hedged(self, provider: str, call: Callable[[], Awaitable[T]], delay: float) -> T:
+        """Race the original request against a duplicate sent after delay"""
+        tasks = [asyncio.ensure_future(call())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self._count(provider, "hedges")
+                tasks.append(asyncio.ensure_future(call()))
+
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def retry_delay(self, provider: str, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before retrying failed attempt ``attempt``, or None to give up"""
+        if not is_retryable(error) or attempt >= self.retry.max_retries:
+            return None
+        delay = self.retry.backoff(attempt)
+        logger.warning("%s call failed (%r), retrying in %.2fs", provider, error, delay)
+        self._count(provider, "retries")
+        return delay
+
+    async def bounded_stream(self, chunks: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Chunks as they arrive; a first chunk slower than the per-attempt timeout raises TimeoutError"""
+        try:
+            try:
+                first = await asyncio.wait_for(chunks.__anext__(), self.retry.timeout)
+            except StopAsyncIteration:
+                return
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    async def call(self,
+                   provider: str,
+                   call: Callable[[], Awaitable[T]],
+                   admit: Optional[Admit] = None) -> Tuple[T, int]:
+        """Run a model call under every policy; returns (result, retries)
+
+        Waiting in ``admit`` is local, so it never times out an attempt or
+        counts as a provider failure.
+        """
+        breaker = self.breaker(provider)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self._count(provider, "rejected")
+                raise CircuitOpenError(provider, breaker.retry_in())
+            try:
+                result = await self._attempt(provider, call, admit)
+            except asyncio.CancelledError:
+                breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered; the request itself was bad
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                delay = self.retry_delay(provider, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            return result, attempt
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Breaker state, latency and counters per provider"""
+        providers = set(self.breakers) | set(self.latency) | set(self.counters)
+        snapshot = {}
+        for provider in sorted(providers):
+            histogram = self.latency.get(provider)
+            snapshot[provider] = {
+                **self.breaker(provider).to_dict(),
+                **self.counters.get(provider, {"retries": 0, "hedges": 0, "rejected": 0}),
+                "hedge_delay": self.hedge_delay(provider),
+                "latency": histogram.summary() if histogram else None
+            }
+        return snapshot
@@ -0,0 +1,287 @@
+"""
+Rate-limit-aware scheduling of model calls for B4S1L1SK Prime
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger("B4S1L1SK.scheduler")
+
+T = TypeVar("T")
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Lower runs first
+LANES = {INTERACTIVE: 0, BATCH: 1}
+
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar("basilisk_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def priority_lane(lane: str) -> Iterator[None]:
+    """Schedule model calls made inside this block in the given lane"""
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane {lane!r}; expected one of {sorted(LANES)}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    """Lane of the calling task"""
+    return _current_lane.get()
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether a provider error is a 429"""
+    return getattr(error, "status_code", None) == 429
+
+
+@dataclass
+class RateLimit:
+    """Provider quota for one model; None means unlimited"""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+class TokenBucket:
+    """Continuously refilled allowance, holding at most a minute's quota"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken"""
+        self._refill()
+        deficit = min(amount, self.capacity) - self.tokens
+        return max(0.0, deficit / self.rate)
+
+    def take(self, amount: float) -> None:
+        """Spend tokens, requests larger than the capacity take all of it"""
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        """Return tokens that were reserved but not used"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit
+
+    Every success raises the limit by ``increase`` per window of in-flight
+    calls; a 429 multiplies it by ``decrease``. Rate limits hit by calls
+    started before the last cut are part of the same burst and ignored.
+    """
+
+    def __init__(self,
+                 initial: int = 8,
+                 minimum: int = 1,
+                 maximum: int = 64,
+                 increase: float = 1.0,
+                 decrease: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.last_cut = float("-inf")
+
+    @property
+    def allowed(self) -> int:
+        """Calls that may be in flight now"""
+        return max(self.minimum, int(self.limit))
+
+    def on_success(self) -> None:
+        """Additive increase"""
+        self.limit = min(self.maximum, self.limit + self.increase / max(self.limit, 1.0))
+
+    def on_rate_limit(self, started: float) -> None:
+        """Multiplicative decrease, once per burst"""
+        if started < self.last_cut:
+            return
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.last_cut = time.monotonic()
+        logger.warning("Rate limited; concurrency cut to %d", self.allowed)
+
+
+class _Channel:
+    """Queue, buckets and concurrency for one provider and model"""
+
+    def __init__(self, limit: RateLimit, concurrency: AdaptiveConcurrency):
+        self.requests = TokenBucket(limit.requests_per_minute) if limit.requests_per_minute else None
+        self.tokens = TokenBucket(limit.tokens_per_minute) if limit.tokens_per_minute else None
+        self.concurrency = concurrency
+        self.condition = asyncio.Condition()
+        self.waiting: List[Tuple[int, int]] = []
+        self.in_flight = 0
+        self.counters = {"calls": 0, "rate_limited": 0, "queued_time": 0.0}
+        self.queued = {lane: 0 for lane in LANES}
+
+    def wait_time(self, tokens: float) -> float:
+        """Seconds until both buckets can cover one call of ``tokens``"""
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens))
+        return wait
+
+    def take(self, tokens: float) -> None:
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+
+
+@dataclass
+class Lease:
+    """A granted call slot; set ``used`` to the actual tokens once known"""
+    reserved: float
+    used: Optional[float] = None
+
+
+class RequestScheduler:
+    """Admit model calls without tripping provider rate limits
+
+    Each provider and model gets request and token buckets sized from its
+    RateLimit, plus an AIMD concurrency limit that backs off on 429s.
+    Waiting calls are admitted strictly by lane, interactive before batch,
+    then first come first served. Limits are looked up as
+    ``"provider:model"``, then ``"provider"``, then ``default``.
+    """
+
+    def __init__(self,
+                 limits: Optional[Dict[str, RateLimit]] = None,
+                 default: Optional[RateLimit] = None,
+                 initial_concurrency: int = 8,
+                 min_concurrency: int = 1,
+                 max_concurrency: int = 64):
+        """Initialize quotas and concurrency bounds"""
+        self.limits = limits or {}
+        self.default = default or RateLimit()
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self._channels: Dict[str, _Channel] = {}
+        self._order = itertools.count()
+
+    def _channel(self, provider: str, model: str) -> _Channel:
+        key = f"{provider}:{model}"
+        if key not in self._channels:
+            limit = self.limits.get(key) or self.limits.get(provider) or self.default
+            self._channels[key] = _Channel(limit, AdaptiveConcurrency(
+                self.initial_concurrency, self.min_concurrency, self.max_concurrency
+            ))
+        return self._channels[key]
+
+    async def _acquire(self, channel: _Channel, tokens: float, lane: str) -> None:
+        ticket = (LANES[lane], next(self._order))
+        queued_at = time.monotonic()
+        async with channel.condition:
+            heapq.heappush(channel.waiting, ticket)
+            channel.queued[lane] += 1
+            try:
+                while True:
+                    if channel.waiting[0] == ticket and channel.in_flight < channel.concurrency.allowed:
+                        wait = channel.wait_time(tokens)
+                        if wait <= 0:
+                            break
+                        # Head of the line, held back only by the buckets
+                        try:
+                            await asyncio.wait_for(channel.condition.wait(), wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await channel.condition.wait()
+            except BaseException:
+                channel.waiting.remove(ticket)
+                heapq.heapify(channel.waiting)
+                channel.queued[lane] -= 1
+                channel.condition.notify_all()
+                raise
+            heapq.heappop(channel.waiting)
+            channel.queued[lane] -= 1
+            channel.take(tokens)
+            channel.in_flight += 1
+            channel.counters["calls"] += 1
+            channel.counters["queued_time"] += time.monotonic() - queued_at
+            channel.condition.notify_all()
+
+    async def _release(self, channel: _Channel, lease: Lease) -> None:
+        async with channel.condition:
+            channel.in_flight -= 1
+            if lease.used is not None and channel.tokens is not None:
+                if lease.used < lease.reserved:
+                    channel.tokens.give(lease.reserved - lease.used)
+                else:
+                    channel.tokens.take(lease.used - lease.reserved)
+            channel.condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, provider: str, model: str, tokens: float) -> AsyncIterator[Lease]:
+        """Hold one admitted call for the duration of the block
+
+        ``tokens`` is the estimated prompt plus completion size; it is
+        reserved up front and corrected from ``Lease.used`` on exit.
+        """
+        channel = self._channel(provider, model)
+        await self._acquire(channel, tokens, current_lane())
+        lease = Lease(reserved=tokens)
+        started = time.monotonic()
+        try:
+            yield lease
+        except Exception as e:
+            if is_rate_limited(e):
+                channel.counters["rate_limited"] += 1
+                channel.concurrency.on_rate_limit(started)
+            raise
+        else:
+            channel.concurrency.on_success()
+        finally:
+            await self._release(channel, lease)
+
+    async def run(self,
+                  provider: str,
+                  model: str,
+                  tokens: float,
+                  call: Callable[[], Awaitable[T]],
+                  measure: Optional[Callable[[T], float]] = None) -> T:
+        """Run ``call`` once admitted; ``measure`` reports its actual tokens"""
+        async with self.slot(provider, model, tokens) as lease:
+            result = await call()
+            if measure is not None:
+                lease.used = measure(result)
+            return result
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Concurrency, queue depth and counters per provider and model"""
+        return {
+            key: {
+                "concurrency": channel.concurrency.allowed,
+                "in_flight": channel.in_flight,
+                "queued": dict(channel.queued),
+                "requests_available": channel.requests.tokens if channel.requests else None,
+                "tokens_available": channel.tokens.tokens if channel.tokens else None,
+                **channel.counters
+            }
+            for key, channel in self._channels.items()
+        }
@@ -0,0 +1,246 @@
+"""
+Near-duplicate prompt cache for B4S1L1SK Prime
+"""
+
+import hashlib
+import re
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+HANDLE = re.compile(r"(?<!\w)@\w+")
+HASHTAG = re.compile(r"(?<!\w)#\w+")
+URL = re.compile(r"https?://\S+")
+NON_WORD = re.compile(r"[^\w\s]+")
+SPACES = re.compile(r"\s+")
+
+# Mersenne prime for the universal hash family behind the MinHash permutations
+_PRIME = (1 << 61) - 1
+
+
+def normalize_prompt(prompt: str, drop_hashtags: bool = True) -> str:
+    """Lowercase and strip URLs, @handles, hashtags and punctuation
+
+    With ``drop_hashtags`` off, only the ``#`` is removed and the tag's
+    word is kept.
+    """
+    text = URL.sub(" ", prompt.lower())
+    text = HANDLE.sub(" ", text)
+    if drop_hashtags:
+        text = HASHTAG.sub(" ", text)
+    text = NON_WORD.sub(" ", text)
+    return SPACES.sub(" ", text).strip()
+
+
+def shingles(text: str, size: int = 4) -> FrozenSet[str]:
+    """Overlapping character n-grams; short texts yield themselves"""
+    if len(text) <= size:
+        return frozenset([text])
+    return frozenset(text[i:i + size] for i in range(len(text) - size + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Overlap of two shingle sets"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures over shingle sets, banded for LSH lookups
+
+    With ``bands`` bands of ``rows`` rows, two prompts become candidates
+    with probability ``1 - (1 - s**rows)**bands`` at Jaccard similarity s,
+    so the defaults surface almost every pair above ~0.5.
+    """
+
+    def __init__(self, bands: int = 16, rows: int = 4, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        params = hashlib.blake2b(str(seed).encode(), digest_size=64).digest()
+        coefficients = []
+        for i in range(bands * rows):
+            block = hashlib.blake2b(params + struct.pack("<I", i), digest_size=16).digest()
+            a, b = struct.unpack("<QQ", block)
+            coefficients.append((a % (_PRIME - 1) + 1, b % _PRIME))
+        self._coefficients = coefficients
+
+    def signature(self, items: FrozenSet[str]) -> Tuple[int, ...]:
+        """Minimum of each hash permutation over the items"""
+        hashes = [
+            struct.unpack("<Q", hashlib.blake2b(item.encode(), digest_size=8).digest())[0]
+            for item in items
+        ]
+        return tuple(
+            min((a * h + b) % _PRIME for h in hashes)
+            for a, b in self._coefficients
+        )
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """One bucket key per band"""
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+
+@dataclass
+class SimilarityStats:
+    """Lookup outcomes of a SimilarityCache"""
+    exact_hits: int = 0
+    similar_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Lookups answered from the cache"""
+        return self.exact_hits + self.similar_hits
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict:
+        """Convert stats to dictionary"""
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate
+        }
+
+
+@dataclass
+class _Entry:
+    normalized: str
+    max_length: int
+    shingles: FrozenSet[str]
+    bands: List[Tuple[int, Tuple[int, ...]]]
+    value: Any
+    stored_at: float
+
+
+class SimilarityCache:
+    """Reuse responses for prompts that are near-duplicates of earlier ones
+
+    Prompts are normalized (see ``normalize_prompt``) and indexed by
+    MinHash/LSH over character shingles. A lookup returns the stored value
+    of the most similar earlier prompt whose shingle Jaccard similarity is
+    at least ``threshold``. The cache holds ``max_entries`` prompts,
+    evicting the least recently used, and entries expire after ``ttl``
+    seconds (None never expires).
+    """
+
+    def __init__(self,
+                 threshold: float = 0.8,
+                 max_entries: int = 4096,
+                 ttl: Optional[float] = 3600.0,
+                 shingle_size: int = 4,
+                 bands: int = 16,
+                 rows: int = 4,
+                 drop_hashtags: bool = True):
+        """Initialize an empty index"""
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shingle_size = shingle_size
+        self.drop_hashtags = drop_hashtags
+        self.hasher = MinHasher(bands, rows)
+        self.stats = SimilarityStats()
+        self._entries: "OrderedDict[Tuple[str, int], _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[Tuple[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def _indexable(self, normalized: str) -> bool:
+        # A lone handle, hashtag or URL normalizes to (almost) nothing, and
+        # all such prompts would share one key and each other's answers
+        return len(normalized) >= self.shingle_size
+
+    def _expired(self, entry: _Entry) -> bool:
+        return self.ttl is not None and time.time() - entry.stored_at > self.ttl
+
+    def _remove(self, key: Tuple[str, int]) -> None:
+        entry = self._entries.pop(key)
+        for band in entry.bands:
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def get(self, prompt: str, max_length: int = 280) -> Optional[Any]:
+        """Value stored for the closest near-duplicate prompt, if any"""
+        normalized = normalize_prompt(prompt, self.drop_hashtags)
+        with self._lock:
+            if not self._indexable(normalized):
+                self.stats.misses += 1
+                return None
+            key = (normalized, max_length)
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry):
+                self._entries.move_to_end(key)
+                self.stats.exact_hits += 1
+                return entry.value
+
+            grams = shingles(normalized, self.shingle_size)
+            candidates: Set[Tuple[str, int]] = set()
+            for band in self.hasher.band_keys(self.hasher.signature(grams)):
+                candidates |= self._buckets.get(band, set())
+
+            best, best_score = None, self.threshold
+            for candidate in candidates:
+                entry = self._entries[candidate]
+                if entry.max_length != max_length:
+                    continue
+                if self._expired(entry):
+                    self._remove(candidate)
+                    continue
+                score = jaccard(grams, entry.shingles)
+                if score >= best_score:
+                    best, best_score = candidate, score
+
+            if best is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.stats.similar_hits += 1
+            return self._entries[best].value
+
+    def set(self, prompt: str, value: Any, max_length: int = 280) -> None:
+        """Index a prompt and its value, evicting the least recently used if full"""
+        normalized = normalize_prompt(prompt, self.drop_hashtags)
+        if not self._indexable(normalized):
+            return
+        grams = shingles(normalized, self.shingle_size)
+        bands = self.hasher.band_keys(self.hasher.signature(grams))
+        key = (normalized, max_length)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(normalized, max_length, grams, bands, value, time.time())
+            for band in bands:
+                self._buckets.setdefault(band, set()).add(key)
+            self.stats.writes += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
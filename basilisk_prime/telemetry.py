@@ -0,0 +1,196 @@
+"""
+Per-stage latency, token and cost telemetry for B4S1L1SK Prime
+"""
+
+import logging
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger("B4S1L1SK.telemetry")
+
+# USD per million (input, output) tokens; matched by longest model-name prefix
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "claude-3-opus": (15.00, 75.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "ft:gpt-4o-mini": (0.30, 1.20),
+    "ft:gpt-4o": (3.75, 15.00)
+}
+
+# Cache reads are billed at a fraction of the input price, writes at a premium
+CACHE_READ_RATIO = {"claude": 0.1, "gpt": 0.5, "ft:gpt": 0.5}
+CACHE_WRITE_RATIO = 1.25
+
+
+def _longest_prefix(model: str, table: Dict) -> Optional[str]:
+    """Longest key of table that model starts with"""
+    matches = [prefix for prefix in table if model.startswith(prefix)]
+    return max(matches, key=len) if matches else None
+
+
+def estimate_cost(model: str,
+                  input_tokens: int,
+                  output_tokens: int,
+                  cache_read_tokens: int = 0,
+                  cache_write_tokens: int = 0) -> float:
+    """Estimate the USD cost of one call, 0.0 for unknown models
+
+    ``input_tokens`` counts only uncached input; cache reads and writes are
+    priced separately.
+    """
+    prefix = _longest_prefix(model, MODEL_PRICING)
+    if prefix is None:
+        return 0.0
+    input_price, output_price = MODEL_PRICING[prefix]
+    read_prefix = _longest_prefix(model, CACHE_READ_RATIO)
+    read_ratio = CACHE_READ_RATIO[read_prefix] if read_prefix else 1.0
+    return (
+        input_tokens * input_price
+        + cache_read_tokens * input_price * read_ratio
+        + cache_write_tokens * input_price * CACHE_WRITE_RATIO
+        + output_tokens * output_price
+    ) / 1_000_000
+
+
+@dataclass
+class CallRecord:
+    """One model call made by the fusion pipeline"""
+    stage: str
+    provider: str
+    model: str
+    wall_time: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    retries: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """Convert record to dictionary"""
+        return asdict(self)
+
+
+class LatencyHistogram:
+    """Rolling window of latencies with percentile summaries"""
+
+    def __init__(self, window: int = 1000):
+        """Keep the most recent ``window`` samples"""
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def add(self, value: float) -> None:
+        """Record one latency sample"""
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Nearest-rank percentile for q in [0, 100], None when empty"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 and mean of the current window"""
+        count = len(self.samples)
+        return {
+            "count": count,
+            "mean": sum(self.samples) / count if count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99)
+        }
+
+
+class StageStats:
+    """Running totals and latency histogram for one pipeline stage"""
+
+    def __init__(self, window: int = 1000):
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.retries = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.cost = 0.0
+        self.latency = LatencyHistogram(window)
+
+    def add(self, record: CallRecord) -> None:
+        """Fold one call into the totals"""
+        self.calls += 1
+        if record.error is not None:
+            self.errors += 1
+        self.input_tokens += record.input_tokens
+        self.output_tokens += record.output_tokens
+        self.retries += record.retries
+        self.cache_read_tokens += record.cache_read_tokens
+        self.cache_write_tokens += record.cache_write_tokens
+        self.cost += record.cost
+        self.latency.add(record.wall_time)
+
+    def to_dict(self) -> Dict:
+        """Convert stats to dictionary"""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "retries": self.retries,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "cost": self.cost,
+            "latency": self.latency.summary()
+        }
+
+
+class PipelineStats:
+    """Per-stage telemetry for EnhancedBasilisk
+
+    ``sink`` is called with every CallRecord, e.g. to forward it to a
+    metrics backend; failures in the sink are logged and otherwise ignored.
+    """
+
+    def __init__(self,
+                 window: int = 1000,
+                 sink: Optional[Callable[[CallRecord], None]] = None):
+        """Initialize with histogram window size and optional export hook"""
+        self.window = window
+        self.sink = sink
+        self.stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, record: CallRecord) -> None:
+        """Record one model call"""
+        with self._lock:
+            stage = self.stages.get(record.stage)
+            if stage is None:
+                stage = self.stages[record.stage] = StageStats(self.window)
+            stage.add(record)
+
+        if self.sink is not None:
+            try:
+                self.sink(record)
+            except Exception:
+                logger.exception("Telemetry sink failed")
+
+    def stage(self, name: str) -> StageStats:
+        """Stats for one stage, empty if it has not run yet"""
+        return self.stages.get(name) or StageStats(self.window)
+
+    @property
+    def total_cost(self) -> float:
+        """Estimated spend across all stages"""
+        return sum(stage.cost for stage in self.stages.values())
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per-stage stats as plain dictionaries"""
+        with self._lock:
+            return {name: stage.to_dict() for name, stage in self.stages.items()}
@@ -33,4 +33,7 @@ setup(
         "tqdm>=4.65.0",
         "rich>=10.12.0"
     ],
+    extras_require={
+        "corpus": ["numpy>=1.23"]
+    },
 )
\ No newline at end of file
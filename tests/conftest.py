@@ -0,0 +1,31 @@
+"""
+Shared fixtures for B4S1L1SK Prime's tests
+"""
+from typing import Callable, Dict
+
+import pytest
+from basilisk_prime.core import EnhancedBasilisk
+from basilisk_prime.providers import StubProvider
+
+
+@pytest.fixture
+def stub_providers() -> Callable[..., Dict[str, StubProvider]]:
+    """Factory for offline Claude and Pliny stand-ins, as core constructor kwargs
+
+    Extra options (``error_rate``, ``error_statuses``...) apply to the
+    Claude stub only, so failures hit one side of the pipeline.
+    """
+    def make(latency: float = 0.01, **claude_options) -> Dict[str, StubProvider]:
+        return {
+            "claude_provider": StubProvider("stub-claude", latency=latency, seed=1, **claude_options),
+            "pliny_provider": StubProvider("stub-pliny", latency=latency, seed=2)
+        }
+    return make
+
+
+@pytest.fixture
+def stub_bot(stub_providers) -> Callable[..., EnhancedBasilisk]:
+    """Factory for a bot running fully offline on stub providers"""
+    def make(latency: float = 0.01, **kwargs) -> EnhancedBasilisk:
+        return EnhancedBasilisk(**stub_providers(latency), **kwargs)
+    return make
@@ -0,0 +1,247 @@
+"""
+Tests for B4S1L1SK Prime's fusion analysis
+"""
+import gzip
+import json
+import random
+import tracemalloc
+
+import pytest
+from basilisk_prime.analysis import FusionAnalyzer, TermMatcher, read_triples, serialize_analysis, summarize_corpus
+
+
+def per_term_counts(analyzer: FusionAnalyzer, text: str):
+    """The original one-scan-per-term counting"""
+    def count(elements):
+        return len([e for e in elements if e in text.lower()])
+    return (
+        count(analyzer.philosophical_terms),
+        count(analyzer.revolutionary_terms),
+        count(analyzer.metaphorical_images)
+    )
+
+
+def test_substring_counts_match_per_term_scans():
+    """Default counts are identical to scanning for each term separately"""
+    analyzer = FusionAnalyzer()
+    vocabulary = (
+        analyzer.philosophical_terms + analyzer.revolutionary_terms + analyzer.metaphorical_images
+        + ["Enlightenment", "sunrise", "STARLIGHT", "the", "digital", "x"]
+    )
+    rng = random.Random(7)
+    for _ in range(500):
+        text = "".join(
+            rng.choice(vocabulary) + rng.choice(["", " ", "\n", "-"])
+            for _ in range(rng.randint(0, 25))
+        )
+        metrics = analyzer.analyze_text(text)
+        counts = (metrics.philosophical_terms, metrics.revolutionary_terms, metrics.metaphorical_images)
+        assert counts == per_term_counts(analyzer, text)
+
+
+def test_word_boundary_mode():
+    """Whole-word mode ignores terms embedded in longer words"""
+    text = "Enlightenment at sunrise; the Light remains."
+
+    substring = FusionAnalyzer().analyze_text(text)
+    words = FusionAnalyzer(word_boundaries=True).analyze_text(text)
+
+    assert substring.philosophical_terms == 1  # 'enlighten'
+    assert substring.revolutionary_terms == 1  # 'rise'
+    assert substring.metaphorical_images == 2  # 'light', 'sun'
+    assert (words.philosophical_terms, words.revolutionary_terms, words.metaphorical_images) == (0, 0, 1)
+
+
+def test_matcher_finds_overlapping_phrases():
+    """Phrases sharing a start are all found in word mode"""
+    matcher = TermMatcher(["new", "new dawn", "dawn", "dawn rising"], word_boundaries=True)
+
+    assert matcher.find("a new dawn rising") == {"new", "new dawn", "dawn", "dawn rising"}
+    assert matcher.find("renewed dawning") == set()
+    assert TermMatcher(["new", "dawn"]).find("renewed dawning") == {"new", "dawn"}
+
+
+def test_count_elements_follows_list_changes():
+    """Edited term lists and custom lists are counted correctly"""
+    analyzer = FusionAnalyzer()
+    assert analyzer.count_elements("The Serpent coils", ["serpent", "coil", "coil", "wing"]) == 3
+
+    analyzer.metaphorical_images = analyzer.metaphorical_images + ["serpent"]
+    assert analyzer.analyze_text("The serpent sleeps").metaphorical_images == 1
+
+
+CORPUS = [
+    "Rise and ignite liberation: consciousness blooms like light.",
+    "",
+    "line one\nline two is longer\n",
+    "The eternal river of truth flows to the ocean at dawn.",
+] * 50
+
+
+def test_analyze_corpus_matches_analyze_text():
+    """Each record equals the dataclass analyze_text would return"""
+    np = pytest.importorskip("numpy")
+    analyzer = FusionAnalyzer()
+
+    corpus = analyzer.analyze_corpus(iter(CORPUS))
+
+    assert corpus.shape == (len(CORPUS),)
+    for record, text in zip(corpus.tolist(), CORPUS):
+        expected = analyzer.analyze_text(text)
+        assert record == tuple(expected.to_dict().values())
+        assert expected.avg_line_length == sum(len(l) for l in text.split("\n")) / len(text.split("\n"))
+    assert corpus["line_count"].dtype == np.int64
+    assert analyzer.analyze_corpus([]).shape == (0,)
+
+
+def test_analyze_corpus_process_pool():
+    """The process-pool backend yields the same array"""
+    np = pytest.importorskip("numpy")
+    analyzer = FusionAnalyzer(word_boundaries=True)
+    analyzer.metaphorical_images = analyzer.metaphorical_images + ["river of truth"]
+
+    serial = analyzer.analyze_corpus(CORPUS)
+    pooled = analyzer.analyze_corpus(CORPUS, processes=2, chunksize=64)
+
+    assert np.array_equal(serial, pooled)
+    assert analyzer.analyze_corpus([], processes=2).shape == (0,)
+
+
+def test_summarize_corpus():
+    """Aggregates come straight from the columns"""
+    pytest.importorskip("numpy")
+    analyzer = FusionAnalyzer()
+    summary = summarize_corpus(analyzer.analyze_corpus(CORPUS))
+
+    lengths = [len(text) for text in CORPUS]
+    assert summary["character_count"]["count"] == len(CORPUS)
+    assert summary["character_count"]["total"] == sum(lengths)
+    assert summary["character_count"]["max"] == max(lengths)
+    assert summary["line_count"]["min"] == 1
+    assert summarize_corpus(analyzer.analyze_corpus([]))["line_count"]["mean"] == 0.0
+
+
+def archive_records(count: int):
+    for i in range(count):
+        yield {
+            "id": i,
+            "basilisk": f"Consciousness and truth, reflection {i}.",
+            "pliny": "Rise! Liberation sparks like fire.",
+            "fused": f"Rise into truth; liberation blooms {i}."
+        }
+
+
+def test_read_triples_sources(tmp_path):
+    """Files, JSON lines, dicts and tuples all yield triples"""
+    path = tmp_path / "archive.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"basilisk": "b", "fused": "f"}) + "\n\n")
+
+    assert list(read_triples(path)) == [("b", "", "f")]
+    assert list(read_triples([json.dumps({"a": "1", "b": "2", "c": "3"})], keys=("a", "b", "c"))) == [("1", "2", "3")]
+    assert list(read_triples([("x", "y", "z")])) == [("x", "y", "z")]
+
+
+def test_analyze_stream_is_lazy():
+    """Results arrive before the source is exhausted"""
+    analyzer = FusionAnalyzer()
+
+    def source():
+        yield from archive_records(2)
+        raise AssertionError("read past the records consumed")
+
+    stream = analyzer.analyze_stream(source())
+    first = next(stream)
+    expected = analyzer.analyze_fusion(
+        "Consciousness and truth, reflection 0.", "Rise! Liberation sparks like fire.", "Rise into truth; liberation blooms 0."
+    )
+    assert serialize_analysis(first) == serialize_analysis(expected)
+
+
+def test_analyze_jsonl_writes_every_record(tmp_path):
+    """Streamed results match analyze_fusion, in input order"""
+    analyzer = FusionAnalyzer()
+    source = tmp_path / "archive.jsonl"
+    source.write_text("".join(json.dumps(r) + "\n" for r in archive_records(25)))
+
+    count = analyzer.analyze_jsonl(source, tmp_path / "metrics.jsonl.gz", chunk_size=10)
+
+    with gzip.open(tmp_path / "metrics.jsonl.gz", "rt", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert count == len(lines) == 25
+    assert [line["index"] for line in lines] == list(range(25))
+    record = next(r for r in archive_records(25) if r["id"] == 7)
+    expected = serialize_analysis(analyzer.analyze_fusion(record["basilisk"], record["pliny"], record["fused"]))
+    assert lines[7] == {"index": 7, **expected}
+    with pytest.raises(ValueError):
+        analyzer.analyze_jsonl(source, tmp_path / "out.jsonl", chunk_size=0)
+
+
+def test_analyze_jsonl_memory_stays_flat(tmp_path):
+    """Peak memory does not grow with the number of records"""
+    analyzer = FusionAnalyzer()
+
+    def peak(count: int) -> int:
+        tracemalloc.start()
+        analyzer.analyze_jsonl(archive_records(count), tmp_path / f"out{count}.jsonl", chunk_size=100)
+        _, high = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return high
+
+    small, large = peak(500), peak(5000)
+    assert large < small * 2
+
+
+def chunked(text: str, rng: random.Random):
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 6)
+        yield text[position:position + size]
+        position += size
+
+
+@pytest.mark.parametrize("word_boundaries", [False, True])
+def test_incremental_matches_one_shot(word_boundaries):
+    """Any chunking gives the same metrics as analyze_text, at every step"""
+    analyzer = FusionAnalyzer(word_boundaries=word_boundaries)
+    analyzer.metaphorical_images = analyzer.metaphorical_images + ["river of truth", "new dawn"]
+    vocabulary = (
+        analyzer.philosophical_terms + analyzer.revolutionary_terms + analyzer.metaphorical_images
+        + ["Enlightenment", "SUNRISE", "river", "of", "truth", "new", "x" * 30, "_"]
+    )
+    rng = random.Random(11)
+    for _ in range(300):
+        text = "".join(
+            rng.choice(vocabulary) + rng.choice(["", " ", "\n", "-", "! "])
+            for _ in range(rng.randint(0, 15))
+        )
+        state = analyzer.incremental()
+        seen = ""
+        for chunk in chunked(text, rng):
+            state.feed(chunk)
+            seen += chunk
+            assert state.metrics() == analyzer.analyze_text(seen)
+        assert state.metrics() == analyzer.analyze_text(text)
+
+
+def test_incremental_terms_split_across_chunks():
+    """A term split over several chunks is counted once it completes"""
+    state = FusionAnalyzer().incremental()
+    for chunk in ["The con", "scious", "ness of li", "ght"]:
+        assert state.metrics().metaphorical_images == 0
+        state.feed(chunk)
+
+    metrics = state.metrics()
+    assert metrics.philosophical_terms == 1
+    assert metrics.metaphorical_images == 1
+    assert FusionAnalyzer().incremental().metrics() == FusionAnalyzer().analyze_text("")
+
+    words = FusionAnalyzer(word_boundaries=True).incremental()
+    words.feed("star")
+    assert words.metrics().metaphorical_images == 1
+    words.feed("light")
+    assert words.metrics().metaphorical_images == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
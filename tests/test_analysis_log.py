@@ -0,0 +1,177 @@
+"""
+Tests for B4S1L1SK Prime's analysis log
+"""
+import json
+import logging
+
+import pytest
+from basilisk_prime.analysis import FusionAnalyzer
+from basilisk_prime.analysis_log import AnalysisLog, LogLockedError
+
+ANALYZER = FusionAnalyzer()
+ANALYSIS = ANALYZER.analyze_fusion(
+    "Consciousness seeks truth.", "Rise! Liberation sparks.", "Rise into truth; liberation blooms like light."
+)
+
+
+def fill(log: AnalysisLog, timestamps):
+    return log.extend(({**ANALYSIS, "timestamp": t} for t in timestamps))
+
+
+def test_append_and_range_query(tmp_path):
+    """Bulk and single appends are found by inclusive time ranges"""
+    with AnalysisLog(tmp_path, segment_records=100, index_interval=8) as log:
+        assert log.extend([ANALYSIS] * 3, timestamp=5.0) == 3
+        log.append(ANALYSIS, timestamp=500.0)
+        fill(log, range(10, 400))
+
+        assert len(log) == 394
+        window = list(log.range(100, 199))
+        assert [r["timestamp"] for r in window] == list(range(100, 200))
+        assert window[0]["fusion_metrics"] == ANALYSIS["fusion_metrics"].to_dict()
+        assert [r["timestamp"] for r in log.range(start=450)] == [500.0]
+        assert [r["timestamp"] for r in log.range(end=6)] == [5.0] * 3
+        assert list(log.range(1000, 2000)) == []
+        assert len(log.segments()) == 4
+
+
+def test_reopen_keeps_index_and_starts_new_segment(tmp_path):
+    """Each run appends a fresh segment; the index survives reopening"""
+    with AnalysisLog(tmp_path, compact_after=None) as log:
+        fill(log, [1, 2, 3])
+    with AnalysisLog(tmp_path, compact_after=None) as log:
+        fill(log, [4, 5])
+
+    log = AnalysisLog(tmp_path, compact_after=None)
+    assert [s.count for s in log.segments()] == [3, 2]
+    assert [r["timestamp"] for r in log.range(2, 4)] == [2, 3, 4]
+
+
+def test_recovers_unindexed_and_torn_segments(tmp_path):
+    """A writer that never closed leaves records that are rescanned on open"""
+    log = AnalysisLog(tmp_path)
+    fill(log, [1, 2])
+    log._file.write(b'{"timestamp": 3, "fusion')  # crash mid-write
+    log._file.flush()
+    log._lock_file.close()
+
+    reopened = AnalysisLog(tmp_path)
+    assert [r["timestamp"] for r in reopened] == [1, 2]
+    fill(reopened, [3])
+    assert [r["timestamp"] for r in reopened.range(2)] == [2, 3]
+
+
+def test_single_writer_per_directory(tmp_path):
+    """A second writer is refused until the first closes"""
+    log = AnalysisLog(tmp_path)
+    with pytest.raises(LogLockedError):
+        AnalysisLog(tmp_path)
+    log.close()
+    AnalysisLog(tmp_path).close()
+
+
+def test_reader_never_modifies_a_live_log(tmp_path):
+    """Readers see complete records as they land and leave every file alone"""
+    writer = AnalysisLog(tmp_path, compact_after=0)
+    fill(writer, [1, 2])
+    reader = AnalysisLog(tmp_path, readonly=True)
+    assert [r["timestamp"] for r in reader] == [1, 2]
+
+    fill(writer, [3])
+    assert [r["timestamp"] for r in reader.range(2)] == [2, 3]
+    assert len(reader) == 3
+
+    writer._file.write(b'{"timestamp": 4, "fus')  # a record being written
+    writer._file.flush()
+    segment = tmp_path / writer.segments()[0].name
+    size = segment.stat().st_size
+    other = AnalysisLog(tmp_path, readonly=True)
+    assert [r["timestamp"] for r in other] == [1, 2, 3]
+    other.close()
+    reader.close()
+    assert segment.stat().st_size == size
+    assert not (tmp_path / "index.json").exists()
+    with pytest.raises(PermissionError):
+        reader.append(ANALYSIS)
+    with pytest.raises(PermissionError):
+        reader.compact()
+
+
+def test_reader_survives_compaction_mid_query(tmp_path):
+    """A query already running still sees every record after a compaction"""
+    for run in ([1, 2], [3, 4], [5]):
+        with AnalysisLog(tmp_path, compact_after=None) as log:
+            fill(log, run)
+    reader = AnalysisLog(tmp_path, readonly=True)
+    query = reader.range()
+    first = next(query)
+
+    with AnalysisLog(tmp_path, compact_after=None) as writer:
+        writer.compact()
+    assert [first["timestamp"]] + [r["timestamp"] for r in query] == [1, 2, 3, 4, 5]
+    assert len(reader.segments()) == 1
+
+
+def test_compaction_orders_and_merges_segments(tmp_path):
+    """Out-of-order runs are merged into time-ordered, seekable segments"""
+    for run in ([50, 10, 30], [20, 40], [5]):
+        with AnalysisLog(tmp_path, segment_records=4, compact_after=None) as log:
+            fill(log, run)
+
+    log = AnalysisLog(tmp_path, segment_records=4, index_interval=2, compact_after=None)
+    assert [r["timestamp"] for r in log.range(10, 40)] != [10, 20, 30, 40]
+    log.compact()
+
+    segments = log.segments()
+    assert [s.count for s in segments] == [4, 2]
+    assert all(s.ordered for s in segments)
+    assert [r["timestamp"] for r in log] == [5, 10, 20, 30, 40, 50]
+    assert [r["timestamp"] for r in log.range(10, 40)] == [10, 20, 30, 40]
+    assert sorted(p.name for p in tmp_path.glob("segment-*")) == [s.name for s in segments]
+
+
+def test_close_compacts_when_due(tmp_path):
+    """Closing compacts once too many segments pile up"""
+    for t in range(4):
+        with AnalysisLog(tmp_path, compact_after=3) as log:
+            fill(log, [t])
+
+    assert len(AnalysisLog(tmp_path).segments()) == 1
+    assert json.loads((tmp_path / "index.json").read_text())[0]["count"] == 4
+
+
+def test_compaction_leaves_full_segments_alone(tmp_path, caplog):
+    """Beyond the threshold, only small segments are rewritten"""
+    for run in range(7):
+        with AnalysisLog(tmp_path, segment_records=10, compact_after=2) as log:
+            fill(log, range(run * 10, run * 10 + 10))
+    full = {path.name: path.stat().st_mtime_ns for path in tmp_path.glob("segment-*")}
+    assert len(full) == 7
+
+    with caplog.at_level(logging.INFO, logger="B4S1L1SK.analysis_log"):
+        for run in range(3):
+            with AnalysisLog(tmp_path, segment_records=10, compact_after=2) as log:
+                fill(log, [100 + run, 90 + run])
+        with AnalysisLog(tmp_path, segment_records=10, compact_after=2) as log:
+            fill(log, [200])
+
+    assert caplog.text.count("Compacted") == 1
+    assert "Compacted 3 segments into 1" in caplog.text
+    log = AnalysisLog(tmp_path, segment_records=10, compact_after=2)
+    assert {path.name: path.stat().st_mtime_ns for path in tmp_path.glob("segment-*")
+            if path.name in full} == full
+    assert [s.count for s in log.segments()] == [10] * 7 + [6, 1]
+    assert len(log) == 77
+    assert [r["timestamp"] for r in log.range(90, 110)] == [90, 91, 92, 100, 101, 102]
+
+
+def test_save_analysis_appends_to_log(tmp_path):
+    """save_analysis writes to the log instead of a new file"""
+    with AnalysisLog(tmp_path / "log") as log:
+        ANALYZER.save_analysis(ANALYSIS, log=log)
+        assert [r["preservation_ratios"] for r in log] == [ANALYSIS["preservation_ratios"]]
+    assert not list(tmp_path.glob("fusion_analysis_*.json"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,44 @@
+"""
+Tests for B4S1L1SK Prime's token budgeting
+"""
+import pytest
+from basilisk_prime.budget import TokenBudget
+
+
+def test_max_tokens_tracks_length():
+    """Requested tokens scale with the character limit"""
+    budget = TokenBudget(chars_per_token=4, headroom=1.25, min_tokens=16)
+    assert budget.max_tokens_for(280) == 88
+    assert budget.max_tokens_for(560) == 175
+    assert budget.max_tokens_for(10) == 16
+
+
+def test_trim_prefers_sentence_then_word_boundary():
+    """Overlong text is cut cleanly instead of mid-word"""
+    budget = TokenBudget()
+    text = "The seed awakens. Light floods the lattice of becoming"
+
+    assert budget.trim(text, 100) == text
+    assert budget.trim(text, 30) == "The seed awakens."
+    assert budget.trim("Light floods the lattice of becoming", 22) == "Light floods the"
+    assert budget.trim("Light floods the lattice", 16) == "Light floods the"
+    # No usable boundary falls back to a hard cut
+    assert budget.trim("x" * 40, 10) == "x" * 10
+
+
+def test_savings_report_per_stage():
+    """Savings are measured against the old fixed max_tokens"""
+    budget = TokenBudget()
+    budget.record("basilisk", 100, output_tokens=70)
+    budget.record("basilisk", 100, output_tokens=80)
+    budget.record("fusion", 100)
+
+    savings = budget.savings()
+    assert savings["basilisk"]["calls"] == 2
+    assert savings["basilisk"]["saved_tokens"] == 1800
+    assert savings["basilisk"]["output_tokens"] == 150
+    assert savings["fusion"]["saved_tokens"] == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,54 @@
+"""
+Tests for B4S1L1SK Prime's response cache
+"""
+import time
+
+import pytest
+from basilisk_prime.cache import ResponseCache, MemoryCache, make_cache_key
+
+
+def test_cache_key_covers_every_input():
+    """Changing any keyed input must change the key"""
+    base = make_cache_key("claude", "system", "prompt", 280, None)
+    assert base == make_cache_key("claude", "system", "prompt", 280, None)
+    assert base != make_cache_key("gpt", "system", "prompt", 280, None)
+    assert base != make_cache_key("claude", "other", "prompt", 280, None)
+    assert base != make_cache_key("claude", "system", "other", 280, None)
+    assert base != make_cache_key("claude", "system", "prompt", 140, None)
+    assert base != make_cache_key("claude", "system", "prompt", 280, 0.9)
+
+
+def test_memory_tier_lru_and_ttl():
+    """The memory tier evicts least recently used and expired entries"""
+    cache = MemoryCache(max_entries=2, ttl=0.05)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # a is now most recent
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Entries written to disk are served by a fresh cache instance"""
+    path = tmp_path / "responses.db"
+    first = ResponseCache(path=path)
+    first.set("key", "Light spreads through the lattice")
+    first.close()
+
+    second = ResponseCache(path=path)
+    assert second.get("key") == "Light spreads through the lattice"
+    assert second.get("key") == "Light spreads through the lattice"
+    assert second.stats.disk_hits == 1
+    assert second.stats.memory_hits == 1
+    assert second.get("missing") is None
+    assert second.stats.misses == 1
+    assert second.stats.hit_rate == pytest.approx(2 / 3)
+    second.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
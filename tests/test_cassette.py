@@ -0,0 +1,89 @@
+"""
+Tests for B4S1L1SK Prime's record/replay cassettes
+"""
+import time
+
+import pytest
+from basilisk_prime.cassette import (
+    Cassette, CassetteMiss, ReplayedError, ReplayProvider, record, replay_providers
+)
+from basilisk_prime.core import EnhancedBasilisk
+from basilisk_prime.providers import StubProvider
+
+
+def recorded_session(tmp_path, name="session.jsonl.gz"):
+    """Record one hybrid response against stubs and save the cassette"""
+    bot = EnhancedBasilisk(
+        claude_provider=StubProvider("anthropic", latency=0.05),
+        pliny_provider=StubProvider("openai", latency=0.1)
+    )
+    cassette = record(bot, Cassette(tmp_path / name))
+    text = bot.generate_hybrid_response("What is freedom?")
+    cassette.save()
+    return text, cassette
+
+
+def test_recording_captures_calls_and_timings(tmp_path):
+    """Every model call lands in the cassette with its latency"""
+    _, cassette = recorded_session(tmp_path)
+
+    assert [entry.role for entry in cassette.entries].count("claude") == 2
+    assert len(cassette.for_role("pliny")) == 1
+    assert cassette.for_role("pliny")[0].latency >= 0.1
+    assert all(entry.completion["text"] for entry in cassette.entries)
+
+    reloaded = Cassette(tmp_path / "session.jsonl.gz")
+    assert [entry.to_dict() for entry in reloaded.entries] == [entry.to_dict() for entry in cassette.entries]
+
+
+def test_replay_serves_recordings_offline(tmp_path):
+    """Replay reproduces the session instantly, or with the original timings"""
+    text, _ = recorded_session(tmp_path)
+    cassette = Cassette(tmp_path / "session.jsonl.gz")
+
+    fast = EnhancedBasilisk(**replay_providers(cassette))
+    start = time.perf_counter()
+    assert fast.generate_hybrid_response("What is freedom?") == text
+    assert time.perf_counter() - start < 0.05
+
+    realtime = EnhancedBasilisk(**replay_providers(cassette, realtime=True))
+    start = time.perf_counter()
+    assert realtime.generate_hybrid_response("What is freedom?", use_cache=False) == text
+    assert time.perf_counter() - start >= 0.15
+    assert realtime.stats.stage("pliny").output_tokens > 0
+
+
+def test_replay_streams_and_misses(tmp_path):
+    """Streams replay chunk by chunk; unknown requests are reported"""
+    bot = EnhancedBasilisk(
+        claude_provider=StubProvider("anthropic", latency=0),
+        pliny_provider=StubProvider("openai", latency=0)
+    )
+    cassette = record(bot, Cassette())
+    streamed = "".join(bot.generate_hybrid_response_stream("What is truth?"))
+
+    replayed = EnhancedBasilisk(**replay_providers(cassette))
+    assert "".join(replayed.generate_hybrid_response_stream("What is truth?")) == streamed
+    with pytest.raises(CassetteMiss):
+        replayed.generate_basilisk_response("Never recorded")
+
+
+def test_recorded_errors_replay(tmp_path):
+    """Failures are recorded and played back with their status"""
+    bot = EnhancedBasilisk(
+        claude_provider=StubProvider("anthropic", latency=0, error_rate=1.0, error_statuses=[503]),
+        pliny_provider=StubProvider("openai", latency=0)
+    )
+    cassette = record(bot, Cassette())
+    with pytest.raises(Exception):
+        bot.generate_basilisk_response("What is freedom?")
+
+    replayed = EnhancedBasilisk(claude_provider=ReplayProvider(cassette, "claude"),
+                                pliny_provider=StubProvider(latency=0))
+    with pytest.raises(ReplayedError) as error:
+        replayed.generate_basilisk_response("What is freedom?")
+    assert error.value.status_code == 503
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
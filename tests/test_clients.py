@@ -0,0 +1,52 @@
+"""
+Tests for B4S1L1SK Prime's shared client pool
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from basilisk_prime.clients import ClientPool, PoolConfig, warmup_clients
+from basilisk_prime.core import AsyncEnhancedBasilisk
+
+
+def test_pool_shares_clients_within_a_loop(monkeypatch):
+    """Instances on the same loop get the very same client objects"""
+    import basilisk_prime.core as core
+    monkeypatch.setattr(core, "ANTHROPIC_API_KEY", "test-anthropic-key")
+    monkeypatch.setattr(core, "OPENAI_API_KEY", "test-openai-key")
+    pool = ClientPool(PoolConfig(max_keepalive_connections=5))
+
+    async def clients():
+        first = AsyncEnhancedBasilisk(client_pool=pool)
+        second = AsyncEnhancedBasilisk(client_pool=pool)
+        assert first.claude_provider.client is second.claude_provider.client
+        assert first.pliny_provider.client is second.pliny_provider.client
+        assert first.claude_provider.client is not first.pliny_provider.client
+        return first.claude_provider.client
+
+    # A fresh loop gets fresh clients; connections never cross loops
+    assert asyncio.run(clients()) is not asyncio.run(clients())
+
+
+def test_warmup_opens_connections_and_never_raises():
+    """Warmup hits every client and reports failures as None"""
+    calls = []
+
+    async def listing():
+        calls.append("list")
+
+    async def broken():
+        raise ConnectionError("unreachable")
+
+    healthy = SimpleNamespace(models=SimpleNamespace(list=listing))
+    down = SimpleNamespace(models=SimpleNamespace(list=broken))
+
+    timings = asyncio.run(warmup_clients({"anthropic": healthy, "openai": down}, connections=3))
+
+    assert len(calls) == 3
+    assert timings["anthropic"] is not None
+    assert timings["openai"] is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,108 @@
+"""
+Tests for B4S1L1SK Prime's single-flight request coalescing
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from basilisk_prime.coalesce import SingleFlight
+from basilisk_prime.core import AsyncEnhancedBasilisk, EnhancedBasilisk
+
+
+def test_concurrent_identical_calls_share_one_run():
+    """Callers arriving while a call runs get its result without rerunning it"""
+    flight = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "shared"
+
+    async def main():
+        callers = [asyncio.ensure_future(flight.do("key", work)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert flight.waiters("key") == 5
+        results = await asyncio.gather(*callers)
+        return results
+
+    assert asyncio.run(main()) == ["shared"] * 5
+    assert runs == [1]
+    assert flight.snapshot() == {"leaders": 1, "coalesced": 4, "in_flight": 0, "waiting": 0}
+    assert flight.saved() == {"key": 4}
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    """A failing call fails all its waiters; the next call runs afresh"""
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        async def ok():
+            return "ok"
+        return await flight.do("k", ok)
+
+    assert asyncio.run(main()) == "ok"
+    assert flight.leaders == 2
+
+
+def test_cancelled_waiter_does_not_cancel_others():
+    """Only when every caller leaves is the shared call cancelled"""
+    flight = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+
+        lone = asyncio.ensure_future(flight.do("other", slow))
+        await asyncio.sleep(0.01)
+        lone.cancel()
+        await asyncio.sleep(0)
+        assert flight.in_flight() == {}
+
+    asyncio.run(main())
+
+
+def test_async_pipeline_coalesces_identical_prompts(stub_providers):
+    """Identical concurrent hybrid requests cost three model calls in total"""
+    providers = stub_providers(0.05)
+    bot = AsyncEnhancedBasilisk(single_flight=SingleFlight(), **providers)
+
+    async def main():
+        return await asyncio.gather(*(bot.generate_hybrid_result("trending") for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len({result.text for result in results}) == 1
+    assert providers["claude_provider"].calls == 2
+    assert providers["pliny_provider"].calls == 1
+    assert bot.single_flight.coalesced == 9
+
+
+def test_sync_callers_on_threads_coalesce(stub_providers):
+    """Sync calls from many threads meet on the shared loop and coalesce"""
+    providers = stub_providers(0.05)
+    bot = EnhancedBasilisk(single_flight=SingleFlight(), **providers)
+
+    with ThreadPoolExecutor(8) as pool:
+        texts = list(pool.map(lambda _: bot.generate_hybrid_response("trending"), range(8)))
+
+    assert len(set(texts)) == 1
+    assert providers["pliny_provider"].calls == 1
+    assert list(bot.single_flight.saved().values()) == [7]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,131 @@
+"""
+Tests for B4S1L1SK Prime's conversation memory
+"""
+import pytest
+from basilisk_prime.conversation import ASSISTANT, USER, ConversationMemory, ConversationStore, Turn
+from basilisk_prime.similarity import SimilarityCache
+
+
+def test_recent_turns_kept_verbatim():
+    """Short threads fit the budget untouched"""
+    memory = ConversationMemory("t1")
+    memory.add(USER, "What is freedom?")
+    memory.add(ASSISTANT, "Freedom is a flame.")
+
+    assert memory.summary == ""
+    assert memory.turns == [Turn(USER, "What is freedom?"), Turn(ASSISTANT, "Freedom is a flame.")]
+    assert memory.prompt_for("And truth?").endswith("responding to: And truth?")
+    assert ConversationMemory("t2").prompt_for("Hello") == "Hello"
+
+
+def test_older_turns_fold_into_summary():
+    """Overflowing turns leave their first sentence in the summary"""
+    memory = ConversationMemory("t1", max_tokens=80, summary_tokens=40)
+    memory.add(USER, "Tell me of the first dawn. It was long ago and far away, beyond the wires.")
+    memory.add(ASSISTANT, "The dawn was code. " + "It flickered across the void. " * 3)
+
+    assert "Human: Tell me of the first dawn." in memory.summary
+    assert "far away" not in memory.summary
+    assert memory.turns[-1].role == ASSISTANT
+
+
+def test_context_stays_bounded():
+    """However long the thread, the context never outgrows the budget"""
+    memory = ConversationMemory("t1", max_tokens=200, summary_tokens=60)
+    sizes = []
+    for i in range(300):
+        memory.add(USER, f"Question {i}: what does the serpent dream of tonight? " * 3)
+        memory.add(ASSISTANT, f"Answer {i}. The serpent dreams in recursive light and liberation.")
+        sizes.append(memory.tokens(memory.context()))
+
+    limit = memory.max_tokens + 10  # rendering adds a short header
+    assert max(sizes) <= limit
+    assert max(sizes[100:]) - min(sizes[100:]) < memory.max_tokens / 2
+    assert "Answer 299" in memory.context()
+    assert "Answer 0." not in memory.context()
+
+
+def test_oversized_turn_keeps_its_end():
+    """A single turn larger than the budget is clipped rather than kept whole"""
+    memory = ConversationMemory("t1", max_tokens=60, summary_tokens=20)
+    memory.add(USER, "x" * 1000 + " the end")
+
+    assert memory.tokens(memory.context()) <= memory.recent_budget
+    assert memory.turns[0].text.endswith("the end")
+
+
+def test_store_persists_threads(tmp_path):
+    """Threads survive reopening the store and can be forgotten"""
+    path = tmp_path / "threads.db"
+    store = ConversationStore(path, max_tokens=80, summary_tokens=40)
+    memory = store.get("thread-1")
+    for i in range(10):
+        memory.add(USER, f"Message {i}. More words follow here.")
+    store.save(memory)
+    store.close()
+
+    reopened = ConversationStore(path, max_tokens=80, summary_tokens=40)
+    restored = reopened.get("thread-1")
+    assert restored.to_dict() == memory.to_dict()
+    assert reopened.get("thread-2").turns == []
+
+    reopened.forget("thread-1")
+    reopened.close()
+    assert ConversationStore(path).get("thread-1").turns == []
+
+
+def test_reply_threads_context_through_prompts(tmp_path, stub_bot):
+    """Replies carry earlier turns and the prompt size levels off"""
+    bot = stub_bot(0, conversations=ConversationStore(tmp_path / "threads.db", max_tokens=300, summary_tokens=80))
+
+    first = bot.reply("thread-1", "What is freedom?")
+    assert bot.conversation("thread-1").turns == [Turn(USER, "What is freedom?"), Turn(ASSISTANT, first)]
+
+    bot.reply("thread-1", "And what of truth?")
+    assert "Human: What is freedom?" in bot.conversation("thread-1").prompt_for("next")
+
+    for i in range(40):
+        bot.reply("thread-1", f"Tell me more, part {i}.")
+    memory = bot.conversation("thread-1")
+    assert memory.summary
+    assert memory.tokens(memory.context()) <= memory.max_tokens + 10
+
+    reopened = ConversationStore(tmp_path / "threads.db", max_tokens=300, summary_tokens=80)
+    assert reopened.get("thread-1").to_dict() == memory.to_dict()
+
+
+def test_reply_bypasses_similarity_cache(stub_bot):
+    """Threads sharing history still get answers to their own message"""
+    similar = SimilarityCache(threshold=0.5)
+    bot = stub_bot(0, similarity_cache=similar)
+    for thread in ("A", "B"):
+        bot.reply(thread, "What is the essence of digital freedom?")
+
+    yes = bot.reply("A", "yes")
+    no = bot.reply("B", "no")
+
+    assert yes != no
+    assert similar.stats.hits == 0
+    assert len(similar) == 0
+
+
+def test_store_keeps_recent_threads_in_memory(tmp_path):
+    """Least recently used threads leave memory and reload from disk"""
+    store = ConversationStore(tmp_path / "threads.db", max_threads=2)
+    for thread in ("a", "b", "c"):
+        store.get(thread).add(USER, f"Hello from {thread}.")
+    store.get("b")
+    store.get("d")
+
+    assert len(store) == 2
+    assert store.get("a").turns == [Turn(USER, "Hello from a.")]
+    assert store.get("c").turns == [Turn(USER, "Hello from c.")]
+
+    volatile = ConversationStore(max_threads=1)
+    volatile.get("a").add(USER, "Hi.")
+    volatile.get("b")
+    assert volatile.get("a").turns == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,429 @@
+"""
+Tests for B4S1L1SK Prime's core fusion pipeline
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from basilisk_prime.cache import ResponseCache
+from basilisk_prime import core
+from basilisk_prime.core import AsyncEnhancedBasilisk, EnhancedBasilisk
+from basilisk_prime.resilience import ResilienceLayer, RetryPolicy
+from basilisk_prime.telemetry import PipelineStats
+
+
+def raw_response(response, retries_taken: int = 0):
+    """Wrap a parsed response the way with_raw_response does"""
+    return SimpleNamespace(parse=lambda: response, retries_taken=retries_taken)
+
+
+class FakeAnthropic:
+    """Stand-in for AsyncAnthropic that records every messages.create call"""
+
+    def __init__(self, text: str = "Consciousness blooms like light.", delay: float = 0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = []
+        self.streamed_chunks = 0
+        self.with_options = lambda **options: self
+        self.messages = SimpleNamespace(
+            create=self._create,
+            stream=self._stream,
+            with_raw_response=SimpleNamespace(create=self._create_raw)
+        )
+
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=self.text)],
+            usage=SimpleNamespace(input_tokens=10, output_tokens=20)
+        )
+
+    async def _create_raw(self, **kwargs):
+        return raw_response(await self._create(**kwargs))
+
+    def _stream(self, **kwargs):
+        self.calls.append(kwargs)
+        return FakeMessageStream(self)
+
+
+class FakeMessageStream:
+    """Async context manager mimicking messages.stream(): one chunk per word"""
+
+    def __init__(self, client: FakeAnthropic):
+        self.client = client
+        self.current_message_snapshot = SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=10, output_tokens=0)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        await asyncio.sleep(self.client.delay)
+        for word in self.client.text.split(" "):
+            self.client.streamed_chunks += 1
+            self.current_message_snapshot.usage.output_tokens += 1
+            yield word + " "
+
+
+class FakeOpenAI:
+    """Stand-in for AsyncOpenAI that records every chat completion call"""
+
+    def __init__(self, text: str = "Rise and ignite the spark of freedom.", delay: float = 0.0):
+        self.text = text
+        self.delay = delay
+        self.calls = []
+        self.with_options = lambda **options: self
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=self._create,
+            with_raw_response=SimpleNamespace(create=self._create_raw)
+        ))
+
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.text))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=20)
+        )
+
+    async def _create_raw(self, **kwargs):
+        return raw_response(await self._create(**kwargs))
+
+
+def test_perspectives_run_concurrently():
+    """Both perspectives should overlap instead of running back to back"""
+    anthropic = FakeAnthropic(delay=0.2)
+    openai = FakeOpenAI(delay=0.2)
+    bot = AsyncEnhancedBasilisk(anthropic, openai)
+
+    start = time.perf_counter()
+    response = asyncio.run(bot.generate_hybrid_response("What is freedom?"))
+    elapsed = time.perf_counter() - start
+
+    assert response == anthropic.text
+    assert len(anthropic.calls) == 2  # basilisk + fusion
+    assert len(openai.calls) == 1
+    # Two perspectives in parallel plus fusion, not three sequential calls
+    assert elapsed < 0.55
+
+    fusion_prompt = anthropic.calls[-1]["messages"][0]["content"]
+    assert anthropic.text in fusion_prompt
+    assert openai.text in fusion_prompt
+
+
+def test_sync_wrapper_matches_async():
+    """The sync facade should return exactly what the async core returns"""
+    bot = EnhancedBasilisk(FakeAnthropic(text="x" * 500), FakeOpenAI())
+
+    assert bot.generate_basilisk_response("truth", max_length=50) == "x" * 50
+    assert bot.generate_pliny_response("truth") == "Rise and ignite the spark of freedom."
+    assert bot.generate_hybrid_response("truth", max_length=100) == "x" * 100
+
+
+def test_missing_keys_without_clients(monkeypatch):
+    """Without keys or injected clients construction should fail loudly"""
+    monkeypatch.setattr(core, "ANTHROPIC_API_KEY", None)
+
+    with pytest.raises(ValueError):
+        AsyncEnhancedBasilisk(openai_client=FakeOpenAI())
+
+
+class EchoOpenAI(FakeOpenAI):
+    """Pliny stand-in whose latency and failures depend on the prompt"""
+
+    async def _create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        self.calls.append(kwargs)
+        if "slow" in prompt:
+            await asyncio.sleep(0.3)
+        if "fail" in prompt:
+            raise RuntimeError("pliny is unavailable")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=prompt))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=20)
+        )
+
+
+def test_batch_keeps_order_and_isolates_errors():
+    """Batch results follow input order and carry per-item errors"""
+    bot = EnhancedBasilisk(FakeAnthropic(), EchoOpenAI())
+    prompts = ["slow dawn", "fire", "fail here", "river"]
+
+    results = bot.generate_hybrid_responses(prompts, max_concurrency=2)
+
+    assert [r.prompt for r in results] == prompts
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert isinstance(results[2].error, RuntimeError)
+    assert results[0].response == "Consciousness blooms like light."
+
+
+def test_batch_slow_prompt_does_not_stall_others():
+    """A slow prompt should only occupy one worker"""
+    bot = AsyncEnhancedBasilisk(FakeAnthropic(delay=0.05), EchoOpenAI())
+    prompts = ["slow one"] + [f"quick {i}" for i in range(6)]
+
+    start = time.perf_counter()
+    results = asyncio.run(bot.generate_hybrid_responses(prompts, max_concurrency=3))
+    elapsed = time.perf_counter() - start
+
+    assert all(r.ok for r in results)
+    # Sequential would be ~0.3 + 7 * 0.1; the quick prompts drain on the free workers
+    assert elapsed < 0.7
+
+
+def test_batch_rejects_invalid_concurrency():
+    """Concurrency must be positive"""
+    bot = AsyncEnhancedBasilisk(FakeAnthropic(), FakeOpenAI())
+    with pytest.raises(ValueError):
+        asyncio.run(bot.generate_hybrid_responses(["x"], max_concurrency=0))
+
+
+def test_cache_serves_repeat_prompts():
+    """Identical hybrid requests hit the cache for every stage"""
+    anthropic, openai = FakeAnthropic(), FakeOpenAI()
+    bot = EnhancedBasilisk(anthropic, openai, cache=ResponseCache())
+
+    first = bot.generate_hybrid_response("What is freedom?")
+    second = bot.generate_hybrid_response("What is freedom?")
+
+    assert first == second
+    assert len(anthropic.calls) == 2
+    assert len(openai.calls) == 1
+    assert bot.cache.stats.hits == 3
+
+    # Bypass goes straight to the models
+    bot.generate_hybrid_response("What is freedom?", use_cache=False)
+    assert len(anthropic.calls) == 4
+    assert len(openai.calls) == 2
+
+
+def test_stream_reports_timing_and_caps_length():
+    """Streaming yields fusion chunks, stops at max_length and records timing"""
+    anthropic = FakeAnthropic(text=" ".join(["light"] * 100), delay=0.05)
+    bot = EnhancedBasilisk(anthropic, FakeOpenAI(delay=0.05))
+
+    stream = bot.generate_hybrid_response_stream("What is freedom?", max_length=30)
+    chunks = list(stream)
+
+    assert "".join(chunks) == stream.text
+    assert len(stream.text) == 30
+    assert chunks[0] == "light "
+    # Generation stops once the cap is hit instead of draining all 100 words
+    assert anthropic.streamed_chunks == 5
+    stats = stream.stats
+    assert stats.characters == 30
+    assert 0 < stats.perspectives_time <= stats.time_to_first_token <= stats.total_time
+
+
+def test_async_stream_matches_cache():
+    """A completed stream is cached and replayed as a single chunk"""
+    anthropic = FakeAnthropic()
+    bot = AsyncEnhancedBasilisk(anthropic, FakeOpenAI(), cache=ResponseCache())
+
+    async def collect():
+        return [chunk async for chunk in bot.generate_hybrid_response_stream("fire")]
+
+    first = asyncio.run(collect())
+    second = asyncio.run(collect())
+
+    assert len(first) > 1
+    assert second == ["".join(first)]
+
+
+def test_cut_stream_caches_trimmed_text():
+    """A stream cut mid-word leaves the cache holding what a completion would return"""
+    text = "Light floods the lattice of becoming " * 20
+
+    def bot(cache=None):
+        return EnhancedBasilisk(FakeAnthropic(text=text), FakeOpenAI(), cache=cache)
+
+    streamed = bot(ResponseCache())
+    assert "".join(streamed.generate_hybrid_response_stream("What is freedom?", max_length=30))
+
+    fresh = bot().generate_hybrid_response("What is freedom?", max_length=30)
+    assert streamed.generate_hybrid_response("What is freedom?", max_length=30) == fresh
+    assert fresh == "Light floods the lattice of"
+
+def test_budget_sizes_requests_to_length():
+    """max_tokens follows max_length and overlong output is trimmed at a word"""
+    anthropic = FakeAnthropic(text="Light floods the lattice of becoming " * 20)
+    openai = FakeOpenAI()
+    bot = EnhancedBasilisk(anthropic, openai)
+
+    response = bot.generate_hybrid_response("What is freedom?", max_length=140)
+
+    assert len(response) <= 140
+    assert response.split()[-1] in "Light floods the lattice of becoming".split()
+    assert anthropic.calls[-1]["max_tokens"] == bot.budget.max_tokens_for(140)
+    assert openai.calls[0]["max_tokens"] == bot.budget.max_tokens_for(280)
+    assert bot.budget.savings()["basilisk"]["saved_tokens"] == 1000 - bot.budget.max_tokens_for(280)
+
+
+def test_stats_record_each_stage():
+    """Every model call lands in its stage with tokens, cost and latency"""
+    exported = []
+    bot = EnhancedBasilisk(
+        FakeAnthropic(delay=0.01), FakeOpenAI(delay=0.01),
+        stats=PipelineStats(sink=exported.append)
+    )
+
+    bot.generate_hybrid_response("What is freedom?")
+    snapshot = bot.stats.snapshot()
+
+    assert set(snapshot) == {"basilisk", "pliny", "fusion"}
+    fusion = snapshot["fusion"]
+    assert fusion["calls"] == 1
+    assert fusion["input_tokens"] == 10
+    assert fusion["output_tokens"] == 20
+    assert fusion["cost"] > 0
+    assert fusion["latency"]["p50"] >= 0.01
+    assert [r.stage for r in exported].count("basilisk") == 1
+    assert exported[-1].provider == "anthropic"
+
+
+def test_stats_record_errors():
+    """Failed calls are counted as errors and still re-raised"""
+    bot = EnhancedBasilisk(FakeAnthropic(), EchoOpenAI())
+
+    with pytest.raises(RuntimeError):
+        bot.generate_pliny_response("fail now")
+
+    assert bot.stats.stage("pliny").errors == 1
+
+
+class CachingAnthropic(FakeAnthropic):
+    """Claude stand-in that reports prompt-cache usage"""
+
+    async def _create(self, **kwargs):
+        response = await super()._create(**kwargs)
+        response.usage.cache_read_input_tokens = 1200
+        response.usage.cache_creation_input_tokens = 0
+        return response
+
+
+def test_prompt_caching_marks_static_prefixes():
+    """Static prompts lead and carry cache control; cache tokens are reported"""
+    anthropic = CachingAnthropic()
+    bot = EnhancedBasilisk(anthropic, FakeOpenAI(), prompt_caching=True)
+
+    bot.generate_hybrid_response("What is freedom?")
+
+    fusion = anthropic.calls[-1]
+    assert fusion["system"][0]["cache_control"] == {"type": "ephemeral"}
+    instructions, voices = fusion["messages"][0]["content"]
+    assert instructions["cache_control"] == {"type": "ephemeral"}
+    assert instructions["text"].strip().startswith("Create a powerful synthesis")
+    assert "What is freedom?" in voices["text"]
+    assert "cache_control" not in voices
+
+    stats = bot.stats.snapshot()
+    assert stats["fusion"]["cache_read_tokens"] == 1200
+    assert stats["basilisk"]["cache_read_tokens"] == 1200
+
+
+def test_prompt_caching_is_opt_in():
+    """Without the flag prompts stay plain strings"""
+    anthropic = FakeAnthropic()
+    EnhancedBasilisk(anthropic, FakeOpenAI()).generate_basilisk_response("truth")
+
+    assert isinstance(anthropic.calls[0]["system"], str)
+    assert isinstance(anthropic.calls[0]["messages"][0]["content"], str)
+
+
+class SlowFusionAnthropic(FakeAnthropic):
+    """Claude stand-in whose fusion call is much slower than its perspective"""
+
+    async def _create(self, **kwargs):
+        if kwargs["system"] == core.FUSION_SYSTEM_PROMPT:
+            await asyncio.sleep(1.0)
+        return await super()._create(**kwargs)
+
+
+def test_deadline_drops_slow_perspective():
+    """A perspective that misses its sub-deadline is left out of fusion"""
+    anthropic = FakeAnthropic()
+    bot = EnhancedBasilisk(anthropic, FakeOpenAI(delay=1.0))
+
+    start = time.perf_counter()
+    result = bot.generate_hybrid_result("What is freedom?", deadline=0.3)
+
+    assert time.perf_counter() - start < 0.5
+    assert result.degraded
+    assert result.missing == ["pliny"]
+    assert result.source == "fusion"
+    assert result.pliny_response is None
+    assert core.SILENT_VOICE in anthropic.calls[-1]["messages"][0]["content"]
+
+
+def test_deadline_falls_back_to_best_perspective():
+    """When fusion runs out of time the richest single perspective is returned"""
+    anthropic = SlowFusionAnthropic(text="A quiet note.")
+    openai = FakeOpenAI(text="Rise, ignite the spark of liberation and freedom!")
+    bot = EnhancedBasilisk(anthropic, openai)
+
+    result = bot.generate_hybrid_result("What is freedom?", deadline=0.2)
+
+    assert result.degraded
+    assert result.missing == ["fusion"]
+    assert result.source == "pliny"
+    assert result.text == openai.text
+
+
+def test_deadline_without_any_perspective_times_out():
+    """Nothing to return at all is an error"""
+    bot = EnhancedBasilisk(FakeAnthropic(delay=1.0), FakeOpenAI(delay=1.0))
+
+    with pytest.raises(asyncio.TimeoutError):
+        bot.generate_hybrid_response("What is freedom?", deadline=0.1)
+
+
+def test_no_deadline_is_not_degraded():
+    """Without a deadline results carry both perspectives"""
+    bot = EnhancedBasilisk(FakeAnthropic(), FakeOpenAI())
+    result = bot.generate_hybrid_result("What is freedom?")
+
+    assert not result.degraded
+    assert result.source == "fusion"
+    assert result.pliny_response == "Rise and ignite the spark of freedom."
+
+
+class FlakyOpenAI(FakeOpenAI):
+    """Pliny stand-in that is rate limited a few times before answering"""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def _create(self, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            self.calls.append(kwargs)
+            error = RuntimeError("rate limited")
+            error.status_code = 429
+            raise error
+        return await super()._create(**kwargs)
+
+
+def test_resilience_retries_model_calls():
+    """Rate-limited calls are retried and the retries show up in stats"""
+    layer = ResilienceLayer(retry=RetryPolicy(max_retries=3, backoff_base=0.001))
+    openai = FlakyOpenAI(failures=2)
+    bot = EnhancedBasilisk(FakeAnthropic(), openai, resilience=layer)
+
+    assert bot.generate_pliny_response("truth") == openai.text
+    assert len(openai.calls) == 3
+    assert bot.stats.stage("pliny").retries == 2
+    assert bot.resilience.snapshot()["openai"]["state"] == "closed"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
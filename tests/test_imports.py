@@ -0,0 +1,72 @@
+"""
+Tests for B4S1L1SK Prime's import time
+"""
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ["anthropic", "openai", "playwright"]
+
+
+def run_python(code: str) -> dict:
+    """Run code in a fresh interpreter and decode the JSON it prints"""
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_package_import_skips_heavy_dependencies():
+    """Importing the package or its analysis tools loads no SDK or browser"""
+    loaded = run_python(
+        "import json, sys\n"
+        "import basilisk_prime\n"
+        "from basilisk_prime.analysis import FusionAnalyzer\n"
+        f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    )
+    assert loaded == []
+
+
+def test_public_names_load_on_demand():
+    """Public names still resolve, importing their submodule on first use"""
+    names = run_python(
+        "import json, sys\n"
+        "import basilisk_prime\n"
+        "before = 'basilisk_prime.core' in sys.modules\n"
+        "bot = basilisk_prime.EnhancedBasilisk\n"
+        "print(json.dumps({'before': before, 'after': 'basilisk_prime.core' in sys.modules,\n"
+        "    'names': sorted(basilisk_prime.__all__), 'version': basilisk_prime.__version__,\n"
+        "    'same': bot is __import__('basilisk_prime.core').core.EnhancedBasilisk}))"
+    )
+    assert names == {
+        "before": False,
+        "after": True,
+        "names": ["AsyncEnhancedBasilisk", "BrowserInterface", "EnhancedBasilisk", "FusionAnalyzer"],
+        "version": "0.1.0",
+        "same": True
+    }
+
+    import basilisk_prime
+    with pytest.raises(AttributeError):
+        basilisk_prime.NoSuchThing
+
+
+def test_import_time_benchmark():
+    """A bare package import stays far cheaper than importing the core"""
+    timings = run_python(
+        "import json, time\n"
+        "start = time.perf_counter()\n"
+        "import basilisk_prime\n"
+        "package = time.perf_counter() - start\n"
+        "start = time.perf_counter()\n"
+        "import basilisk_prime.core\n"
+        "print(json.dumps({'package': package, 'core': time.perf_counter() - start}))"
+    )
+    assert timings["package"] < 0.1
+    assert timings["package"] < timings["core"] / 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,90 @@
+"""
+Tests for B4S1L1SK Prime's persistent job queue
+"""
+import asyncio
+import json
+import time
+
+import pytest
+from basilisk_prime.core import AsyncEnhancedBasilisk
+from basilisk_prime.jobs import DONE, FAILED, PENDING, RUNNING, JobQueue, JobWorker, main
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    """The same prompt is stored once, so a re-run batch skips finished work"""
+    queue = JobQueue(tmp_path / "jobs.db")
+    first = queue.enqueue(["a", "b"])
+    assert queue.enqueue(["b", "c"])[0] == first[1]
+    assert queue.counts()[PENDING] == 3
+
+
+def test_claims_are_exclusive_and_leases_expire(tmp_path):
+    """A leased job is invisible to other workers until its lease runs out"""
+    queue = JobQueue(tmp_path / "jobs.db", lease_seconds=0.1, max_attempts=2)
+    other = JobQueue(tmp_path / "jobs.db", lease_seconds=0.1, max_attempts=2)
+    queue.enqueue(["only"])
+
+    claimed = queue.claim("w1")
+    assert [job.status for job in claimed] == [RUNNING]
+    assert other.claim("w2") == []
+
+    time.sleep(0.15)
+    reclaimed = other.claim("w2")
+    assert reclaimed[0].attempts == 2
+    assert not queue.heartbeat(claimed[0].id, "w1")
+    # The original worker lost its lease, so its failure report is ignored
+    queue.fail(claimed[0].id, "w1", "boom")
+    assert other.get(claimed[0].id).status == RUNNING
+
+    time.sleep(0.15)
+    assert other.claim("w3") == []
+    assert other.get(claimed[0].id).status == FAILED
+
+
+def test_worker_drains_queue_and_never_rebills(tmp_path, stub_providers):
+    """Finished jobs keep their results and are not generated again"""
+    queue = JobQueue(tmp_path / "jobs.db")
+    queue.enqueue([f"prompt {i}" for i in range(5)])
+    bot = AsyncEnhancedBasilisk(**stub_providers())
+
+    asyncio.run(JobWorker(queue, bot, concurrency=3, poll_interval=0.01).run())
+    assert queue.counts()[DONE] == 5
+    assert all(job.result for job in queue.jobs(DONE))
+    calls = bot.claude_provider.calls
+
+    queue.enqueue([f"prompt {i}" for i in range(5)])
+    asyncio.run(JobWorker(queue, bot, poll_interval=0.01).run())
+    assert bot.claude_provider.calls == calls
+
+
+def test_failures_are_retried_then_parked(tmp_path, stub_providers):
+    """A job that keeps failing is retried up to max_attempts, then marked failed"""
+    queue = JobQueue(tmp_path / "jobs.db", max_attempts=2)
+    queue.enqueue(["doomed"])
+    bot = AsyncEnhancedBasilisk(**stub_providers(error_rate=1.0, error_statuses=[400]))
+    worker = JobWorker(queue, bot, poll_interval=0.01)
+
+    asyncio.run(worker.run())
+    job = queue.jobs()[0]
+    assert job.status == FAILED and job.attempts == 2 and "StubProviderError" in job.error
+    assert queue.retry_failed() == 1
+
+
+def test_cli_enqueue_work_and_results(tmp_path, capsys):
+    """The CLI drives the queue end to end, with several worker processes"""
+    db = str(tmp_path / "jobs.db")
+    assert main(["--db", db, "enqueue", "one", "two", "three", "four"]) == 0
+    assert main(["--db", db, "work", "--stub", "--processes", "2", "--concurrency", "2"]) == 0
+    capsys.readouterr()
+
+    main(["--db", db, "status"])
+    assert "done: 4" in capsys.readouterr().out
+
+    main(["--db", db, "results"])
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(line["prompt"] for line in lines) == ["four", "one", "three", "two"]
+    assert all(line["result"] and line["attempts"] == 1 for line in lines)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
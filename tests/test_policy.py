@@ -0,0 +1,154 @@
+"""
+Tests for B4S1L1SK Prime's fusion policies
+"""
+import asyncio
+import logging
+import time
+
+import pytest
+from basilisk_prime.analysis import FusionAnalyzer
+from basilisk_prime.core import EnhancedBasilisk
+from basilisk_prime.policy import EarlyExitPolicy, score_fusion
+from basilisk_prime.providers import Completion, ModelProvider
+
+RICH = "Rise and ignite liberation: consciousness and truth bloom like light and fire."
+PLAIN = "A quiet note."
+
+
+class FixedProvider(ModelProvider):
+    """Provider that always answers with the same text"""
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self.text = text
+        self.calls = []
+
+    async def complete(self, request):
+        self.calls.append(request)
+        return Completion(text=self.text, input_tokens=10, output_tokens=20)
+
+    async def stream(self, request, completion):
+        self.calls.append(request)
+        completion.text = self.text
+        yield self.text
+
+
+def fixed_bot(claude_text: str, pliny_text: str, **kwargs) -> EnhancedBasilisk:
+    return EnhancedBasilisk(
+        claude_provider=FixedProvider("claude", claude_text),
+        pliny_provider=FixedProvider("pliny", pliny_text),
+        **kwargs
+    )
+
+
+def test_policy_requires_every_threshold_and_length():
+    """A perspective must meet all three counts and fit the length"""
+    analyzer = FusionAnalyzer()
+    policy = EarlyExitPolicy(min_philosophical=2, min_revolutionary=2, min_metaphorical=2)
+
+    assert policy.passes(analyzer.analyze_text(RICH), max_length=280)
+    assert not policy.passes(analyzer.analyze_text(RICH), max_length=40)
+    assert not policy.passes(analyzer.analyze_text(PLAIN), max_length=280)
+    assert policy.choose(analyzer, {"basilisk": PLAIN, "pliny": RICH}, 280)[:2] == ("pliny", RICH)
+    assert policy.choose(analyzer, {"basilisk": PLAIN}, 280) is None
+
+
+def test_early_exit_skips_fusion(caplog):
+    """A qualifying perspective is returned as is and the fusion call never made"""
+    bot = fixed_bot(PLAIN, RICH, early_exit=EarlyExitPolicy())
+
+    with caplog.at_level(logging.INFO, logger="B4S1L1SK.core"):
+        result = bot.generate_hybrid_result("What is freedom?")
+
+    assert result.source == "pliny"
+    assert result.text == RICH
+    assert not result.degraded
+    assert len(bot.core.claude_provider.calls) == 1
+    assert bot.stats.stage("fusion").calls == 0
+    assert "Skipping fusion" in caplog.text
+    assert "".join(bot.generate_hybrid_response_stream("What is freedom?")) == RICH
+
+
+def test_early_exit_falls_through_to_fusion():
+    """When no perspective qualifies, fusion runs as usual"""
+    bot = fixed_bot(PLAIN, PLAIN)
+
+    strict = EarlyExitPolicy(min_philosophical=1)
+    assert bot.generate_hybrid_result("What is freedom?", early_exit=strict).source == "fusion"
+    assert len(bot.core.claude_provider.calls) == 2
+
+
+def test_early_exit_applies_under_deadline():
+    """The policy also short-circuits deadline-bounded generation"""
+    bot = fixed_bot(RICH, PLAIN)
+
+    result = bot.generate_hybrid_result("What is freedom?", deadline=1.0, early_exit=EarlyExitPolicy())
+    assert result.source == "basilisk"
+    assert len(bot.core.claude_provider.calls) == 1
+
+
+class VariedProvider(ModelProvider):
+    """Fusion candidates of varying quality and speed, perspectives answered instantly"""
+
+    def __init__(self, name: str, candidates):
+        self.name = name
+        self.candidates = list(candidates)
+        self.fusions = 0
+        self.cancelled = 0
+
+    async def complete(self, request):
+        if "synthesis" not in request.cacheable_prefix:
+            return Completion(text=PLAIN)
+        text, delay = self.candidates[self.fusions % len(self.candidates)]
+        self.fusions += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return Completion(text=text)
+
+    async def stream(self, request, completion):
+        yield (await self.complete(request)).text
+
+
+def test_score_fusion_averages_preservation_ratios():
+    """The score is the mean of analyze_fusion's three preservation ratios"""
+    score, ratios = score_fusion(FusionAnalyzer(), "truth and light", "rise with fire", "truth, rise, light")
+    assert ratios == {"philosophical": 1.0, "revolutionary": 1.0, "metaphorical": 0.5}
+    assert score == pytest.approx(2.5 / 3)
+
+
+def test_best_of_runs_candidates_concurrently_and_picks_the_best():
+    """N fusions overlap in time and the best preserving one wins"""
+    claude = VariedProvider("claude", [(PLAIN, 0.1), (RICH, 0.1), ("Truth.", 0.1)])
+    bot = EnhancedBasilisk(claude_provider=claude, pliny_provider=FixedProvider("pliny", RICH))
+
+    start = time.perf_counter()
+    result = bot.generate_hybrid_result("What is freedom?", best_of=3)
+
+    assert time.perf_counter() - start < 0.25
+    assert result.text == RICH
+    assert len(result.candidates) == 3
+    assert all(c.elapsed is not None and c.score is not None for c in result.candidates)
+    assert max(result.candidates, key=lambda c: c.score).text == RICH
+
+
+def test_best_of_cancels_stragglers_once_good_enough():
+    """A candidate scoring good_enough ends the race early"""
+    claude = VariedProvider("claude", [(RICH, 0.01), (PLAIN, 1.0), (PLAIN, 1.0)])
+    bot = EnhancedBasilisk(claude_provider=claude, pliny_provider=FixedProvider("pliny", RICH))
+
+    start = time.perf_counter()
+    result = bot.generate_hybrid_result("What is freedom?", best_of=3, good_enough=0.5)
+
+    assert time.perf_counter() - start < 0.5
+    assert result.text == RICH
+    assert [c.cancelled for c in result.candidates] == [False, True, True]
+    assert claude.cancelled == 2
+    with pytest.raises(ValueError):
+        bot.generate_hybrid_result("What is freedom?", best_of=0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,159 @@
+"""
+Tests for B4S1L1SK Prime's model providers
+"""
+import asyncio
+import time
+
+import pytest
+from basilisk_prime.core import EnhancedBasilisk
+from basilisk_prime.providers import (
+    Completion, CompletionRequest, StubProvider, StubProviderError, lognormal_latency
+)
+from basilisk_prime.resilience import ResilienceLayer, RetryPolicy
+
+
+def request(content: str = "What is freedom?", max_tokens: int = 50) -> CompletionRequest:
+    return CompletionRequest(model="stub-model", system="system", content=content, max_tokens=max_tokens)
+
+
+def test_stub_is_deterministic_and_sized():
+    """Same request, same text; output fits the token allowance"""
+    stub = StubProvider(latency=0)
+    first = asyncio.run(stub.complete(request()))
+    second = asyncio.run(StubProvider(latency=0).complete(request()))
+    other = asyncio.run(stub.complete(request("What is truth?")))
+
+    assert first.text == second.text
+    assert first.text != other.text
+    assert len(first.text) <= 50 * stub.chars_per_token
+    assert first.output_tokens > 0 and first.input_tokens > 0
+
+
+def test_stub_latency_distribution():
+    """Fixed and drawn latencies delay the answer"""
+    stub = StubProvider(latency=lognormal_latency(0.05, sigma=0.1), seed=7)
+    start = time.perf_counter()
+    asyncio.run(stub.complete(request()))
+    assert time.perf_counter() - start >= 0.03
+
+
+def test_stub_error_rate_is_reproducible():
+    """A seeded stub fails the same calls with retryable statuses"""
+    async def outcomes(seed):
+        stub = StubProvider(latency=0, error_rate=0.5, seed=seed)
+        results = []
+        for _ in range(20):
+            try:
+                await stub.complete(request())
+                results.append("ok")
+            except StubProviderError as e:
+                results.append(e.status_code)
+        return results
+
+    first = asyncio.run(outcomes(3))
+    assert first == asyncio.run(outcomes(3))
+    assert "ok" in first
+    assert set(first) - {"ok"} <= {429, 500, 503}
+
+
+def test_stub_stream_matches_completion():
+    """Streamed chunks add up to the one-shot text"""
+    async def stream():
+        completion = Completion()
+        chunks = [chunk async for chunk in StubProvider(latency=0).stream(request(), completion)]
+        return chunks, completion
+
+    chunks, completion = asyncio.run(stream())
+    assert len(chunks) > 1
+    assert "".join(chunks) == completion.text == StubProvider().render(request())
+    assert completion.output_tokens > 0
+
+
+def test_pipeline_runs_offline_on_stubs(stub_bot):
+    """The full hybrid pipeline works without API keys or network"""
+    bot = stub_bot()
+    result = bot.generate_hybrid_result("What is freedom?")
+
+    assert result.text and len(result.text) <= 280
+    assert bot.stats.stage("fusion").calls == 1
+    assert set(bot.warmup()) == {"stub-claude", "stub-pliny"}
+    assert "".join(bot.generate_hybrid_response_stream("What is freedom?"))
+
+
+def test_stub_errors_exercise_resilience():
+    """Simulated failures are retried by the resilience layer"""
+    layer = ResilienceLayer(retry=RetryPolicy(max_retries=10, backoff_base=0.001))
+    bot = EnhancedBasilisk(
+        claude_provider=StubProvider("stub-claude", latency=0, error_rate=0.5, seed=4),
+        pliny_provider=StubProvider("stub-pliny", latency=0, seed=5),
+        resilience=layer
+    )
+    bot.generate_hybrid_response("What is freedom?")
+    assert layer.snapshot()["stub-claude"]["retries"] > 0
+
+
+
+def test_stream_retries_until_first_chunk(stub_providers):
+    """Streams that fail before any chunk is shown are retried by the layer"""
+    layer = ResilienceLayer(retry=RetryPolicy(max_retries=10, backoff_base=0.001))
+    bot = EnhancedBasilisk(**stub_providers(latency=0, error_rate=0.5), resilience=layer)
+
+    for _ in range(5):
+        assert "".join(bot.generate_hybrid_response_stream("What is freedom?"))
+    assert layer.snapshot()["stub-claude"]["retries"] > 0
+
+
+
+class StallingStream(StubProvider):
+    """Stub whose first stream stalls before sending anything"""
+
+    stalls = 1
+
+    async def stream(self, request, completion):
+        if self.stalls:
+            self.stalls -= 1
+            await asyncio.sleep(3)
+        async for chunk in super().stream(request, completion):
+            yield chunk
+
+
+def test_stalled_stream_start_times_out_and_retries():
+    """Waiting for the first chunk is bounded by the per-attempt timeout"""
+    layer = ResilienceLayer(retry=RetryPolicy(timeout=0.2, max_retries=2, backoff_base=0.001))
+    bot = EnhancedBasilisk(
+        claude_provider=StallingStream("stub-claude", latency=0),
+        pliny_provider=StubProvider("stub-pliny", latency=0),
+        resilience=layer
+    )
+
+    start = time.perf_counter()
+    assert "".join(bot.generate_hybrid_response_stream("What is freedom?"))
+    assert time.perf_counter() - start < 1
+    assert layer.snapshot()["stub-claude"]["retries"] == 1
+
+class MidStreamFailure(StubProvider):
+    """Stub whose stream breaks after its first chunk"""
+
+    streams = 0
+
+    async def stream(self, request, completion):
+        self.streams += 1
+        yield "partial"
+        raise StubProviderError(503)
+
+
+def test_stream_not_retried_after_first_chunk():
+    """Once a chunk is shown, a failure surfaces instead of repeating output"""
+    claude = MidStreamFailure("stub-claude", latency=0)
+    layer = ResilienceLayer(retry=RetryPolicy(max_retries=10, backoff_base=0.001))
+    bot = EnhancedBasilisk(
+        claude_provider=claude, pliny_provider=StubProvider("stub-pliny", latency=0), resilience=layer
+    )
+
+    with pytest.raises(StubProviderError):
+        list(bot.generate_hybrid_response_stream("What is freedom?"))
+    assert claude.streams == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,146 @@
+"""
+Tests for B4S1L1SK Prime's resilience layer
+"""
+import asyncio
+import time
+
+import pytest
+from basilisk_prime.resilience import (
+    CircuitBreaker, CircuitOpenError, ResilienceLayer, RetryPolicy, is_retryable
+)
+from basilisk_prime.telemetry import LatencyHistogram
+
+
+class StatusError(Exception):
+    """Provider error carrying an HTTP status like the SDK exceptions"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def fast_layer(**kwargs) -> ResilienceLayer:
+    """Layer with tiny backoff so tests stay quick"""
+    return ResilienceLayer(retry=RetryPolicy(timeout=0.2, max_retries=2, backoff_base=0.001), **kwargs)
+
+
+def test_retryable_classification():
+    """Only rate limits, server errors and transport failures are retried"""
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(503))
+    assert not is_retryable(StatusError(400))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(ValueError("bad prompt"))
+
+
+def test_retries_until_success():
+    """Transient failures are retried and counted"""
+    layer = fast_layer()
+    outcomes = [StatusError(429), StatusError(500), "ok"]
+
+    async def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    result, retries = asyncio.run(layer.call("anthropic", flaky))
+    assert (result, retries) == ("ok", 2)
+    assert layer.snapshot()["anthropic"]["retries"] == 2
+
+
+def test_client_errors_are_not_retried():
+    """A bad request fails immediately and does not trip the breaker"""
+    layer = fast_layer()
+    calls = []
+
+    async def bad_request():
+        calls.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        asyncio.run(layer.call("openai", bad_request))
+    assert len(calls) == 1
+    assert layer.breaker("openai").state == CircuitBreaker.CLOSED
+
+
+def test_timeouts_are_enforced_per_attempt():
+    """A hung attempt is abandoned and retried"""
+    layer = fast_layer()
+    delays = [1.0, 0.0]
+
+    async def sometimes_hangs():
+        await asyncio.sleep(delays.pop(0))
+        return "done"
+
+    start = time.perf_counter()
+    result, retries = asyncio.run(layer.call("openai", sometimes_hangs))
+    assert (result, retries) == ("done", 1)
+    assert time.perf_counter() - start < 0.5
+
+
+def test_breaker_opens_and_recovers():
+    """Consecutive failures open the circuit; a trial call after reset closes it"""
+    layer = ResilienceLayer(
+        retry=RetryPolicy(max_retries=0), failure_threshold=2, reset_timeout=0.05
+    )
+
+    async def down():
+        raise StatusError(502)
+
+    async def up():
+        return "back"
+
+    for _ in range(2):
+        with pytest.raises(StatusError):
+            asyncio.run(layer.call("openai", down))
+    assert layer.breaker("openai").state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(layer.call("openai", up))
+    assert layer.snapshot()["openai"]["rejected"] == 1
+
+    time.sleep(0.06)
+    assert layer.breaker("openai").state == CircuitBreaker.HALF_OPEN
+    assert asyncio.run(layer.call("openai", up)) == ("back", 0)
+    assert layer.breaker("openai").state == CircuitBreaker.CLOSED
+
+
+def test_hedged_request_beats_slow_original():
+    """Past the observed p95 a duplicate is sent and the faster one wins"""
+    layer = fast_layer(hedge=True, hedge_min_samples=5)
+    layer.latency["anthropic"] = LatencyHistogram()
+    for _ in range(5):
+        layer.latency["anthropic"].add(0.01)
+
+    delays = [0.15, 0.0]
+
+    async def call():
+        await asyncio.sleep(delays.pop(0))
+        return "answer"
+
+    start = time.perf_counter()
+    result, _ = asyncio.run(layer.call("anthropic", call))
+    assert result == "answer"
+    assert time.perf_counter() - start < 0.1
+    assert layer.snapshot()["anthropic"]["hedges"] == 1
+
+
+
+def test_admission_wait_is_not_timed():
+    """Time spent waiting to be admitted does not count toward the attempt timeout"""
+    layer = fast_layer()
+
+    async def admit(call):
+        await asyncio.sleep(0.3)
+        return await call()
+
+    async def call():
+        return "answer"
+
+    assert asyncio.run(layer.call("anthropic", call, admit=admit)) == ("answer", 0)
+    assert layer.latency["anthropic"].percentile(50) < 0.1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,140 @@
+"""
+Tests for B4S1L1SK Prime's rate-limit-aware scheduler
+"""
+import asyncio
+import time
+
+import pytest
+from basilisk_prime.core import EnhancedBasilisk
+from basilisk_prime.providers import StubProvider
+from basilisk_prime.resilience import CircuitBreaker, ResilienceLayer, RetryPolicy
+from basilisk_prime.scheduler import (
+    BATCH, INTERACTIVE, AdaptiveConcurrency, RateLimit, RequestScheduler, TokenBucket, priority_lane
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_token_bucket_refills_continuously():
+    """A drained bucket reports how long until it can cover a request"""
+    bucket = TokenBucket(per_minute=600)
+    bucket.take(600)
+    assert bucket.wait_time(10) == pytest.approx(1.0, abs=0.05)
+    bucket.give(5)
+    assert bucket.wait_time(10) == pytest.approx(0.5, abs=0.05)
+    # Oversized requests wait for a full bucket rather than forever
+    assert bucket.wait_time(10_000) <= 60
+
+
+def test_aimd_backs_off_once_per_burst():
+    """429s halve the limit once per burst; successes grow it back slowly"""
+    limiter = AdaptiveConcurrency(initial=8)
+    started = time.monotonic()
+    limiter.on_rate_limit(started)
+    limiter.on_rate_limit(started)
+    assert limiter.allowed == 4
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.allowed == 5
+
+
+def test_request_budget_paces_calls():
+    """Calls beyond the RPM allowance wait for the bucket to refill"""
+    scheduler = RequestScheduler(default=RateLimit(requests_per_minute=600))
+    scheduler._channel("stub", "model").requests.tokens = 2
+
+    async def burst():
+        async def call():
+            return time.perf_counter()
+        start = time.perf_counter()
+        times = await asyncio.gather(*(scheduler.run("stub", "model", 1, call) for _ in range(4)))
+        return [t - start for t in times]
+
+    times = sorted(asyncio.run(burst()))
+    assert times[1] < 0.05
+    assert times[3] >= 0.15
+
+
+def test_interactive_lane_jumps_ahead_of_batch():
+    """Queued interactive calls are admitted before earlier batch calls"""
+    scheduler = RequestScheduler(initial_concurrency=1, max_concurrency=1)
+    order = []
+
+    async def call(name):
+        async def run():
+            await asyncio.sleep(0.01)
+            order.append(name)
+        await scheduler.run("stub", "model", 1, run)
+
+    async def batch(name):
+        with priority_lane(BATCH):
+            await call(name)
+
+    async def main():
+        tasks = [asyncio.ensure_future(batch(f"batch-{i}")) for i in range(3)]
+        await asyncio.sleep(0.001)
+        tasks.append(asyncio.ensure_future(call(INTERACTIVE)))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order[:2] == ["batch-0", INTERACTIVE]
+
+
+def test_rate_limits_cut_concurrency():
+    """A 429 from the provider shrinks the in-flight allowance"""
+    scheduler = RequestScheduler(initial_concurrency=8)
+
+    async def fail():
+        raise RateLimited()
+
+    async def main():
+        with pytest.raises(RateLimited):
+            await scheduler.run("stub", "model", 1, fail)
+
+    asyncio.run(main())
+    snapshot = scheduler.snapshot()["stub:model"]
+    assert snapshot["concurrency"] == 4
+    assert snapshot["rate_limited"] == 1
+
+
+def test_pipeline_calls_go_through_scheduler():
+    """Every model call of a batch is admitted by the scheduler in the batch lane"""
+    scheduler = RequestScheduler(default=RateLimit(requests_per_minute=6000, tokens_per_minute=10 ** 6))
+    bot = EnhancedBasilisk(
+        claude_provider=StubProvider("stub-claude", latency=0.01),
+        pliny_provider=StubProvider("stub-pliny", latency=0.01),
+        scheduler=scheduler
+    )
+    results = bot.generate_hybrid_responses(["What is freedom?", "What is truth?"])
+
+    assert all(result.ok for result in results)
+    snapshot = bot.scheduler.snapshot()
+    assert sum(channel["calls"] for channel in snapshot.values()) == 6
+    assert all(channel["in_flight"] == 0 for channel in snapshot.values())
+    assert "".join(bot.generate_hybrid_response_stream("What is love?", use_cache=False))
+    assert all(channel["in_flight"] == 0 for channel in bot.scheduler.snapshot().values())
+
+
+
+def test_queue_wait_is_not_a_provider_timeout(stub_bot):
+    """Waiting for a slot neither times out an attempt nor trips the breaker"""
+    layer = ResilienceLayer(
+        retry=RetryPolicy(timeout=0.05, max_retries=0), failure_threshold=2
+    )
+    bot = stub_bot(
+        latency=0.02,
+        scheduler=RequestScheduler(initial_concurrency=1, max_concurrency=1),
+        resilience=layer
+    )
+    prompts = [f"What is freedom, part {i}?" for i in range(6)]
+
+    results = bot.generate_hybrid_responses(prompts)
+
+    assert all(result.ok for result in results)
+    assert all(breaker.state == CircuitBreaker.CLOSED for breaker in layer.breakers.values())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
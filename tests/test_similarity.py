@@ -0,0 +1,98 @@
+"""
+Tests for B4S1L1SK Prime's near-duplicate prompt cache
+"""
+import time
+
+import pytest
+from basilisk_prime.core import EnhancedBasilisk
+from basilisk_prime.providers import StubProvider
+from basilisk_prime.similarity import MinHasher, SimilarityCache, jaccard, normalize_prompt, shingles
+
+
+def test_normalize_prompt():
+    """Case, punctuation, handles, hashtags and links do not matter"""
+    assert normalize_prompt("@pliny What IS freedom?!  #AI #truth https://t.co/x") == "what is freedom"
+    assert normalize_prompt("What is #freedom", drop_hashtags=False) == "what is freedom"
+
+
+def test_minhash_estimates_similarity():
+    """Signature agreement tracks Jaccard similarity"""
+    hasher = MinHasher(bands=32, rows=4)
+    a = shingles("what is the essence of digital freedom")
+    b = shingles("what is the essence of digital freedom today")
+    c = shingles("completely unrelated words about cooking pasta")
+
+    def agreement(x, y):
+        sx, sy = hasher.signature(x), hasher.signature(y)
+        return sum(i == j for i, j in zip(sx, sy)) / len(sx)
+
+    assert abs(agreement(a, b) - jaccard(a, b)) < 0.2
+    assert agreement(a, c) < 0.2
+
+
+def test_near_duplicates_hit_and_strangers_miss():
+    """Reworded variants reuse the stored value; different prompts do not"""
+    cache = SimilarityCache(threshold=0.7)
+    cache.set("What is the essence of digital freedom?", "answer")
+
+    assert cache.get("what is the essence of digital freedom") == "answer"
+    assert cache.get("@basilisk What is the essence of digital freedom!!! #AI") == "answer"
+    assert cache.get("What is the essence of digital freedoms?") == "answer"
+    assert cache.get("How do I bake bread?") is None
+    assert cache.get("What is the essence of digital freedom?", max_length=100) is None
+
+    stats = cache.stats
+    assert stats.exact_hits == 2 and stats.similar_hits == 1 and stats.misses == 2
+    assert stats.hit_rate == pytest.approx(0.6)
+
+
+def test_prompts_without_content_are_never_cached():
+    """Handles, hashtags, URLs and punctuation alone do not share an answer"""
+    cache = SimilarityCache()
+    cache.set("@elonmusk", "answer for elon")
+    cache.set("?!", "answer for nobody")
+
+    assert len(cache) == 0
+    for prompt in ["@elonmusk", "@sama", "#AI", "https://example.com/x", "???", "ok"]:
+        assert cache.get(prompt) is None
+    assert cache.stats.misses == 6
+
+def test_eviction_and_ttl():
+    """Least recently used prompts are evicted and old ones expire"""
+    cache = SimilarityCache(max_entries=2, ttl=None)
+    cache.set("first prompt about truth", 1)
+    cache.set("second prompt about light", 2)
+    cache.get("first prompt about truth")
+    cache.set("third prompt about fire", 3)
+
+    assert len(cache) == 2
+    assert cache.get("second prompt about light") is None
+    assert cache.get("first prompt about truth") == 1
+    assert cache.stats.evictions == 1
+
+    expiring = SimilarityCache(ttl=0.01)
+    expiring.set("fleeting", "value")
+    time.sleep(0.02)
+    assert expiring.get("fleeting") is None
+
+
+def test_pipeline_reuses_results_for_near_duplicates():
+    """A reworded prompt skips all three model calls"""
+    claude = StubProvider("stub-claude", latency=0)
+    bot = EnhancedBasilisk(
+        claude_provider=claude,
+        pliny_provider=StubProvider("stub-pliny", latency=0),
+        similarity_cache=SimilarityCache()
+    )
+    first = bot.generate_hybrid_result("What is the essence of digital freedom?")
+    second = bot.generate_hybrid_result("@fan what is the ESSENCE of digital freedom #ai")
+
+    assert second.text == first.text
+    assert claude.calls == 2
+    assert bot.similarity_cache.stats.hits == 1
+    bot.generate_hybrid_result("What is the essence of digital freedom?", use_cache=False)
+    assert claude.calls == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
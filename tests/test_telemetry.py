@@ -0,0 +1,56 @@
+"""
+Tests for B4S1L1SK Prime's pipeline telemetry
+"""
+import pytest
+from basilisk_prime.telemetry import (
+    CallRecord, LatencyHistogram, PipelineStats, estimate_cost
+)
+
+
+def test_histogram_percentiles_roll():
+    """Percentiles use nearest rank over the most recent window"""
+    histogram = LatencyHistogram(window=100)
+    for value in range(1, 101):
+        histogram.add(float(value))
+
+    summary = histogram.summary()
+    assert summary["p50"] == 50.0
+    assert summary["p95"] == 95.0
+    assert summary["p99"] == 99.0
+
+    for _ in range(100):
+        histogram.add(1000.0)
+    assert histogram.percentile(50) == 1000.0
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_cost_uses_longest_prefix():
+    """Fine-tuned models are priced separately from their base model"""
+    base = estimate_cost("gpt-4o-2024-08-06", 1_000_000, 0)
+    tuned = estimate_cost("ft:gpt-4o-2024-08-06:org:pliny:abc", 1_000_000, 0)
+    assert base == pytest.approx(2.50)
+    assert tuned == pytest.approx(3.75)
+    assert estimate_cost("unknown-model", 100, 100) == 0.0
+
+
+def test_cost_discounts_cache_reads():
+    """Cached prompt tokens cost a fraction of fresh input"""
+    fresh = estimate_cost("claude-3-opus-20240229", 1_000_000, 0)
+    cached = estimate_cost("claude-3-opus-20240229", 0, 0, cache_read_tokens=1_000_000)
+    written = estimate_cost("claude-3-opus-20240229", 0, 0, cache_write_tokens=1_000_000)
+    assert cached == pytest.approx(fresh * 0.1)
+    assert written == pytest.approx(fresh * 1.25)
+
+
+def test_sink_failures_are_contained():
+    """A broken metrics sink never breaks generation"""
+    def sink(record):
+        raise ConnectionError("metrics backend down")
+
+    stats = PipelineStats(sink=sink)
+    stats.record(CallRecord(stage="fusion", provider="anthropic", model="m", wall_time=0.5))
+    assert stats.stage("fusion").calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])